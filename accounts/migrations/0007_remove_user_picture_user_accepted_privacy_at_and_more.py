@@ -0,0 +1,27 @@
+# Generated by Django 4.2 on 2026-10-18 07:19
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("accounts", "0006_student_courses"),
+    ]
+
+    operations = [
+        migrations.RemoveField(
+            model_name="user",
+            name="picture",
+        ),
+        migrations.AddField(
+            model_name="user",
+            name="accepted_privacy_at",
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name="user",
+            name="accepted_terms_at",
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+    ]
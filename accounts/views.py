@@ -33,6 +33,8 @@ from accounts.forms import (
     StudentAddForm,
 )
 from accounts.models import Parent, Student, User
+from core.jobs import background_pdf
+from core.pagination import KeysetPaginationMixin
 from core.models import Semester, Session
 from course.models import Course
 from result.models import TakenCourse, Result
@@ -315,6 +317,7 @@ class LecturerFilterView(FilterView):
 
 @login_required
 @admin_required
+@background_pdf
 def lecturer_list_pdf(request):
     lecturers = User.objects.filter(is_lecturer=True).order_by('first_name', 'last_name')
     
@@ -567,11 +570,13 @@ def edit_student(request, pk):
 
 
 @method_decorator([login_required, admin_required], name="dispatch")
-class StudentListView(FilterView):
-    queryset = Student.objects.all()
+class StudentListView(KeysetPaginationMixin, FilterView):
+    queryset = Student.objects.select_related("student")
     filterset_class = StudentFilter
     template_name = "accounts/student_list.html"
     paginate_by = 10
+    # Mismo orden que Student.Meta.ordering, con el id como desempate
+    keyset_ordering = ("-student__date_joined", "-pk")
 
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
@@ -581,6 +586,7 @@ class StudentListView(FilterView):
 
 @login_required
 @admin_required
+@background_pdf
 def render_student_pdf_list(request):
     students = Student.objects.all().order_by('student__first_name', 'student__last_name')
     
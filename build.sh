@@ -24,8 +24,8 @@ python manage.py collectstatic --no-input
 # Apply database migrations
 python manage.py migrate
 
-# Cache is handled automatically by Django
-# No need for createcachetable or clear_cache commands
+# Tabla de la caché compartida (CACHE_BACKEND=db)
+python manage.py createcachetable
 
 # Verify static files
 ls -la staticfiles/
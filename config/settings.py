@@ -271,17 +271,52 @@ LOGGING = {
 # WhiteNoise configuration
 STATICFILES_STORAGE = "whitenoise.storage.CompressedManifestStaticFilesStorage"
 
-# Cache configuration - Simplified for production stability
+# Caché compartida entre workers y reinicios (segundo nivel, core.cache_tiers)
+# CACHE_BACKEND: "db" (tabla cache_table, se crea con createcachetable), "file",
+# "redis" (requiere el paquete redis; CACHE_LOCATION=redis://host:6379/1) o
+# "locmem" (por proceso, solo para desarrollo)
+CACHE_BACKEND = config("CACHE_BACKEND", default="locmem" if DEBUG else "db")
+CACHE_BACKENDS = {
+    "locmem": ("django.core.cache.backends.locmem.LocMemCache", "unique-snowflake"),
+    "file": ("django.core.cache.backends.filebased.FileBasedCache", os.path.join(BASE_DIR, "cache")),
+    "db": ("django.core.cache.backends.db.DatabaseCache", "cache_table"),
+    "redis": ("django.core.cache.backends.redis.RedisCache", "redis://127.0.0.1:6379/1"),
+}
 CACHES = {
     'default': {
-        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
-        'LOCATION': 'unique-snowflake',
-        'OPTIONS': {
-            'MAX_ENTRIES': 500,  # Reduced for stability
-            'CULL_FREQUENCY': 2,  # More aggressive cleanup
-        }
+        'BACKEND': CACHE_BACKENDS[CACHE_BACKEND][0],
+        'LOCATION': config("CACHE_LOCATION", default=CACHE_BACKENDS[CACHE_BACKEND][1]),
     }
 }
+if CACHE_BACKEND != "redis":
+    CACHES['default']['OPTIONS'] = {
+        'MAX_ENTRIES': config("CACHE_MAX_ENTRIES", default=50000, cast=int),
+        'CULL_FREQUENCY': 10,  # al llenarse descarta una décima parte
+    }
+
+# Primer nivel: LRU en la memoria de cada proceso para objetos pequeños y muy leídos
+LOCAL_CACHE_MAX_ENTRIES = config("LOCAL_CACHE_MAX_ENTRIES", default=1000, cast=int)
+LOCAL_CACHE_TIMEOUT = config("LOCAL_CACHE_TIMEOUT", default=60, cast=int)  # segundos
+
+# Plantillas PDF de certificados parseadas y retenidas en memoria por proceso (LRU)
+CERTIFICATE_TEMPLATE_CACHE_MB = config("CERTIFICATE_TEMPLATE_CACHE_MB", default=64, cast=int)
+
+# Certificados renderizados en MEDIA_ROOT/certificados_generados
+# "x-accel-redirect" (nginx) o "x-sendfile" (apache) delegan el envío del archivo al servidor web
+CERTIFICATE_ARTIFACT_OFFLOAD = config("CERTIFICATE_ARTIFACT_OFFLOAD", default="")
+CERTIFICATE_ARTIFACT_ACCEL_PREFIX = config(
+    "CERTIFICATE_ARTIFACT_ACCEL_PREFIX", default="/protected/certificados_generados/"
+)
+
+# Cola de PDFs en segundo plano (core.jobs): con PDF_JOBS_ASYNC activo las vistas de
+# reportes encolan un Job que procesa `python manage.py run_pdf_worker`
+PDF_JOBS_ASYNC = config("PDF_JOBS_ASYNC", default=False, cast=bool)
+PDF_JOB_TIMEOUT = config("PDF_JOB_TIMEOUT", default=600, cast=int)  # segundos antes de reintentar
+PDF_JOB_MAX_ATTEMPTS = config("PDF_JOB_MAX_ATTEMPTS", default=3, cast=int)
+PDF_JOB_RETENTION_HOURS = config("PDF_JOB_RETENTION_HOURS", default=24, cast=int)
+
+# Procesos usados para renderizar la exportación masiva de certificados (0 = en el mismo proceso)
+CERTIFICATE_EXPORT_WORKERS = config("CERTIFICATE_EXPORT_WORKERS", default=os.cpu_count() or 1, cast=int)
 
 STUDENT_ID_PREFIX = config("STUDENT_ID_PREFIX", "ugr")
 LECTURER_ID_PREFIX = config("LECTURER_ID_PREFIX", "lec")
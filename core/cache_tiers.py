@@ -0,0 +1,169 @@
+"""
+Caché en dos niveles
+1. LRU acotada en la memoria de cada proceso (LOCAL_CACHE_MAX_ENTRIES entradas,
+   como máximo LOCAL_CACHE_TIMEOUT segundos) para objetos pequeños y muy leídos.
+2. Caché compartida entre workers y reinicios (settings.CACHES, configurada con
+   CACHE_BACKEND: base de datos, archivos o Redis).
+Una escritura va a ambos niveles; una lectura que falla en el primero se sirve
+del segundo y se copia al primero. delete() solo limpia el primer nivel del
+proceso actual: los datos que cambian deben usar claves versionadas
+(core.cache_versions) o que incluyan su marca de tiempo.
+
+Los aciertos y fallos se cuentan por espacio de nombres; cada STATS_FLUSH_EVERY
+operaciones se suman a contadores en la caché compartida (comando cache_stats).
+"""
+import pickle
+import threading
+import time
+from collections import Counter, OrderedDict
+
+from django.conf import settings
+from django.core.cache import DEFAULT_CACHE_ALIAS, caches
+
+STATS_FLUSH_EVERY = 200
+STATS_KEY_PREFIX = "cache_stats"
+STATS_NAMESPACES_KEY = f"{STATS_KEY_PREFIX}:namespaces"
+STATS_FIELDS = ("local_hits", "shared_hits", "misses")
+
+
+class LocalLRU:
+    """Diccionario LRU con expiración; guarda los valores serializados para que no se compartan mutables"""
+
+    def __init__(self, max_entries):
+        self.max_entries = max_entries
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is None:
+                return None
+            expires_at, payload = entry
+            if expires_at <= time.monotonic():
+                del self._data[key]
+                return None
+            self._data.move_to_end(key)
+        return pickle.loads(payload)
+
+    def set(self, key, value, timeout):
+        payload = pickle.dumps(value, pickle.HIGHEST_PROTOCOL)
+        with self._lock:
+            self._data[key] = (time.monotonic() + timeout, payload)
+            self._data.move_to_end(key)
+            while len(self._data) > self.max_entries:
+                self._data.popitem(last=False)
+
+    def delete(self, key):
+        with self._lock:
+            self._data.pop(key, None)
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+
+    def __len__(self):
+        return len(self._data)
+
+
+class TieredCache:
+    def __init__(self, alias=DEFAULT_CACHE_ALIAS, max_entries=None, local_timeout=None):
+        self.alias = alias
+        self.local = LocalLRU(max_entries or settings.LOCAL_CACHE_MAX_ENTRIES)
+        self.local_timeout = local_timeout or settings.LOCAL_CACHE_TIMEOUT
+        self._stats = Counter()
+        self._pending = 0
+        self._stats_lock = threading.Lock()
+
+    @property
+    def shared(self):
+        return caches[self.alias]
+
+    def get(self, key, namespace, default=None):
+        value = self.local.get(key)
+        if value is not None:
+            self._count(namespace, "local_hits")
+            return value
+        value = self.shared.get(key)
+        if value is None:
+            self._count(namespace, "misses")
+            return default
+        self._count(namespace, "shared_hits")
+        self.local.set(key, value, self.local_timeout)
+        return value
+
+    def set(self, key, value, timeout):
+        self.shared.set(key, value, timeout)
+        local_timeout = self.local_timeout if timeout is None else min(timeout, self.local_timeout)
+        self.local.set(key, value, local_timeout)
+
+    def get_or_set(self, key, builder, timeout, namespace):
+        value = self.get(key, namespace)
+        if value is None:
+            value = builder()
+            self.set(key, value, timeout)
+        return value
+
+    def delete(self, key):
+        self.local.delete(key)
+        self.shared.delete(key)
+
+    # Estadísticas
+
+    def _count(self, namespace, field):
+        with self._stats_lock:
+            self._stats[(namespace, field)] += 1
+            self._pending += 1
+            flush = self._pending >= STATS_FLUSH_EVERY
+        if flush:
+            self.flush_stats()
+
+    def local_stats(self):
+        """Contadores de este proceso aún no enviados: {namespace: {campo: n}}"""
+        with self._stats_lock:
+            return _group(self._stats)
+
+    def flush_stats(self):
+        """Suma los contadores del proceso a los compartidos y los reinicia"""
+        with self._stats_lock:
+            pending, self._stats, self._pending = self._stats, Counter(), 0
+        if not pending:
+            return
+        namespaces = set(self.shared.get(STATS_NAMESPACES_KEY) or ())
+        new_namespaces = {namespace for namespace, _ in pending} - namespaces
+        if new_namespaces:
+            self.shared.set(STATS_NAMESPACES_KEY, sorted(namespaces | new_namespaces), None)
+        for (namespace, field), amount in pending.items():
+            key = f"{STATS_KEY_PREFIX}:{namespace}:{field}"
+            if not self.shared.add(key, amount, None):
+                self.shared.incr(key, amount)
+
+    def shared_stats(self):
+        """Contadores acumulados de todos los procesos: {namespace: {campo: n}}"""
+        namespaces = self.shared.get(STATS_NAMESPACES_KEY) or ()
+        keys = {
+            f"{STATS_KEY_PREFIX}:{namespace}:{field}": (namespace, field)
+            for namespace in namespaces
+            for field in STATS_FIELDS
+        }
+        stored = self.shared.get_many(list(keys))
+        return _group(Counter({keys[key]: amount for key, amount in stored.items()}))
+
+    def reset_stats(self):
+        namespaces = self.shared.get(STATS_NAMESPACES_KEY) or ()
+        self.shared.delete_many(
+            [STATS_NAMESPACES_KEY]
+            + [f"{STATS_KEY_PREFIX}:{namespace}:{field}" for namespace in namespaces for field in STATS_FIELDS]
+        )
+        with self._stats_lock:
+            self._stats, self._pending = Counter(), 0
+
+
+def _group(counter):
+    stats = {}
+    for (namespace, field), amount in counter.items():
+        stats.setdefault(namespace, dict.fromkeys(STATS_FIELDS, 0))[field] = amount
+    return stats
+
+
+tiered_cache = TieredCache()
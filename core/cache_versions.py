@@ -0,0 +1,99 @@
+"""
+Invalidación de la caché por versiones de ámbito
+Cada entrada declara de qué ámbitos depende (un usuario, un curso, los certificados)
+y su clave incluye la versión actual de cada uno. Invalidar un ámbito es incrementar
+un contador: todas las claves que dependían de él dejan de coincidir y expiran solas.
+Funciona con cualquier backend de Django (locmem, archivos, base de datos, Redis)
+porque solo usa get_many/add/incr/set. Las versiones se leen siempre de la caché
+compartida; los valores pasan por la caché en dos niveles (core.cache_tiers).
+"""
+import time
+
+from django.core.cache import DEFAULT_CACHE_ALIAS, caches
+from django.db import transaction
+
+from .cache_tiers import TieredCache, tiered_cache
+
+CERTIFICATES = "certificates"
+
+
+def user_scope(user_id):
+    return f"user:{user_id}"
+
+
+def course_scope(course_id):
+    return f"course:{course_id}"
+
+
+def _initial_version():
+    # Si el contador se pierde (cull o reinicio) reaparece con un valor mayor que
+    # cualquier versión anterior, así no se reutilizan claves viejas
+    return time.time_ns() // 1000
+
+
+class VersionedCache:
+    """Fachada sobre una caché de Django con claves dependientes de versiones"""
+
+    VERSION_PREFIX = "cache_version"
+
+    def __init__(self, alias=DEFAULT_CACHE_ALIAS, values=None):
+        self.alias = alias
+        self.values = values or TieredCache(alias)
+
+    @property
+    def cache(self):
+        return caches[self.alias]
+
+    def _version_key(self, scope):
+        return f"{self.VERSION_PREFIX}:{scope}"
+
+    def versions(self, scopes):
+        """Versión actual de cada ámbito en una sola lectura; crea las que falten"""
+        keys = {scope: self._version_key(scope) for scope in scopes}
+        stored = self.cache.get_many(list(keys.values()))
+        versions = {}
+        for scope, key in keys.items():
+            version = stored.get(key)
+            if version is None:
+                version = _initial_version()
+                # Si otro proceso la creó primero, se usa la suya
+                if not self.cache.add(key, version, None):
+                    version = self.cache.get(key, version)
+            versions[scope] = version
+        return versions
+
+    def make_key(self, key, scopes):
+        versions = self.versions(scopes)
+        return ":".join([key, *(str(versions[scope]) for scope in scopes)])
+
+    def get(self, key, scopes, namespace, default=None):
+        """namespace agrupa los aciertos y fallos en las estadísticas (p. ej. "course_content")"""
+        return self.values.get(self.make_key(key, scopes), namespace, default)
+
+    def set(self, key, value, timeout, scopes):
+        self.values.set(self.make_key(key, scopes), value, timeout)
+
+    def get_or_set(self, key, builder, timeout, scopes, namespace):
+        """Valor cacheado o el resultado de builder() guardado con las versiones actuales"""
+        return self.values.get_or_set(self.make_key(key, scopes), builder, timeout, namespace)
+
+    def bump(self, *scopes):
+        """
+        Invalida todas las entradas que dependen de los ámbitos. Dentro de una
+        transacción se repite al confirmarla: un proceso que leyó los datos
+        anteriores al commit no puede dejarlos guardados con la versión nueva.
+        """
+        self._bump(scopes)
+        if transaction.get_connection().in_atomic_block:
+            transaction.on_commit(lambda: self._bump(scopes))
+
+    def _bump(self, scopes):
+        for scope in scopes:
+            key = self._version_key(scope)
+            try:
+                self.cache.incr(key)
+            except ValueError:
+                self.cache.set(key, _initial_version(), None)
+
+
+versioned_cache = VersionedCache(values=tiered_cache)
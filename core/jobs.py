@@ -0,0 +1,134 @@
+"""
+Cola de trabajos en base de datos para generar PDFs fuera del worker de gunicorn
+Sin broker externo: el proceso `manage.py run_pdf_worker` reclama los trabajos
+pendientes con un UPDATE condicional y vuelve a ejecutar la vista original.
+"""
+import re
+import traceback
+from datetime import timedelta
+from functools import wraps
+
+from django.conf import settings
+from django.contrib.messages.storage.fallback import FallbackStorage
+from django.core.files.base import ContentFile
+from django.db.models import F
+from django.http import HttpRequest, QueryDict
+from django.shortcuts import redirect
+from django.utils import timezone
+from django.utils.module_loading import import_string
+
+from .models import Job
+
+_FILENAME_RE = re.compile(r'filename="?([^";]+)"?')
+
+
+def background_pdf(view):
+    """
+    Encola la vista como Job cuando PDF_JOBS_ASYNC está activo y redirige a la
+    página de estado. Debe ir debajo de los decoradores de permisos para que
+    éstos se validen en la petición original.
+    """
+    @wraps(view)
+    def wrapper(request, *args, **kwargs):
+        if (
+            not settings.PDF_JOBS_ASYNC
+            or not request.user.is_authenticated
+            or getattr(request, 'job', None) is not None
+        ):
+            return view(request, *args, **kwargs)
+        job = Job.objects.create(
+            view=f'{view.__module__}.{view.__name__}',
+            args=list(args),
+            kwargs=kwargs,
+            query_string=request.META.get('QUERY_STRING', ''),
+            path=request.path,
+            host=request.get_host(),
+            is_secure=request.is_secure(),
+            requested_by=request.user,
+        )
+        return redirect('job_status', pk=job.pk)
+    return wrapper
+
+
+def claim_next_job():
+    """Reclama el trabajo pendiente más antiguo; seguro con varios workers en paralelo"""
+    candidates = Job.objects.filter(status=Job.PENDING).order_by('created_at').values_list('pk', flat=True)[:10]
+    for pk in candidates:
+        claimed = Job.objects.filter(pk=pk, status=Job.PENDING).update(
+            status=Job.RUNNING, started_at=timezone.now(), attempts=F('attempts') + 1,
+        )
+        if claimed:
+            return Job.objects.select_related('requested_by').get(pk=pk)
+    return None
+
+
+class JobRequest(HttpRequest):
+    """Petición GET reconstruida a partir de los datos guardados en el Job"""
+
+    def __init__(self, job):
+        super().__init__()
+        self.job = job
+        self.method = 'GET'
+        self.path = self.path_info = job.path
+        self.GET = QueryDict(job.query_string)
+        host = job.host or 'localhost'
+        self.META.update({
+            'QUERY_STRING': job.query_string,
+            'HTTP_HOST': host,
+            'SERVER_NAME': host.split(':')[0],
+            'SERVER_PORT': '443' if job.is_secure else '80',
+        })
+        self.user = job.requested_by
+        # Sesión efímera: los mensajes de la vista sólo se usan para reportar el error del Job
+        self.session = {}
+        self._messages = FallbackStorage(self)
+
+    def _get_scheme(self):
+        return 'https' if self.job.is_secure else 'http'
+
+
+def run_job(job):
+    """Ejecuta la vista del trabajo y guarda el archivo generado (o el motivo del fallo)"""
+    request = JobRequest(job)
+    try:
+        view = import_string(job.view)
+        response = view(request, *job.args, **job.kwargs)
+        if response.status_code != 200 or getattr(response, 'streaming', False):
+            mensajes = [str(message) for message in request._messages]
+            raise RuntimeError('; '.join(mensajes) or f'La vista respondió con estado {response.status_code}')
+
+        match = _FILENAME_RE.search(response.get('Content-Disposition', ''))
+        job.filename = match.group(1) if match else f'{job.pk}.pdf'
+        job.content_type = response.get('Content-Type', 'application/pdf')
+        job.result.save(f'{job.pk}-{job.filename}', ContentFile(response.content), save=False)
+        job.status = Job.DONE
+        job.error = ''
+    except Exception:
+        job.status = Job.FAILED
+        job.error = traceback.format_exc(limit=5)
+    job.finished_at = timezone.now()
+    job.save(update_fields=['status', 'result', 'filename', 'content_type', 'error', 'finished_at'])
+    return job
+
+
+def requeue_stale_jobs():
+    """Devuelve a la cola los trabajos de un worker que murió a mitad de ejecución"""
+    limite = timezone.now() - timedelta(seconds=settings.PDF_JOB_TIMEOUT)
+    stale = Job.objects.filter(status=Job.RUNNING, started_at__lt=limite)
+    failed = stale.filter(attempts__gte=settings.PDF_JOB_MAX_ATTEMPTS).update(
+        status=Job.FAILED, finished_at=timezone.now(), error='Tiempo de ejecución agotado',
+    )
+    return stale.update(status=Job.PENDING, started_at=None), failed
+
+
+def purge_expired_jobs():
+    """Elimina los trabajos terminados (y sus archivos) más antiguos que PDF_JOB_RETENTION_HOURS"""
+    limite = timezone.now() - timedelta(hours=settings.PDF_JOB_RETENTION_HOURS)
+    expired = Job.objects.filter(status__in=[Job.DONE, Job.FAILED], finished_at__lt=limite)
+    count = 0
+    for job in expired.iterator():
+        if job.result:
+            job.result.delete(save=False)
+        job.delete()
+        count += 1
+    return count
@@ -0,0 +1,39 @@
+"""
+Aciertos y fallos de la caché en dos niveles por espacio de nombres
+(acumulados por todos los workers), para dimensionar LOCAL_CACHE_MAX_ENTRIES
+y la caché compartida: python manage.py cache_stats [--reset]
+"""
+from django.core.management.base import BaseCommand
+
+from core.cache_tiers import tiered_cache
+
+
+class Command(BaseCommand):
+    help = 'Muestra los aciertos y fallos de la caché por espacio de nombres'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--reset',
+            action='store_true',
+            help='Reiniciar los contadores después de mostrarlos',
+        )
+
+    def handle(self, *args, **options):
+        tiered_cache.flush_stats()
+        stats = tiered_cache.shared_stats()
+        if not stats:
+            self.stdout.write(self.style.WARNING('⚠️ Aún no hay estadísticas registradas'))
+            return
+
+        self.stdout.write(f"{'Espacio':<28}{'Local':>10}{'Compartida':>12}{'Fallos':>10}{'Aciertos':>10}")
+        for namespace, counts in sorted(stats.items()):
+            total = sum(counts.values())
+            hits = counts['local_hits'] + counts['shared_hits']
+            self.stdout.write(
+                f"{namespace:<28}{counts['local_hits']:>10}{counts['shared_hits']:>12}"
+                f"{counts['misses']:>10}{hits / total if total else 0:>10.0%}"
+            )
+
+        if options['reset']:
+            tiered_cache.reset_stats()
+            self.stdout.write(self.style.SUCCESS('✅ Contadores reiniciados'))
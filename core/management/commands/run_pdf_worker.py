@@ -0,0 +1,70 @@
+#!/usr/bin/env python
+"""
+Comando de gestión que procesa la cola de PDFs en segundo plano (core.models.Job)
+Se ejecuta como un proceso aparte de gunicorn, por ejemplo: python manage.py run_pdf_worker
+"""
+import signal
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import close_old_connections
+
+from core.jobs import claim_next_job, purge_expired_jobs, requeue_stale_jobs, run_job
+from core.models import Job
+
+# Segundos entre tareas de mantenimiento (reintentos y limpieza)
+MAINTENANCE_INTERVAL = 60
+
+
+class Command(BaseCommand):
+    help = 'Procesa los trabajos de generación de PDF encolados por las vistas'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--poll-interval',
+            type=float,
+            default=2.0,
+            help='Segundos de espera cuando la cola está vacía',
+        )
+        parser.add_argument(
+            '--burst',
+            action='store_true',
+            help='Procesar los trabajos pendientes y terminar',
+        )
+
+    def handle(self, *args, **options):
+        self._stop = False
+        signal.signal(signal.SIGTERM, self._request_stop)
+        signal.signal(signal.SIGINT, self._request_stop)
+
+        self.stdout.write(self.style.SUCCESS('🔄 Worker de PDFs iniciado'))
+        last_maintenance = 0.0
+        while not self._stop:
+            close_old_connections()
+            if time.monotonic() - last_maintenance > MAINTENANCE_INTERVAL:
+                requeued, failed = requeue_stale_jobs()
+                purged = purge_expired_jobs()
+                if requeued or failed or purged:
+                    self.stdout.write(f'   Reencolados: {requeued}, agotados: {failed}, eliminados: {purged}')
+                last_maintenance = time.monotonic()
+
+            job = claim_next_job()
+            if job is None:
+                if options['burst']:
+                    break
+                time.sleep(options['poll_interval'])
+                continue
+
+            started = time.monotonic()
+            job = run_job(job)
+            elapsed = time.monotonic() - started
+            if job.status == Job.DONE:
+                self.stdout.write(self.style.SUCCESS(f'✅ {job.view} → {job.filename} ({elapsed:.1f} s)'))
+            else:
+                self.stdout.write(self.style.ERROR(f'❌ {job.view} falló ({elapsed:.1f} s)'))
+
+        self.stdout.write('Worker de PDFs detenido')
+
+    def _request_stop(self, signum, frame):
+        # Terminar el trabajo en curso antes de salir
+        self._stop = True
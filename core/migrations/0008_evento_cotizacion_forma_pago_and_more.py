@@ -0,0 +1,286 @@
+# Generated by Django 4.2 on 2026-10-18 07:19
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ("core", "0007_alter_cotizacion_cotizacion_alter_cotizacion_estado_and_more"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="Evento",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                (
+                    "titulo",
+                    models.CharField(max_length=200, verbose_name="Título del Evento"),
+                ),
+                (
+                    "descripcion",
+                    models.TextField(blank=True, null=True, verbose_name="Descripción"),
+                ),
+                (
+                    "tipo",
+                    models.CharField(
+                        choices=[
+                            ("reunion", "Reunión"),
+                            ("curso", "Curso"),
+                            ("examen", "Examen"),
+                            ("certificado", "Certificado"),
+                            ("pago", "Pago"),
+                            ("otro", "Otro"),
+                        ],
+                        default="reunion",
+                        max_length=20,
+                        verbose_name="Tipo de Evento",
+                    ),
+                ),
+                (
+                    "fecha_inicio",
+                    models.DateTimeField(verbose_name="Fecha y Hora de Inicio"),
+                ),
+                (
+                    "fecha_fin",
+                    models.DateTimeField(
+                        blank=True, null=True, verbose_name="Fecha y Hora de Fin"
+                    ),
+                ),
+                (
+                    "mensaje_recordatorio",
+                    models.TextField(
+                        blank=True, null=True, verbose_name="Mensaje de Recordatorio"
+                    ),
+                ),
+                (
+                    "dias_antes",
+                    models.IntegerField(
+                        blank=True,
+                        default=1,
+                        null=True,
+                        verbose_name="Días antes del evento",
+                    ),
+                ),
+                (
+                    "horas_antes",
+                    models.IntegerField(
+                        blank=True,
+                        default=0,
+                        null=True,
+                        verbose_name="Horas antes del evento",
+                    ),
+                ),
+                (
+                    "canales_envio",
+                    models.JSONField(
+                        blank=True,
+                        default=list,
+                        null=True,
+                        verbose_name="Canales de Envío",
+                    ),
+                ),
+                (
+                    "emails_destino",
+                    models.TextField(
+                        blank=True,
+                        help_text="Separa los emails por coma, punto y coma o salto de línea.",
+                        null=True,
+                        verbose_name="Emails destinatarios",
+                    ),
+                ),
+                (
+                    "telefonos_destino",
+                    models.TextField(
+                        blank=True,
+                        help_text="Incluye el código de país. Separa los números por coma o salto de línea.",
+                        null=True,
+                        verbose_name="Números WhatsApp destinatarios",
+                    ),
+                ),
+                (
+                    "recordatorio_enviado",
+                    models.BooleanField(
+                        default=False, verbose_name="Recordatorio Enviado"
+                    ),
+                ),
+                (
+                    "fecha_envio_recordatorio",
+                    models.DateTimeField(
+                        blank=True, null=True, verbose_name="Fecha de Envío"
+                    ),
+                ),
+                ("fecha_creacion", models.DateTimeField(auto_now_add=True)),
+                ("fecha_actualizacion", models.DateTimeField(auto_now=True)),
+                (
+                    "activo",
+                    models.BooleanField(default=True, verbose_name="Evento Activo"),
+                ),
+                (
+                    "creado_por",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        to=settings.AUTH_USER_MODEL,
+                        verbose_name="Creado por",
+                    ),
+                ),
+            ],
+            options={
+                "verbose_name": "Evento",
+                "verbose_name_plural": "Eventos",
+                "ordering": ["-fecha_inicio"],
+            },
+        ),
+        migrations.AddField(
+            model_name="cotizacion",
+            name="forma_pago",
+            field=models.CharField(
+                choices=[
+                    ("50_50", "50% al iniciar y 50% al finalizar"),
+                    ("100_adelantado", "100% adelantado"),
+                    ("al_credito", "Al crédito"),
+                ],
+                default="100_adelantado",
+                max_length=20,
+                verbose_name="Forma de Pago",
+            ),
+        ),
+        migrations.AddField(
+            model_name="cotizacion",
+            name="monto_cancelado",
+            field=models.DecimalField(
+                decimal_places=2,
+                default=0,
+                help_text="Monto que ya ha sido pagado",
+                max_digits=10,
+                verbose_name="Monto Cancelado",
+            ),
+        ),
+        migrations.AddField(
+            model_name="cotizacion",
+            name="plazo_credito_dias",
+            field=models.IntegerField(
+                blank=True,
+                help_text="Plazo en días para pago al crédito",
+                null=True,
+                verbose_name="Plazo de crédito (días)",
+            ),
+        ),
+        migrations.AddField(
+            model_name="cotizacion",
+            name="plazo_credito_fecha",
+            field=models.DateField(
+                blank=True,
+                help_text="Fecha límite para pago al crédito",
+                null=True,
+                verbose_name="Fecha límite de crédito",
+            ),
+        ),
+        migrations.CreateModel(
+            name="LogRecordatorio",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                (
+                    "canal",
+                    models.CharField(
+                        choices=[
+                            ("email", "Email"),
+                            ("whatsapp", "WhatsApp"),
+                            ("telegram", "Telegram"),
+                            ("sms", "SMS"),
+                        ],
+                        max_length=20,
+                    ),
+                ),
+                (
+                    "destinatario",
+                    models.CharField(max_length=200, verbose_name="Destinatario"),
+                ),
+                ("mensaje", models.TextField(verbose_name="Mensaje Enviado")),
+                (
+                    "enviado_exitosamente",
+                    models.BooleanField(
+                        default=True, verbose_name="Enviado Exitosamente"
+                    ),
+                ),
+                (
+                    "error_mensaje",
+                    models.TextField(
+                        blank=True, null=True, verbose_name="Mensaje de Error"
+                    ),
+                ),
+                ("fecha_envio", models.DateTimeField(auto_now_add=True)),
+                (
+                    "evento",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="logs_recordatorio",
+                        to="core.evento",
+                    ),
+                ),
+            ],
+            options={
+                "verbose_name": "Log de Recordatorio",
+                "verbose_name_plural": "Logs de Recordatorios",
+                "ordering": ["-fecha_envio"],
+            },
+        ),
+        migrations.CreateModel(
+            name="HistorialEstado",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("estado_anterior", models.CharField(max_length=20)),
+                ("estado_nuevo", models.CharField(max_length=20)),
+                ("fecha_cambio", models.DateTimeField(auto_now_add=True)),
+                ("comentario", models.TextField(blank=True, null=True)),
+                (
+                    "cotizacion",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="historial_estados",
+                        to="core.cotizacion",
+                    ),
+                ),
+                (
+                    "usuario",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        to=settings.AUTH_USER_MODEL,
+                    ),
+                ),
+            ],
+            options={
+                "verbose_name": "Historial de Estado",
+                "verbose_name_plural": "Historial de Estados",
+                "ordering": ["-fecha_cambio"],
+            },
+        ),
+    ]
@@ -0,0 +1,83 @@
+# Generated by Django 4.2 on 2026-10-18 07:36
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+import uuid
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ("core", "0008_evento_cotizacion_forma_pago_and_more"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="Job",
+            fields=[
+                (
+                    "id",
+                    models.UUIDField(
+                        default=uuid.uuid4,
+                        editable=False,
+                        primary_key=True,
+                        serialize=False,
+                    ),
+                ),
+                ("view", models.CharField(max_length=255, verbose_name="Vista")),
+                ("args", models.JSONField(blank=True, default=list)),
+                ("kwargs", models.JSONField(blank=True, default=dict)),
+                ("query_string", models.TextField(blank=True, default="")),
+                ("path", models.CharField(blank=True, default="", max_length=500)),
+                ("host", models.CharField(blank=True, default="", max_length=255)),
+                ("is_secure", models.BooleanField(default=False)),
+                (
+                    "status",
+                    models.CharField(
+                        choices=[
+                            ("pending", "Pendiente"),
+                            ("running", "En proceso"),
+                            ("done", "Completado"),
+                            ("failed", "Fallido"),
+                        ],
+                        default="pending",
+                        max_length=10,
+                        verbose_name="Estado",
+                    ),
+                ),
+                ("attempts", models.PositiveSmallIntegerField(default=0)),
+                ("result", models.FileField(blank=True, null=True, upload_to="jobs/")),
+                ("filename", models.CharField(blank=True, default="", max_length=255)),
+                (
+                    "content_type",
+                    models.CharField(blank=True, default="", max_length=100),
+                ),
+                ("error", models.TextField(blank=True, default="")),
+                ("created_at", models.DateTimeField(auto_now_add=True)),
+                ("started_at", models.DateTimeField(blank=True, null=True)),
+                ("finished_at", models.DateTimeField(blank=True, null=True)),
+                (
+                    "requested_by",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="jobs",
+                        to=settings.AUTH_USER_MODEL,
+                        verbose_name="Solicitado por",
+                    ),
+                ),
+            ],
+            options={
+                "verbose_name": "Trabajo en segundo plano",
+                "verbose_name_plural": "Trabajos en segundo plano",
+                "ordering": ["-created_at"],
+            },
+        ),
+        migrations.AddIndex(
+            model_name="job",
+            index=models.Index(
+                fields=["status", "created_at"], name="core_job_status_created_idx"
+            ),
+        ),
+    ]
@@ -0,0 +1,25 @@
+# Generated by Django 4.2 on 2026-10-18 08:12
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("core", "0009_job"),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="cotizacion",
+            index=models.Index(
+                fields=["fecha_creacion", "id"], name="core_cotizacion_fecha_idx"
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="logrecordatorio",
+            index=models.Index(
+                fields=["fecha_envio", "id"], name="core_logrecord_fecha_idx"
+            ),
+        ),
+    ]
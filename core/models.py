@@ -5,6 +5,7 @@ from django.core.exceptions import ValidationError
 from django.utils import timezone
 from decimal import Decimal, ROUND_HALF_UP
 import math
+import uuid
 
 
 NEWS = _("News")
@@ -411,6 +412,10 @@ class Cotizacion(models.Model):
         verbose_name = "Cotización"
         verbose_name_plural = "Cotizaciones"
         ordering = ['-fecha_creacion']
+        indexes = [
+            # Clave de la paginación por cursor del listado
+            models.Index(fields=['fecha_creacion', 'id'], name='core_cotizacion_fecha_idx'),
+        ]
 
 
 class ItemCotizacion(models.Model):
@@ -561,6 +566,63 @@ class LogRecordatorio(models.Model):
         verbose_name = "Log de Recordatorio"
         verbose_name_plural = "Logs de Recordatorios"
         ordering = ['-fecha_envio']
+        indexes = [
+            # Clave de la paginación por cursor del listado
+            models.Index(fields=['fecha_envio', 'id'], name='core_logrecord_fecha_idx'),
+        ]
     
     def __str__(self):
         return f"{self.evento.titulo} - {self.canal} - {self.fecha_envio.strftime('%d/%m/%Y %H:%M')}"
+
+
+class Job(models.Model):
+    """
+    Trabajo en segundo plano (generación de PDFs) procesado por `manage.py run_pdf_worker`.
+    Guarda la vista a ejecutar y los datos de la petición original para reproducirla fuera de gunicorn.
+    """
+    PENDING = 'pending'
+    RUNNING = 'running'
+    DONE = 'done'
+    FAILED = 'failed'
+    STATUS_CHOICES = [
+        (PENDING, 'Pendiente'),
+        (RUNNING, 'En proceso'),
+        (DONE, 'Completado'),
+        (FAILED, 'Fallido'),
+    ]
+
+    id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+    view = models.CharField(max_length=255, verbose_name="Vista")
+    args = models.JSONField(default=list, blank=True)
+    kwargs = models.JSONField(default=dict, blank=True)
+    query_string = models.TextField(blank=True, default='')
+    path = models.CharField(max_length=500, blank=True, default='')
+    host = models.CharField(max_length=255, blank=True, default='')
+    is_secure = models.BooleanField(default=False)
+    requested_by = models.ForeignKey(
+        'accounts.User', on_delete=models.CASCADE, related_name='jobs', verbose_name="Solicitado por"
+    )
+    status = models.CharField(max_length=10, choices=STATUS_CHOICES, default=PENDING, verbose_name="Estado")
+    attempts = models.PositiveSmallIntegerField(default=0)
+    result = models.FileField(upload_to='jobs/', blank=True, null=True)
+    filename = models.CharField(max_length=255, blank=True, default='')
+    content_type = models.CharField(max_length=100, blank=True, default='')
+    error = models.TextField(blank=True, default='')
+    created_at = models.DateTimeField(auto_now_add=True)
+    started_at = models.DateTimeField(null=True, blank=True)
+    finished_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        verbose_name = "Trabajo en segundo plano"
+        verbose_name_plural = "Trabajos en segundo plano"
+        ordering = ['-created_at']
+        indexes = [
+            models.Index(fields=['status', 'created_at'], name='core_job_status_created_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.view} ({self.get_status_display()})"
+
+    @property
+    def is_finished(self):
+        return self.status in (self.DONE, self.FAILED)
@@ -0,0 +1,235 @@
+"""
+Paginación por clave (keyset) para listados administrativos grandes
+En lugar de OFFSET, cada página filtra a partir de la última (o primera) fila
+de la página anterior sobre un orden indexado, por ejemplo ("-fecha_envio", "-pk").
+Una página profunda cuesta lo mismo que la primera. El cursor viaja en la URL
+(?cursor=...) y además guarda la posición de la página para mostrar "X - Y de N".
+"""
+import base64
+import binascii
+import datetime
+import json
+import math
+
+from django.core.exceptions import ValidationError
+from django.db import connections
+from django.db.models import Q
+from django.utils.functional import cached_property
+
+CURSOR_PARAM = "cursor"
+
+
+def _json_value(value):
+    # isoformat completo: DjangoJSONEncoder recorta los microsegundos y la comparación dejaría de ser exacta
+    if isinstance(value, (datetime.datetime, datetime.date, datetime.time)):
+        return value.isoformat()
+    if isinstance(value, (str, int, float, bool)) or value is None:
+        return value
+    return str(value)
+
+
+def estimated_count(queryset):
+    """
+    Conteo aproximado para tablas muy grandes: en PostgreSQL usa las filas estimadas
+    por el planificador (EXPLAIN) sin recorrer la tabla; en otros motores hace COUNT(*)
+    """
+    connection = connections[queryset.db]
+    if connection.vendor != "postgresql":
+        return queryset.count()
+    sql, params = queryset.order_by().values("pk").query.sql_with_params()
+    with connection.cursor() as cursor:
+        cursor.execute(f"EXPLAIN (FORMAT JSON) {sql}", params)
+        plan = cursor.fetchone()[0]
+    if isinstance(plan, str):
+        plan = json.loads(plan)
+    return int(plan[0]["Plan"]["Plan Rows"])
+
+
+class KeysetPage:
+    """Página de resultados con cursores hacia la siguiente y la anterior (interfaz similar a Page)"""
+
+    def __init__(self, object_list, paginator, start_index, next_cursor, previous_cursor):
+        self.object_list = object_list
+        self.paginator = paginator
+        self._start_index = start_index
+        self.next_cursor = next_cursor
+        self.previous_cursor = previous_cursor
+
+    def __repr__(self):
+        return f"<Keyset page starting at {self._start_index}>"
+
+    def __len__(self):
+        return len(self.object_list)
+
+    def __iter__(self):
+        return iter(self.object_list)
+
+    def __getitem__(self, index):
+        return self.object_list[index]
+
+    def has_next(self):
+        return self.next_cursor is not None
+
+    def has_previous(self):
+        return self.previous_cursor is not None
+
+    def has_other_pages(self):
+        return self.has_next() or self.has_previous()
+
+    @property
+    def number(self):
+        return (self._start_index - 1) // self.paginator.per_page + 1
+
+    def start_index(self):
+        return self._start_index if self.object_list else 0
+
+    def end_index(self):
+        return self._start_index + len(self.object_list) - 1 if self.object_list else 0
+
+
+class KeysetPaginator:
+    """
+    ordering: campos del orden, el último debe ser único (normalmente "pk" o "-pk").
+    Los campos no pueden ser nulos; para fechas opcionales usar una anotación con Coalesce.
+    count: "exact" (COUNT(*)), "estimate" (estimated_count), None (sin total)
+    o una función que devuelve el total.
+    """
+
+    def __init__(self, queryset, ordering, per_page, count="exact"):
+        self.queryset = queryset
+        self.keys = [(name.lstrip("-"), name.startswith("-")) for name in ordering]
+        self.per_page = int(per_page)
+        self.count_mode = count
+
+    @cached_property
+    def count(self):
+        if self.count_mode is None:
+            return None
+        if callable(self.count_mode):
+            return self.count_mode()
+        if self.count_mode == "estimate":
+            return estimated_count(self.queryset)
+        return self.queryset.count()
+
+    @property
+    def count_is_estimate(self):
+        return self.count_mode == "estimate"
+
+    @property
+    def num_pages(self):
+        if self.count is None:
+            return None
+        return max(1, math.ceil(self.count / self.per_page))
+
+    def page(self, cursor=None):
+        """Página a partir de un cursor de la URL; un cursor ausente o inválido devuelve la primera"""
+        position = self._decode(cursor) if cursor else None
+        if position is None:
+            return self._page_after(None, 1)
+        values, backwards, start_index = position
+        if backwards:
+            return self._page_before(values, start_index)
+        return self._page_after(values, start_index)
+
+    def _page_after(self, values, start_index):
+        queryset = self._ordered(reverse=False)
+        if values is not None:
+            queryset = queryset.filter(self._beyond(values, reverse=False))
+        rows = list(queryset[: self.per_page + 1])
+        has_next = len(rows) > self.per_page
+        rows = rows[: self.per_page]
+        next_cursor = (
+            self._encode(rows[-1], False, start_index + len(rows)) if has_next else None
+        )
+        previous_cursor = (
+            self._encode(rows[0], True, max(1, start_index - self.per_page))
+            if values is not None and rows
+            else None
+        )
+        return KeysetPage(rows, self, start_index, next_cursor, previous_cursor)
+
+    def _page_before(self, values, start_index):
+        queryset = self._ordered(reverse=True).filter(self._beyond(values, reverse=True))
+        rows = list(queryset[: self.per_page + 1])
+        if len(rows) <= self.per_page:
+            # Se llegó al inicio: mostrar la primera página completa
+            return self._page_after(None, 1)
+        rows = rows[: self.per_page][::-1]
+        return KeysetPage(
+            rows,
+            self,
+            start_index,
+            self._encode(rows[-1], False, start_index + len(rows)),
+            self._encode(rows[0], True, max(1, start_index - self.per_page)),
+        )
+
+    def _ordered(self, reverse):
+        return self.queryset.order_by(
+            *[("-" if descending != reverse else "") + name for name, descending in self.keys]
+        )
+
+    def _beyond(self, values, reverse):
+        """Filas estrictamente posteriores a values en el orden (o anteriores si reverse)"""
+        condition = Q()
+        for index, (name, descending) in enumerate(self.keys):
+            lookup = "lt" if descending != reverse else "gt"
+            equal = {key: value for (key, _), value in zip(self.keys[:index], values)}
+            condition |= Q(**equal, **{f"{name}__{lookup}": values[index]})
+        return condition
+
+    def _encode(self, obj, backwards, start_index):
+        payload = {
+            "k": [_json_value(self._value(obj, name)) for name, _ in self.keys],
+            "b": backwards,
+            "i": start_index,
+        }
+        data = json.dumps(payload, separators=(",", ":")).encode()
+        return base64.urlsafe_b64encode(data).decode().rstrip("=")
+
+    def _decode(self, cursor):
+        try:
+            padded = cursor + "=" * (-len(cursor) % 4)
+            payload = json.loads(base64.urlsafe_b64decode(padded.encode()))
+            raw_values = payload["k"]
+            if len(raw_values) != len(self.keys):
+                return None
+            values = [
+                self._field(name).to_python(value)
+                for (name, _), value in zip(self.keys, raw_values)
+            ]
+            return values, bool(payload["b"]), max(1, int(payload["i"]))
+        except (binascii.Error, ValidationError, ValueError, TypeError, KeyError):
+            # Cursor manipulado o de otro listado
+            return None
+
+    @staticmethod
+    def _value(obj, name):
+        if name == "pk":
+            return obj.pk
+        for part in name.split("__"):
+            obj = getattr(obj, part)
+        return obj
+
+    def _field(self, name):
+        annotation = self.queryset.query.annotations.get(name)
+        if annotation is not None:
+            return annotation.output_field
+        model = self.queryset.model
+        if name == "pk":
+            return model._meta.pk
+        parts = name.split("__")
+        for part in parts[:-1]:
+            model = model._meta.get_field(part).related_model
+        return model._meta.get_field(parts[-1])
+
+
+class KeysetPaginationMixin:
+    """Para ListView/FilterView: reemplaza la paginación por OFFSET por la de cursores"""
+
+    keyset_ordering = ("-pk",)
+    keyset_count = "exact"
+
+    def paginate_queryset(self, queryset, page_size):
+        paginator = KeysetPaginator(queryset, self.keyset_ordering, page_size, count=self.keyset_count)
+        page = paginator.page(self.request.GET.get(CURSOR_PARAM))
+        return paginator, page, page.object_list, page.has_other_pages()
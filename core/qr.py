@@ -0,0 +1,60 @@
+"""
+Motor de códigos QR compartido por los certificados y el generador de QR
+La matriz de módulos se calcula una vez por texto (LRU) y se dibuja directamente
+como vectores sobre el canvas de reportlab o se escala a imagen PIL.
+"""
+from functools import lru_cache
+
+import qrcode
+from PIL import Image
+
+# Cada certificado tiene su propia URL; el límite sólo evita crecer sin control
+QR_MATRIX_CACHE_SIZE = 2048
+
+
+@lru_cache(maxsize=QR_MATRIX_CACHE_SIZE)
+def qr_matrix(data, error_correction=qrcode.constants.ERROR_CORRECT_M, border=4):
+    """Matriz de módulos (incluye el margen) como tupla de filas de booleanos"""
+    qr = qrcode.QRCode(error_correction=error_correction, border=border)
+    qr.add_data(data)
+    qr.make(fit=True)
+    return tuple(tuple(row) for row in qr.get_matrix())
+
+
+def draw_qr(canvas, data, x, y, size, **options):
+    """
+    Dibuja el QR en (x, y) con lado `size` puntos como un único trazado relleno.
+    Los módulos contiguos de cada fila se unen en un solo rectángulo.
+    """
+    matrix = qr_matrix(data, **options)
+    module = size / len(matrix)
+
+    canvas.saveState()
+    canvas.setFillColorRGB(1, 1, 1)
+    canvas.rect(x, y, size, size, stroke=0, fill=1)
+
+    path = canvas.beginPath()
+    for row_index, row in enumerate(matrix):
+        row_y = y + size - (row_index + 1) * module
+        start = None
+        for col_index, dark in enumerate(row + (False,)):
+            if dark and start is None:
+                start = col_index
+            elif not dark and start is not None:
+                path.rect(x + start * module, row_y, (col_index - start) * module, module)
+                start = None
+    canvas.setFillColorRGB(0, 0, 0)
+    canvas.drawPath(path, stroke=0, fill=1)
+    canvas.restoreState()
+
+
+def qr_image(data, box_size=10, size=None, **options):
+    """Imagen PIL en blanco y negro del QR; `size` la reescala al lado indicado en píxeles"""
+    matrix = qr_matrix(data, **options)
+    modules = len(matrix)
+    image = Image.new('1', (modules, modules))
+    image.putdata([0 if dark else 1 for row in matrix for dark in row])
+    image = image.resize((modules * box_size, modules * box_size), Image.NEAREST)
+    if size and size != image.width:
+        image = image.resize((size, size), Image.NEAREST)
+    return image
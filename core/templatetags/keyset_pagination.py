@@ -0,0 +1,16 @@
+from django import template
+
+from core.pagination import CURSOR_PARAM
+
+register = template.Library()
+
+
+@register.simple_tag(takes_context=True)
+def cursor_url(context, cursor):
+    """Query string actual con el cursor reemplazado; conserva los filtros del listado"""
+    params = context["request"].GET.copy()
+    params.pop("page", None)
+    params.pop(CURSOR_PARAM, None)
+    if cursor:
+        params[CURSOR_PARAM] = cursor
+    return f"?{params.urlencode()}"
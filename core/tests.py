@@ -1,3 +1,283 @@
-from django.test import TestCase
+import io
+import shutil
+import tempfile
+from datetime import timedelta
 
-# Create your tests here.
+import qrcode
+
+from django.contrib.auth import get_user_model
+from django.core.cache import caches
+from django.core.management import call_command
+from django.http import Http404
+from django.db import connection, transaction
+from django.template import Context, Template
+from django.test import RequestFactory, TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+
+from core.cache_tiers import TieredCache
+from core.cache_versions import VersionedCache, course_scope, user_scope
+from core.jobs import claim_next_job, requeue_stale_jobs
+from core.models import Job
+from core.pagination import KeysetPaginator
+from core.qr import qr_image, qr_matrix
+from core.views import generate_qr_code, job_status_view
+
+User = get_user_model()
+
+
+class PdfJobQueueTests(TestCase):
+    def setUp(self):
+        media_root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, media_root)
+        settings_override = override_settings(MEDIA_ROOT=media_root, PDF_JOBS_ASYNC=True)
+        settings_override.enable()
+        self.addCleanup(settings_override.disable)
+
+        self.admin = User.objects.create_superuser(
+            username="admin", email="admin@example.com", password="password",
+            accepted_terms_at=timezone.now(), accepted_privacy_at=timezone.now(),
+        )
+        self.client.force_login(self.admin)
+
+    def run_worker(self):
+        call_command("run_pdf_worker", burst=True, stdout=io.StringIO())
+
+    def test_view_enqueues_instead_of_rendering(self):
+        response = self.client.get(reverse("lecturer_list_pdf"))
+        job = Job.objects.get()
+        self.assertRedirects(response, reverse("job_status", kwargs={"pk": job.pk}))
+        self.assertEqual(job.status, Job.PENDING)
+        self.assertEqual(job.view, "accounts.views.lecturer_list_pdf")
+
+    def test_worker_builds_pdf_and_status_endpoint_exposes_download(self):
+        self.client.get(reverse("lecturer_list_pdf"))
+        self.run_worker()
+
+        job = Job.objects.get()
+        self.assertEqual(job.status, Job.DONE, job.error)
+        self.assertEqual(job.filename, "lista_instructores_gpd.pdf")
+
+        status = self.client.get(reverse("job_status", kwargs={"pk": job.pk}), {"format": "json"}).json()
+        self.assertEqual(status["status"], Job.DONE)
+        download = self.client.get(status["download_url"])
+        self.assertTrue(b"".join(download.streaming_content).startswith(b"%PDF"))
+
+    def test_other_users_cannot_see_the_job(self):
+        self.client.get(reverse("lecturer_list_pdf"))
+        job = Job.objects.get()
+        other = User.objects.create_user(
+            username="other", password="password",
+            accepted_terms_at=timezone.now(), accepted_privacy_at=timezone.now(),
+        )
+        request = RequestFactory().get(reverse("job_status", kwargs={"pk": job.pk}))
+        request.user = other
+        with self.assertRaises(Http404):
+            job_status_view(request, pk=job.pk)
+
+    def test_failed_view_marks_job_failed(self):
+        Job.objects.create(view="core.views.no_existe", requested_by=self.admin)
+        self.run_worker()
+        job = Job.objects.get()
+        self.assertEqual(job.status, Job.FAILED)
+        self.assertIn("no_existe", job.error)
+
+    @override_settings(PDF_JOBS_ASYNC=False)
+    def test_inline_rendering_when_async_disabled(self):
+        response = self.client.get(reverse("lecturer_list_pdf"))
+        self.assertEqual(response["Content-Type"], "application/pdf")
+        self.assertFalse(Job.objects.exists())
+
+    def test_job_is_claimed_only_once(self):
+        Job.objects.create(view="core.views.no_existe", requested_by=self.admin)
+        self.assertIsNotNone(claim_next_job())
+        self.assertIsNone(claim_next_job())
+
+    @override_settings(PDF_JOB_TIMEOUT=60, PDF_JOB_MAX_ATTEMPTS=3)
+    def test_stale_running_job_is_requeued(self):
+        job = Job.objects.create(
+            view="core.views.no_existe", requested_by=self.admin, status=Job.RUNNING,
+            started_at=timezone.now() - timedelta(minutes=5), attempts=1,
+        )
+        self.assertEqual(requeue_stale_jobs(), (1, 0))
+        job.refresh_from_db()
+        self.assertEqual(job.status, Job.PENDING)
+
+
+class QrEngineTests(TestCase):
+    url = "https://example.com/quiz/verificar-certificado/C01-IPERC-001/"
+
+    def test_matrix_is_memoized_per_text(self):
+        qr_matrix.cache_clear()
+        first = qr_matrix(self.url)
+        self.assertIs(qr_matrix(self.url), first)
+        self.assertEqual(qr_matrix.cache_info().hits, 1)
+
+    def test_image_matches_matrix(self):
+        matrix = qr_matrix(self.url)
+        image = qr_image(self.url, box_size=3)
+        self.assertEqual(image.size, (len(matrix) * 3, len(matrix) * 3))
+        for row in (0, 4, len(matrix) // 2):
+            for col in (0, 4, len(matrix) // 2):
+                self.assertEqual(image.getpixel((col * 3 + 1, row * 3 + 1)) == 0, matrix[row][col])
+
+    def test_generate_qr_code_keeps_natural_size_for_default(self):
+        modules = len(qr_matrix("texto", error_correction=qrcode.constants.ERROR_CORRECT_L))
+        self.assertEqual(generate_qr_code("texto").size, (modules * 10, modules * 10))
+        self.assertEqual(generate_qr_code("texto", size=300).size, (300, 300))
+
+
+class KeysetPaginatorTests(TestCase):
+    def setUp(self):
+        User = get_user_model()
+        joined = timezone.now()
+        for index in range(25):
+            # Fechas repetidas de a tres: el desempate lo hace el pk
+            User.objects.create_user(
+                username=f"user{index:02d}", password="x", date_joined=joined - timedelta(days=index // 3)
+            )
+        self.users = User.objects.all()
+        self.expected = list(self.users.order_by("-date_joined", "-pk").values_list("pk", flat=True))
+
+    def paginator(self, count="exact"):
+        return KeysetPaginator(self.users, ("-date_joined", "-pk"), 10, count=count)
+
+    def test_forward_and_backward_pages_follow_the_ordering(self):
+        paginator = self.paginator()
+        first = paginator.page()
+        second = paginator.page(first.next_cursor)
+        third = paginator.page(second.next_cursor)
+
+        walked = [user.pk for page in (first, second, third) for user in page]
+        self.assertEqual(walked, self.expected)
+        self.assertEqual((third.number, third.start_index(), third.end_index()), (3, 21, 25))
+        self.assertFalse(third.has_next())
+        self.assertEqual(paginator.num_pages, 3)
+
+        back = paginator.page(third.previous_cursor)
+        self.assertEqual([user.pk for user in back], self.expected[10:20])
+        self.assertEqual(back.number, 2)
+        self.assertEqual([user.pk for user in paginator.page(back.previous_cursor)], self.expected[:10])
+
+    def test_deep_pages_filter_by_key_instead_of_offset(self):
+        paginator = self.paginator(count=None)
+        cursor = paginator.page().next_cursor
+        with CaptureQueriesContext(connection) as queries:
+            page = paginator.page(paginator.page(cursor).next_cursor)
+        self.assertEqual(len(page), 5)
+        self.assertEqual(len(queries), 2)
+        self.assertFalse(any("OFFSET" in query["sql"] for query in queries))
+
+    def test_invalid_cursor_returns_the_first_page(self):
+        paginator = self.paginator()
+        for cursor in ("basura", "eyJrIjpbMV19", ""):
+            page = paginator.page(cursor)
+            self.assertEqual([user.pk for user in page], self.expected[:10])
+            self.assertFalse(page.has_previous())
+
+    def test_estimated_count_falls_back_to_count_outside_postgresql(self):
+        paginator = self.paginator(count="estimate")
+        self.assertEqual(paginator.count, 25)
+        self.assertTrue(paginator.count_is_estimate)
+
+    def test_cursor_url_keeps_the_list_filters(self):
+        request = RequestFactory().get("/", {"q": "juan", "page": "3", "cursor": "viejo"})
+        rendered = Template("{% load keyset_pagination %}{% cursor_url 'nuevo' %}").render(
+            Context({"request": request})
+        )
+        self.assertEqual(rendered, "?q=juan&amp;cursor=nuevo")
+
+
+class VersionedCacheTests(TestCase):
+    BACKENDS = ("locmem", "db", "file")
+
+    def setUp(self):
+        file_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, file_dir, ignore_errors=True)
+        backends = self.settings(CACHES={
+            "default": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache"},
+            "locmem": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache", "LOCATION": "versiones"},
+            "db": {"BACKEND": "django.core.cache.backends.db.DatabaseCache", "LOCATION": "cache_versiones"},
+            "file": {"BACKEND": "django.core.cache.backends.filebased.FileBasedCache", "LOCATION": file_dir},
+        })
+        backends.enable()
+        self.addCleanup(backends.disable)
+        call_command("createcachetable", database="default", verbosity=0)
+
+    def each_backend(self):
+        for alias in self.BACKENDS:
+            caches[alias].clear()
+            with self.subTest(backend=alias):
+                yield VersionedCache(alias)
+
+    def test_bumping_a_scope_invalidates_only_its_dependent_keys(self):
+        for versioned in self.each_backend():
+            versioned.set("progreso", "usuario 1", 60, [user_scope(1), course_scope(7)])
+            versioned.set("progreso_otro", "usuario 2", 60, [user_scope(2)])
+            self.assertEqual(versioned.get("progreso", [user_scope(1), course_scope(7)], "progreso"), "usuario 1")
+
+            versioned.bump(course_scope(7))
+            self.assertIsNone(versioned.get("progreso", [user_scope(1), course_scope(7)], "progreso"))
+            self.assertEqual(versioned.get("progreso_otro", [user_scope(2)], "progreso"), "usuario 2")
+            self.assertEqual(versioned.get_or_set("progreso_otro", lambda: "nuevo", 60, [user_scope(2)], "progreso"), "usuario 2")
+
+    def test_lost_version_counter_does_not_revive_old_keys(self):
+        for versioned in self.each_backend():
+            versioned.set("resumen", "viejo", 60, ["certificates"])
+            versioned.bump("certificates")
+            versioned.cache.delete(versioned._version_key("certificates"))
+            self.assertIsNone(versioned.get("resumen", ["certificates"], "resumen"))
+
+    def test_bump_inside_a_transaction_is_repeated_on_commit(self):
+        versioned = VersionedCache("locmem")
+        with self.captureOnCommitCallbacks(execute=True):
+            with transaction.atomic():
+                versioned.bump("certificates")
+                # Otro proceso lee datos previos al commit y los guarda con la versión nueva
+                versioned.set("resumen", "previo al commit", 60, ["certificates"])
+        self.assertIsNone(versioned.get("resumen", ["certificates"], "resumen"))
+
+
+class TieredCacheTests(TestCase):
+    def setUp(self):
+        self.tiered = TieredCache("default", max_entries=2, local_timeout=60)
+        self.tiered.shared.clear()
+
+    def test_reads_fall_back_to_the_shared_tier_and_fill_the_local_one(self):
+        self.tiered.set("a", {"valor": 1}, 300)
+        self.tiered.local.clear()  # otro worker: solo tiene la caché compartida
+
+        self.assertEqual(self.tiered.get("a", "prueba"), {"valor": 1})
+        self.tiered.shared.delete("a")
+        value = self.tiered.get("a", "prueba")
+        value["valor"] = 2  # los valores locales no se comparten entre lecturas
+        self.assertEqual(self.tiered.get("a", "prueba"), {"valor": 1})
+        self.assertIsNone(self.tiered.get("b", "prueba"))
+        self.assertEqual(
+            self.tiered.local_stats(), {"prueba": {"local_hits": 2, "shared_hits": 1, "misses": 1}}
+        )
+
+    def test_local_tier_evicts_the_least_recently_used_entry(self):
+        for key in ("a", "b"):
+            self.tiered.set(key, key, 300)
+        self.tiered.get("a", "prueba")
+        self.tiered.set("c", "c", 300)
+        self.assertEqual(len(self.tiered.local), 2)
+        self.assertIsNone(self.tiered.local.get("b"))
+        self.assertEqual(self.tiered.local.get("a"), "a")
+
+    def test_stats_are_accumulated_in_the_shared_tier(self):
+        self.tiered.get("a", "prueba")
+        self.tiered.flush_stats()
+        self.tiered.set("a", 1, 300)
+        self.tiered.get("a", "prueba")
+        self.tiered.flush_stats()
+        self.assertEqual(
+            self.tiered.shared_stats(), {"prueba": {"local_hits": 1, "shared_hits": 0, "misses": 1}}
+        )
+
+        out = io.StringIO()
+        call_command("cache_stats", "--reset", stdout=out)
+        self.assertIn("prueba", out.getvalue())
+        self.assertEqual(self.tiered.shared_stats(), {})
@@ -30,6 +30,8 @@ from .views import (
     evento_detail_view,
     logs_recordatorios_view,
     enviar_recordatorios_manual_view,
+    job_status_view,
+    job_download_view,
 )
 
 
@@ -67,4 +69,8 @@ urlpatterns = [
     path("calendario/evento/<int:pk>/", evento_detail_view, name="evento_detail"),
     path("calendario/logs/", logs_recordatorios_view, name="logs_recordatorios"),
     path("calendario/enviar-recordatorios/", enviar_recordatorios_manual_view, name="enviar_recordatorios_manual"),
+
+    # Trabajos en segundo plano (PDFs)
+    path("jobs/<uuid:pk>/", job_status_view, name="job_status"),
+    path("jobs/<uuid:pk>/download/", job_download_view, name="job_download"),
 ]
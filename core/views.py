@@ -3,7 +3,8 @@ from django.contrib import messages
 from django.contrib.auth.decorators import login_required
 from django import forms
 from django.db import transaction
-from django.http import HttpResponse, HttpResponseNotAllowed, FileResponse
+from django.http import HttpResponse, HttpResponseNotAllowed, FileResponse, Http404, JsonResponse
+from django.urls import reverse
 from reportlab.pdfgen import canvas
 from reportlab.lib.pagesizes import letter, A4
 from reportlab.lib import colors
@@ -12,7 +13,6 @@ from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
 from reportlab.platypus import Paragraph
 from io import BytesIO
 from datetime import datetime
-from django.core.paginator import Paginator, PageNotAnInteger, EmptyPage
 import io
 from django.template.loader import render_to_string
 from django.utils import timezone
@@ -30,7 +30,10 @@ import math
 from accounts.decorators import admin_required, lecturer_required
 from accounts.models import User, Student
 from .forms import SessionForm, SemesterForm, NewsAndEventsForm, CotizacionForm, ItemCotizacionFormSet, EventoForm, FiltroEventoForm
-from .models import NewsAndEvents, ActivityLog, Session, Semester, Cotizacion, ItemCotizacion, HistorialEstado, Evento, LogRecordatorio
+from .pagination import CURSOR_PARAM, KeysetPaginator
+from .models import NewsAndEvents, ActivityLog, Session, Semester, Cotizacion, ItemCotizacion, HistorialEstado, Evento, LogRecordatorio, Job
+from .jobs import background_pdf
+from .qr import qr_image
 
 
 def generate_qr_code(data, size=150, format='PNG'):
@@ -39,64 +42,19 @@ def generate_qr_code(data, size=150, format='PNG'):
     
     Args:
         data (str): Los datos a codificar en el QR
-        size (int): Tamaño del código QR en píxeles
+        size (int): Tamaño del código QR en píxeles (150 = tamaño natural)
         format (str): Formato de salida ('PNG', 'JPEG', 'PDF')
     
     Returns:
         PIL.Image: Imagen del código QR
     """
-    try:
-        # Crear el código QR
-        qr = qrcode.QRCode(
-            version=1,
-            error_correction=qrcode.constants.ERROR_CORRECT_L,
-            box_size=10,
-            border=4,
-        )
-        qr.add_data(data)
-        qr.make(fit=True)
-        
-        # Crear la imagen
-        qr_image = qr.make_image(fill_color="black", back_color="white")
-        
-        # Redimensionar si es necesario
-        if size != 150:
-            try:
-                # Para versiones más nuevas de PIL
-                qr_image = qr_image.resize((size, size), Image.Resampling.LANCZOS)
-            except AttributeError:
-                try:
-                    # Para versiones más antiguas de PIL
-                    qr_image = qr_image.resize((size, size), Image.LANCZOS)
-                except AttributeError:
-                    # Fallback para versiones muy antiguas
-                    qr_image = qr_image.resize((size, size))
-        
-        return qr_image
-    except Exception as e:
-        print(f"ERROR en generate_qr_code: {e}")
-        # En caso de error, crear un QR básico
-        qr = qrcode.QRCode(
-            version=1,
-            error_correction=qrcode.constants.ERROR_CORRECT_L,
-            box_size=10,
-            border=4,
-        )
-        qr.add_data(data)
-        qr.make(fit=True)
-        qr_image = qr.make_image(fill_color="black", back_color="white")
-        
-        # Redimensionar si es necesario
-        if size != 150:
-            try:
-                qr_image = qr_image.resize((size, size), Image.Resampling.LANCZOS)
-            except AttributeError:
-                try:
-                    qr_image = qr_image.resize((size, size), Image.LANCZOS)
-                except AttributeError:
-                    qr_image = qr_image.resize((size, size))
-        
-        return qr_image
+    # Mismo motor (y caché de matrices) que los certificados
+    return qr_image(
+        data,
+        box_size=10,
+        size=None if size == 150 else size,
+        error_correction=qrcode.constants.ERROR_CORRECT_L,
+    )
 
 
 # ########################################################
@@ -303,7 +261,7 @@ def unset_current_semester():
 @login_required
 def cotizaciones_list_view(request):
     """Lista de cotizaciones con filtros y paginación"""
-    cotizaciones = Cotizacion.objects.all().order_by('-cotizacion')
+    cotizaciones = Cotizacion.objects.all()
     
     # Filtros
     estado = request.GET.get('estado')
@@ -323,15 +281,10 @@ def cotizaciones_list_view(request):
     if numero_cotizacion:
         cotizaciones = cotizaciones.filter(cotizacion__icontains=numero_cotizacion)
     
-    # Paginación
-    paginator = Paginator(cotizaciones, 10)  # 10 items por página
-    page = request.GET.get('page')
-    try:
-        cotizaciones = paginator.page(page)
-    except PageNotAnInteger:
-        cotizaciones = paginator.page(1)
-    except EmptyPage:
-        cotizaciones = paginator.page(paginator.num_pages)
+    # Paginación por cursor sobre (fecha_creacion, id); el número de cotización es texto
+    # y no sirve como clave de orden estable
+    paginator = KeysetPaginator(cotizaciones, ('-fecha_creacion', '-pk'), 10)  # 10 items por página
+    cotizaciones = paginator.page(request.GET.get(CURSOR_PARAM))
     
     context = {
         'cotizaciones': cotizaciones,
@@ -530,6 +483,7 @@ def cotizacion_change_status_view(request, pk):
 
 
 @login_required
+@background_pdf
 def cotizacion_download_pdf(request, pk):
     """Generar y descargar PDF de la cotización con flowables y paginación automática"""
     from reportlab.platypus import SimpleDocTemplate, Table, TableStyle, Paragraph, Spacer, Image
@@ -1029,18 +983,15 @@ def evento_detail_view(request, pk):
 @admin_required
 def logs_recordatorios_view(request):
     """Ver logs de recordatorios enviados"""
-    logs = LogRecordatorio.objects.all().order_by('-fecha_envio')
+    logs = LogRecordatorio.objects.select_related('evento')
     
-    # Paginación
-    paginator = Paginator(logs, 20)
-    page = request.GET.get('page')
-    try:
-        logs_paginados = paginator.page(page)
-    except (PageNotAnInteger, EmptyPage):
-        logs_paginados = paginator.page(1)
+    # Paginación por cursor; la tabla crece sin límite, así que el total es estimado
+    paginator = KeysetPaginator(logs, ('-fecha_envio', '-pk'), 20, count="estimate")
+    logs_paginados = paginator.page(request.GET.get(CURSOR_PARAM))
     
     context = {
         'logs': logs_paginados,
+        'total_logs': paginator.count,
         'titulo': 'Logs de Recordatorios'
     }
     return render(request, 'core/logs_recordatorios.html', context)
@@ -1069,3 +1020,39 @@ def enviar_recordatorios_manual_view(request):
     
     messages.success(request, f'Se enviaron {recordatorios_enviados} recordatorios.')
     return redirect('calendario')
+
+
+# ########################################################
+# Trabajos en segundo plano (PDFs)
+# ########################################################
+def _get_user_job(request, pk):
+    job = get_object_or_404(Job, pk=pk)
+    if job.requested_by_id != request.user.id and not request.user.is_superuser:
+        raise Http404
+    return job
+
+
+@login_required
+def job_status_view(request, pk):
+    """Estado de un trabajo: JSON para el polling de la UI o página de espera"""
+    job = _get_user_job(request, pk)
+    if request.GET.get('format') == 'json' or request.headers.get('x-requested-with') == 'XMLHttpRequest':
+        return JsonResponse({
+            'id': str(job.pk),
+            'status': job.status,
+            'status_display': job.get_status_display(),
+            'filename': job.filename,
+            'download_url': reverse('job_download', kwargs={'pk': job.pk}) if job.status == Job.DONE else None,
+            'error': job.error.strip().splitlines()[-1] if job.status == Job.FAILED and job.error else '',
+        })
+    return render(request, 'core/job_status.html', {'job': job, 'title': 'Generando documento'})
+
+
+@login_required
+def job_download_view(request, pk):
+    job = _get_user_job(request, pk)
+    if job.status != Job.DONE or not job.result:
+        raise Http404
+    return FileResponse(
+        job.result.open('rb'), as_attachment=True, filename=job.filename, content_type=job.content_type,
+    )
@@ -0,0 +1,108 @@
+# Generated by Django 4.2 on 2026-10-18 07:19
+
+from django.conf import settings
+import django.core.validators
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ("course", "0010_alter_uploadvideo_youtube_url_videocompletion_and_more"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="course",
+            name="is_external",
+            field=models.BooleanField(
+                default=False,
+                help_text="Indica si este es un curso externo (certificado en Google Drive)",
+                verbose_name="Curso Externo",
+            ),
+        ),
+        migrations.AddField(
+            model_name="upload",
+            name="external_url",
+            field=models.URLField(
+                blank=True,
+                help_text="URL externa del archivo (ej: Google Drive, Dropbox, etc.)",
+                max_length=500,
+                null=True,
+            ),
+        ),
+        migrations.AlterField(
+            model_name="course",
+            name="slug",
+            field=models.SlugField(blank=True, max_length=200, unique=True),
+        ),
+        migrations.AlterField(
+            model_name="upload",
+            name="file",
+            field=models.FileField(
+                blank=True,
+                help_text="Valid Files: pdf, docx, doc, xls, xlsx, ppt, pptx, zip, rar, 7zip",
+                null=True,
+                upload_to="course_files/",
+                validators=[
+                    django.core.validators.FileExtensionValidator(
+                        [
+                            "pdf",
+                            "docx",
+                            "doc",
+                            "xls",
+                            "xlsx",
+                            "ppt",
+                            "pptx",
+                            "zip",
+                            "rar",
+                            "7zip",
+                        ]
+                    )
+                ],
+            ),
+        ),
+        migrations.CreateModel(
+            name="DocumentCompletion",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                (
+                    "completed_at",
+                    models.DateTimeField(
+                        auto_now_add=True, verbose_name="Completado el"
+                    ),
+                ),
+                (
+                    "document",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        to="course.upload",
+                        verbose_name="Documento",
+                    ),
+                ),
+                (
+                    "user",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        to=settings.AUTH_USER_MODEL,
+                        verbose_name="Usuario",
+                    ),
+                ),
+            ],
+            options={
+                "verbose_name": "Finalización de Documento",
+                "verbose_name_plural": "Finalizaciones de Documentos",
+                "unique_together": {("user", "document")},
+            },
+        ),
+    ]
@@ -8,6 +8,7 @@ from django.dispatch import receiver
 from django.urls import reverse
 from django.utils.translation import gettext_lazy as _
 
+from core.cache_versions import course_scope, versioned_cache
 from core.models import ActivityLog, Semester
 from core.utils import unique_slug_generator
 from django.contrib.auth.models import User
@@ -182,12 +183,10 @@ class Course(models.Model):
             return 'material_in_progress'
         
         # Material completado, verificar examen
-        approved_sitting = Sitting.objects.filter(
+        approved_sitting = Sitting.objects.approved().filter(
             user=user,
             quiz=quiz,
             course=self,
-            complete=True,
-            current_score__gte=quiz.pass_mark * quiz.get_max_score / 100
         ).first()
         
         if approved_sitting:
@@ -896,6 +895,15 @@ def log_uploadvideo_delete(sender, instance, **kwargs):
     )
 
 
+@receiver(post_save, sender=Upload)
+@receiver(post_delete, sender=Upload)
+@receiver(post_save, sender=UploadVideo)
+@receiver(post_delete, sender=UploadVideo)
+def course_content_cache_receiver(sender, instance, **kwargs):
+    # Crear, editar, reordenar o eliminar contenido cambia la estructura cacheada del curso
+    versioned_cache.bump(course_scope(instance.course_id))
+
+
 class VideoCompletion(models.Model):
     user = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE)
     video = models.ForeignKey(UploadVideo, on_delete=models.CASCADE)
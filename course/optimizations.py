@@ -2,9 +2,9 @@
 Optimizaciones de rendimiento para el sistema de cursos
 Mantiene la funcionalidad exacta pero con consultas optimizadas
 """
-from django.db.models import Count, Exists, OuterRef, Q, Prefetch
-from django.core.cache import cache
+from django.db.models import CharField, Count, Exists, OuterRef, Q, Prefetch, Value
 from django.conf import settings
+from core.cache_versions import course_scope, user_scope, versioned_cache
 from .models import Course, UploadVideo, Upload, VideoCompletion, DocumentCompletion
 from quiz.models import Quiz, Sitting
 
@@ -123,14 +123,14 @@ class CourseOptimizations:
         quizzes = Quiz.objects.filter(
             course_id__in=course_ids,
             draft=False
-        ).select_related('course').prefetch_related('question_set')
+        ).select_related('course')
         
         quiz_data = {}
         for quiz in quizzes:
             quiz_data[quiz.course_id] = {
                 'id': quiz.id,
                 'pass_mark': quiz.pass_mark,
-                'max_score': quiz.get_max_score
+                'max_score': quiz.question_count
             }
         
         # Obtener sittings aprobados de todos los cursos
@@ -215,7 +215,7 @@ class CourseOptimizations:
         quizzes = Quiz.objects.filter(
             course_id__in=course_ids,
             draft=False
-        ).select_related('course').prefetch_related('question_set')
+        ).select_related('course')
         
         quiz_data = {}
         for quiz in quizzes:
@@ -224,7 +224,7 @@ class CourseOptimizations:
                 'pass_mark': quiz.pass_mark,
                 'title': quiz.title,
                 'single_attempt': quiz.single_attempt,
-                'max_score': quiz.get_max_score
+                'max_score': quiz.question_count
             }
         
         # Obtener todos los sittings de los cursos
@@ -343,45 +343,26 @@ class CourseUnifiedNavigation:
     Clase para manejar la navegación unificada entre videos y documentos
     """
     
+    @staticmethod
+    def get_related_document(video):
+        """Documento en el mismo índice que el video (según la estructura cacheada del curso)"""
+        for content in CourseUnifiedNavigation.get_course_skeleton(video.course):
+            if content['type'] == 'document' and content['related_video_id'] == video.id:
+                return content['object']
+        return None
+    
     @staticmethod
     def sync_document_completion_when_video_completed(user, video):
         """
         Marca automáticamente como completado el documento relacionado cuando se completa un video
         Mantiene la sincronización entre videos y documentos por índice
         """
-        from .models import DocumentCompletion
-        
-        # Obtener todos los videos del curso ordenados
-        course_videos = UploadVideo.objects.filter(course=video.course).order_by('order', 'timestamp')
-        videos_list = list(course_videos)
-        
-        # Encontrar el índice del video completado
-        try:
-            video_index = videos_list.index(video)
-        except ValueError:
-            return False  # Video no encontrado
+        related_document = CourseUnifiedNavigation.get_related_document(video)
+        if related_document is None:
+            return False
         
-        # Obtener todos los documentos del curso ordenados
-        course_documents = Upload.objects.filter(course=video.course).order_by('upload_time')
-        documents_list = list(course_documents)
-        
-        # Verificar si hay un documento en el mismo índice
-        if video_index < len(documents_list):
-            related_document = documents_list[video_index]
-            
-            # Verificar si el documento ya está completado
-            if not DocumentCompletion.objects.filter(
-                user=user, 
-                document=related_document
-            ).exists():
-                # Marcar el documento como completado
-                DocumentCompletion.objects.get_or_create(
-                    user=user,
-                    document=related_document
-                )
-                return True
-        
-        return False
+        # Marcar el documento como completado si aún no lo está
+        return DocumentCompletion.objects.get_or_create(user=user, document=related_document)[1]
     
     @staticmethod
     def sync_document_incompletion_when_video_incompleted(user, video):
@@ -389,60 +370,27 @@ class CourseUnifiedNavigation:
         Desmarca automáticamente el documento relacionado cuando se desmarca un video
         Mantiene la sincronización inversa entre videos y documentos por índice
         """
-        from .models import DocumentCompletion
-        
-        # Obtener todos los videos del curso ordenados
-        course_videos = UploadVideo.objects.filter(course=video.course).order_by('order', 'timestamp')
-        videos_list = list(course_videos)
-        
-        # Encontrar el índice del video incompletado
-        try:
-            video_index = videos_list.index(video)
-        except ValueError:
-            return False  # Video no encontrado
+        related_document = CourseUnifiedNavigation.get_related_document(video)
+        if related_document is None:
+            return False
         
-        # Obtener todos los documentos del curso ordenados
-        course_documents = Upload.objects.filter(course=video.course).order_by('upload_time')
-        documents_list = list(course_documents)
-        
-        # Verificar si hay un documento en el mismo índice
-        if video_index < len(documents_list):
-            related_document = documents_list[video_index]
-            
-            # Verificar si el documento está completado
-            if DocumentCompletion.objects.filter(
-                user=user, 
-                document=related_document
-            ).exists():
-                # Desmarcar el documento como completado
-                DocumentCompletion.objects.filter(
-                    user=user,
-                    document=related_document
-                ).delete()
-                return True
-        
-        return False
+        # Desmarcar el documento como completado
+        deleted, _ = DocumentCompletion.objects.filter(user=user, document=related_document).delete()
+        return bool(deleted)
     
     @staticmethod
-    def get_unified_course_content(course, user):
+    def build_course_skeleton(course):
         """
-        Obtiene todo el contenido del curso (videos + documentos) en orden unificado
+        Contenido del curso (videos + documentos) en orden unificado, sin datos del usuario
         Mantiene la sincronización por índice: cada video va seguido de su documento correspondiente
         CORREGIDO: Evita duplicación de documentos
         """
-        videos = CourseOptimizations.get_optimized_videos_with_completion(course, user)
-        documents = CourseOptimizations.get_optimized_documents_with_completion(course, user)
-        
-        # Convertir a listas para acceso por índice
-        videos_list = list(videos)
-        documents_list = list(documents)
+        videos_list = list(UploadVideo.objects.filter(course=course).order_by("order", "timestamp"))
+        documents_list = list(Upload.objects.filter(course=course).order_by("upload_time"))
         
         # Crear lista unificada manteniendo la sincronización por índice
         unified_content = []
         
-        # Crear un set para rastrear documentos ya procesados
-        processed_document_ids = set()
-        
         # Procesar videos y sus documentos correspondientes
         for video_index, video in enumerate(videos_list):
             # Agregar el video
@@ -451,7 +399,6 @@ class CourseUnifiedNavigation:
                 'id': video.id,
                 'object': video,
                 'title': video.title,
-                'is_completed': getattr(video, 'is_completed', False),
                 'order': video.order,
                 'timestamp': video.timestamp,
                 'slug': getattr(video, 'slug', None),
@@ -466,38 +413,67 @@ class CourseUnifiedNavigation:
                     'id': doc.id,
                     'object': doc,
                     'title': doc.title,
-                    'is_completed': getattr(doc, 'is_completed', False),
                     'order': video.order + 0.5,  # Documento va después del video
                     'timestamp': doc.upload_time,
                     'slug': None,
                     'index': video_index,
                     'related_video_id': video.id  # Referencia al video relacionado
                 })
-                # Marcar este documento como procesado
-                processed_document_ids.add(doc.id)
         
         # Agregar SOLO documentos que no tienen video relacionado (después de todos los videos)
-        for doc_index, doc in enumerate(documents_list):
-            # Solo agregar si no fue procesado como documento relacionado
-            if doc.id not in processed_document_ids:
-                unified_content.append({
-                    'type': 'document',
-                    'id': doc.id,
-                    'object': doc,
-                    'title': doc.title,
-                    'is_completed': getattr(doc, 'is_completed', False),
-                    'order': 999 + doc_index,  # Documentos sin video van al final
-                    'timestamp': doc.upload_time,
-                    'slug': None,
-                    'index': doc_index,
-                    'related_video_id': None  # Sin video relacionado
-                })
+        for doc_index, doc in enumerate(documents_list[len(videos_list):], start=len(videos_list)):
+            unified_content.append({
+                'type': 'document',
+                'id': doc.id,
+                'object': doc,
+                'title': doc.title,
+                'order': 999 + doc_index,  # Documentos sin video van al final
+                'timestamp': doc.upload_time,
+                'slug': None,
+                'index': doc_index,
+                'related_video_id': None  # Sin video relacionado
+            })
         
         # Ordenar por order y timestamp
         unified_content.sort(key=lambda x: (x['order'], x['timestamp']))
         
         return unified_content
     
+    @staticmethod
+    def get_course_skeleton(course):
+        """
+        Estructura del curso desde la caché; se invalida al crear, editar, reordenar
+        o eliminar un video o documento (señales en course.models)
+        """
+        skeleton = CourseCache.get_cached_course_content(course.id)
+        if skeleton is None:
+            skeleton = CourseUnifiedNavigation.build_course_skeleton(course)
+            CourseCache.set_cached_course_content(course.id, skeleton)
+        return skeleton
+    
+    @staticmethod
+    def get_completed_content(course, user):
+        """Pares (tipo, id) completados por el usuario en el curso, en una sola consulta"""
+        videos = VideoCompletion.objects.filter(user=user, video__course=course).values_list(
+            Value('video', output_field=CharField()), 'video_id'
+        )
+        documents = DocumentCompletion.objects.filter(user=user, document__course=course).values_list(
+            Value('document', output_field=CharField()), 'document_id'
+        )
+        return set(videos.order_by().union(documents.order_by(), all=True))
+    
+    @staticmethod
+    def get_unified_course_content(course, user):
+        """
+        Estructura cacheada del curso con el estado de completado del usuario superpuesto
+        (cada llamada recibe su propia copia de la estructura)
+        """
+        completed = CourseUnifiedNavigation.get_completed_content(course, user)
+        unified_content = CourseUnifiedNavigation.get_course_skeleton(course)
+        for content in unified_content:
+            content['is_completed'] = (content['type'], content['id']) in completed
+        return unified_content
+    
     @staticmethod
     def get_current_content(unified_content, content_id, content_type):
         """
@@ -557,8 +533,10 @@ class CourseUnifiedNavigation:
 
 class CourseCache:
     """
-    Clase para manejar caché en memoria de Django
-    Usa el caché local de Django (no requiere servicios externos)
+    Caché de contenido y progreso de cursos con claves versionadas
+    (core.cache_versions) sobre la caché en dos niveles (core.cache_tiers): el
+    progreso depende del usuario (y del curso) y el contenido del curso;
+    invalidar es incrementar la versión del ámbito.
     """
     
     CACHE_TIMEOUT = 300  # 5 minutos para datos dinámicos
@@ -580,71 +558,65 @@ class CourseCache:
     def get_bulk_progress_cache_key(user_id):
         return f"bulk_progress_{user_id}"
     
+    @staticmethod
+    def _progress_scopes(user_id, course_id):
+        return [user_scope(user_id), course_scope(course_id)]
+    
     @staticmethod
     def invalidate_user_progress_cache(user_id, course_id=None):
         """
-        Invalida caché de progreso del usuario de forma selectiva
-        Si course_id es None, invalida todos los cursos del usuario
+        Invalida el progreso del usuario: el de cada curso y el bulk de la lista de
+        cursos dependen de la versión del usuario, así que basta un incremento
+        (course_id se mantiene por compatibilidad)
         """
-        from django.core.cache import cache
-        
-        if course_id:
-            # Invalidar solo el curso específico (más eficiente)
-            cache.delete(CourseCache.get_user_progress_cache_key(user_id, course_id))
-            cache.delete(CourseCache.get_course_content_cache_key(course_id))
-            # También invalidar el caché bulk para forzar recálculo
-            cache.delete(CourseCache.get_bulk_progress_cache_key(user_id))
-        else:
-            # Invalidar caché bulk de progreso
-            cache.delete(CourseCache.get_bulk_progress_cache_key(user_id))
+        versioned_cache.bump(user_scope(user_id))
     
     @staticmethod
     def invalidate_content_completion_cache(user_id, course_id, content_id, content_type):
         """
-        Invalida solo el caché específico de un contenido
-        Optimización máxima para actualizaciones individuales
+        Invalida la caché tras completar un contenido (progreso del usuario)
         """
-        from django.core.cache import cache
-        
-        # Invalidar caché específico del contenido
-        cache_key = f"content_completion_{user_id}_{course_id}_{content_id}_{content_type}"
-        cache.delete(cache_key)
-        
-        # Invalidar caché del curso (más selectivo que invalidar todo)
         CourseCache.invalidate_user_progress_cache(user_id, course_id)
     
+    @staticmethod
+    def invalidate_course_content_cache(course_id):
+        """Invalida el contenido del curso y el progreso de todos sus usuarios"""
+        versioned_cache.bump(course_scope(course_id))
+    
     @staticmethod
     def get_cached_course_content(course_id):
         """Obtiene contenido del curso desde caché"""
         cache_key = CourseCache.get_course_content_cache_key(course_id)
-        return cache.get(cache_key)
+        return versioned_cache.get(cache_key, [course_scope(course_id)], "course_content")
     
     @staticmethod
     def set_cached_course_content(course_id, content_data):
         """Guarda contenido del curso en caché"""
         cache_key = CourseCache.get_course_content_cache_key(course_id)
-        cache.set(cache_key, content_data, CourseCache.STATIC_CACHE_TIMEOUT)
+        versioned_cache.set(cache_key, content_data, CourseCache.STATIC_CACHE_TIMEOUT, [course_scope(course_id)])
     
     @staticmethod
     def get_cached_user_progress(user_id, course_id):
         """Obtiene progreso del usuario desde caché"""
         cache_key = CourseCache.get_user_progress_cache_key(user_id, course_id)
-        return cache.get(cache_key)
+        return versioned_cache.get(cache_key, CourseCache._progress_scopes(user_id, course_id), "user_progress")
     
     @staticmethod
     def set_cached_user_progress(user_id, course_id, progress_data):
         """Guarda progreso del usuario en caché"""
         cache_key = CourseCache.get_user_progress_cache_key(user_id, course_id)
-        cache.set(cache_key, progress_data, CourseCache.CACHE_TIMEOUT)
+        versioned_cache.set(
+            cache_key, progress_data, CourseCache.CACHE_TIMEOUT, CourseCache._progress_scopes(user_id, course_id)
+        )
     
     @staticmethod
     def get_cached_bulk_progress(user_id):
         """Obtiene progreso bulk del usuario desde caché"""
         cache_key = CourseCache.get_bulk_progress_cache_key(user_id)
-        return cache.get(cache_key)
+        return versioned_cache.get(cache_key, [user_scope(user_id)], "bulk_progress")
     
     @staticmethod
     def set_cached_bulk_progress(user_id, progress_data):
         """Guarda progreso bulk del usuario en caché"""
         cache_key = CourseCache.get_bulk_progress_cache_key(user_id)
-        cache.set(cache_key, progress_data, CourseCache.CACHE_TIMEOUT)
+        versioned_cache.set(cache_key, progress_data, CourseCache.CACHE_TIMEOUT, [user_scope(user_id)])
@@ -1,3 +1,80 @@
 from django.test import TestCase
+from django.urls import reverse
 
-# Create your tests here.
+from course.models import DocumentCompletion, Upload, UploadVideo, VideoCompletion
+from course.optimizations import CourseUnifiedNavigation
+from quiz.tests.base import QuizFixturesMixin
+
+
+class CourseSkeletonTests(QuizFixturesMixin, TestCase):
+    def setUp(self):
+        self.course = self.create_course()
+        self.videos = [
+            UploadVideo.objects.create(title=f"Video {index}", course=self.course, order=index)
+            for index in range(1, 3)
+        ]
+        self.documents = [
+            Upload.objects.create(title=f"Documento {index}", course=self.course, file=f"documento{index}.pdf")
+            for index in range(1, 4)
+        ]
+        self.user = self.create_user("10000001")
+
+    def content(self, user=None):
+        return [
+            (item["type"], item["title"], item["is_completed"])
+            for item in CourseUnifiedNavigation.get_unified_course_content(self.course, user or self.user)
+        ]
+
+    def test_cached_skeleton_is_overlaid_with_the_user_completions(self):
+        VideoCompletion.objects.create(user=self.user, video=self.videos[0])
+        DocumentCompletion.objects.create(user=self.user, document=self.documents[0])
+        self.content()
+
+        # Solo la consulta de completados del usuario
+        with self.assertNumQueries(1):
+            content = self.content()
+        self.assertEqual(content, [
+            ("video", "Video 1", True),
+            ("document", "Documento 1", True),
+            ("video", "Video 2", False),
+            ("document", "Documento 2", False),
+            ("document", "Documento 3", False),
+        ])
+        self.assertFalse(any(completed for _, _, completed in self.content(self.create_user("10000002"))))
+
+    def test_reorder_add_and_delete_invalidate_the_skeleton(self):
+        self.content()
+        self.videos[1].order = 0
+        self.videos[1].save()
+        self.assertEqual([title for _, title, _ in self.content()][:2], ["Video 2", "Documento 1"])
+
+        UploadVideo.objects.create(title="Video 3", course=self.course, order=5)
+        self.documents[2].delete()
+        self.assertEqual(
+            [title for _, title, _ in self.content()],
+            ["Video 2", "Documento 1", "Video 1", "Documento 2", "Video 3"],
+        )
+
+    def test_completing_a_video_completes_its_related_document(self):
+        self.assertTrue(
+            CourseUnifiedNavigation.sync_document_completion_when_video_completed(self.user, self.videos[1])
+        )
+        self.assertTrue(DocumentCompletion.objects.filter(user=self.user, document=self.documents[1]).exists())
+        self.assertTrue(
+            CourseUnifiedNavigation.sync_document_incompletion_when_video_incompleted(self.user, self.videos[1])
+        )
+        self.assertFalse(DocumentCompletion.objects.filter(user=self.user).exists())
+
+    def test_navigation_redirects_to_the_first_incomplete_content(self):
+        self.client.force_login(self.user)
+
+        def url(content):
+            content_type = "video" if isinstance(content, UploadVideo) else "document"
+            return reverse(
+                "course_unified_navigation",
+                kwargs={"slug": self.course.slug, "content_id": content.pk, "content_type": content_type},
+            )
+
+        response = self.client.get(url(self.videos[1]))
+        self.assertRedirects(response, url(self.documents[0]), fetch_redirect_response=False)
+        self.assertContains(self.client.get(url(self.videos[0])), "Documento 3")
@@ -14,6 +14,7 @@ import os
 
 from accounts.decorators import lecturer_required, student_required
 from accounts.models import Student
+from core.jobs import background_pdf
 from core.models import Semester
 from course.filters import CourseAllocationFilter, ProgramFilter
 from course.forms import (
@@ -908,6 +909,7 @@ def course_drop(request):
 
 @login_required
 @student_required
+@background_pdf
 def download_courses_pdf(request):
     try:
         # Obtener los cursos que el estudiante tiene registrados
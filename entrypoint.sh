@@ -6,6 +6,7 @@ set -e
 # Aplicar migraciones
 echo "Aplicando migraciones..."
 python manage.py migrate
+python manage.py createcachetable
 
 # Recopilar archivos estáticos
 echo "Recopilando archivos estáticos..."
@@ -14,6 +14,8 @@ from .models import (
     EssayQuestion,
     Sitting,
     ManualCertificate,
+    UserQuizScore,
+    CertificateLedger,
 )
 
 
@@ -77,10 +79,13 @@ class MCQuestionAdmin(TranslationAdmin):
 
 
 class ProgressAdmin(admin.ModelAdmin):
-    search_fields = (
-        "user",
-        "score",
-    )
+    search_fields = ("user__username",)
+
+
+class UserQuizScoreAdmin(admin.ModelAdmin):
+    list_display = ("user", "quiz", "score", "possible")
+    list_select_related = ("user", "quiz")
+    search_fields = ("user__username", "quiz__title")
 
 
 class EssayQuestionAdmin(admin.ModelAdmin):
@@ -135,8 +140,24 @@ class ManualCertificateAdmin(admin.ModelAdmin):
         super().save_model(request, obj, form, change)
 
 
+@admin.register(CertificateLedger)
+class CertificateLedgerAdmin(admin.ModelAdmin):
+    """Solo lectura: lo mantienen las señales y el comando rebuild_certificate_ledger"""
+    list_display = ['nombre_completo', 'dni', 'tipo', 'curso', 'full_code', 'fecha_aprobacion', 'fecha_vencimiento', 'activo']
+    list_filter = ['tipo', 'activo', 'curso']
+    list_select_related = ['curso']
+    search_fields = ['nombre_completo', 'dni', 'full_code']
+
+    def has_add_permission(self, request):
+        return False
+
+    def has_change_permission(self, request, obj=None):
+        return False
+
+
 admin.site.register(Quiz, QuizAdmin)
 admin.site.register(MCQuestion, MCQuestionAdmin)
 admin.site.register(Progress, ProgressAdmin)
+admin.site.register(UserQuizScore, UserQuizScoreAdmin)
 admin.site.register(EssayQuestion, EssayQuestionAdmin)
 admin.site.register(Sitting)
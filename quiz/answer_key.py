@@ -0,0 +1,72 @@
+"""
+Clave de respuestas por examen: alternativas de cada pregunta y cuáles son correctas
+Se guarda en la caché en dos niveles (core.cache_tiers) con una clave que incluye
+Quiz.timestamp; las señales de Question/Choice actualizan ese timestamp, así que
+cualquier edición genera una clave nueva y la anterior simplemente expira.
+"""
+import random
+
+from core.cache_tiers import tiered_cache
+
+from . import models
+
+ANSWER_KEY_TTL = 6 * 60 * 60
+
+
+def answer_key_cache_key(quiz):
+    return f"quiz_answer_key_{quiz.pk}_{quiz.timestamp.timestamp():.6f}"
+
+
+class AnswerKey:
+    """Instantánea inmutable de las alternativas de un examen"""
+
+    def __init__(self, choices_by_question, choice_order):
+        self._choices = choices_by_question
+        self._choice_order = choice_order
+        self._choices_by_id = {
+            choice.id: choice for choices in choices_by_question.values() for choice in choices
+        }
+
+    @classmethod
+    def build(cls, quiz):
+        choice_order = dict(models.MCQuestion.objects.filter(quiz=quiz).values_list("id", "choice_order"))
+        choices_by_question = {question_id: [] for question_id in choice_order}
+        for choice in models.Choice.objects.filter(question_id__in=choice_order).order_by("id"):
+            choices_by_question[choice.question_id].append(choice)
+        return cls(choices_by_question, choice_order)
+
+    def choices(self, question):
+        """Alternativas en el orden configurado en la pregunta (mismo criterio que MCQuestion.order_choices)"""
+        choices = list(self._choices.get(question.id, ()))
+        order = self._choice_order.get(question.id)
+        if order == "content":
+            choices.sort(key=lambda choice: choice.choice_text)
+        elif order == "random":
+            random.shuffle(choices)
+        return choices
+
+    def _choice(self, question, guess):
+        try:
+            choice = self._choices_by_id.get(int(guess))
+        except (TypeError, ValueError):
+            return None
+        if choice is None or choice.question_id != question.id:
+            return None
+        return choice
+
+    def is_correct(self, question, guess):
+        """Las preguntas de desarrollo no están en la clave y requieren calificación manual"""
+        choice = self._choice(question, guess)
+        return bool(choice and choice.correct)
+
+    def answer_text(self, question, guess):
+        if question.id not in self._choices:
+            return str(guess)
+        choice = self._choice(question, guess)
+        return choice.choice_text if choice else ""
+
+
+def get_answer_key(quiz):
+    return tiered_cache.get_or_set(
+        answer_key_cache_key(quiz), lambda: AnswerKey.build(quiz), ANSWER_KEY_TTL, "answer_key"
+    )
@@ -0,0 +1,125 @@
+"""
+Almacén durable de certificados PDF ya renderizados
+Cada certificado se guarda en MEDIA_ROOT/certificados_generados/<tipo>/<id>/<huella>.pdf
+La huella resume todos los datos que aparecen en el PDF: si cambia alguno
+(nombre, fecha de aprobación, plantilla...) se genera un archivo nuevo.
+"""
+import hashlib
+import os
+import shutil
+import tempfile
+
+from django.conf import settings
+from django.http import HttpResponse
+from django.utils.cache import get_conditional_response
+from django.utils.http import http_date
+
+# Incrementar al modificar POSICIONES_CERTIFICADOS o el diseño del certificado
+RENDER_VERSION = 2
+
+ARTIFACTS_SUBDIR = 'certificados_generados'
+SITTING = 'sitting'
+MANUAL = 'manual'
+
+
+def artifacts_root():
+    return os.path.join(settings.MEDIA_ROOT, ARTIFACTS_SUBDIR)
+
+
+def certificate_fingerprint(*parts):
+    """Huella estable de los datos que determinan el contenido del PDF"""
+    digest = hashlib.sha256(f'v{RENDER_VERSION}'.encode())
+    for part in parts:
+        digest.update(b'\x1f')
+        digest.update(str(part).encode())
+    return digest.hexdigest()[:32]
+
+
+def _artifact_dir(kind, object_id):
+    return os.path.join(artifacts_root(), kind, str(object_id))
+
+
+def artifact_path(kind, object_id, fingerprint):
+    return os.path.join(_artifact_dir(kind, object_id), f'{fingerprint}.pdf')
+
+
+def store_artifact(kind, object_id, fingerprint, content):
+    """Escribe el PDF de forma atómica y elimina las versiones anteriores del mismo certificado"""
+    directory = _artifact_dir(kind, object_id)
+    os.makedirs(directory, exist_ok=True)
+    path = artifact_path(kind, object_id, fingerprint)
+
+    descriptor, tmp_path = tempfile.mkstemp(dir=directory, suffix='.tmp')
+    try:
+        with os.fdopen(descriptor, 'wb') as tmp_file:
+            tmp_file.write(content)
+        os.replace(tmp_path, path)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+
+    for filename in os.listdir(directory):
+        if filename != os.path.basename(path) and filename.endswith('.pdf'):
+            try:
+                os.remove(os.path.join(directory, filename))
+            except FileNotFoundError:
+                pass
+    return path
+
+
+def invalidate_artifacts(kind, object_id):
+    """Elimina todos los PDF almacenados de un certificado"""
+    shutil.rmtree(_artifact_dir(kind, object_id), ignore_errors=True)
+
+
+def _offload_headers(response, path):
+    mode = getattr(settings, 'CERTIFICATE_ARTIFACT_OFFLOAD', '')
+    if mode == 'x-accel-redirect':
+        relative = os.path.relpath(path, artifacts_root()).replace(os.sep, '/')
+        prefix = settings.CERTIFICATE_ARTIFACT_ACCEL_PREFIX.rstrip('/')
+        response['X-Accel-Redirect'] = f'{prefix}/{relative}'
+        return True
+    if mode == 'x-sendfile':
+        response['X-Sendfile'] = path
+        return True
+    return False
+
+
+def _validator_headers(response, etag, last_modified):
+    response['ETag'] = etag
+    if last_modified is not None:
+        response['Last-Modified'] = http_date(last_modified)
+    # Privado (datos personales) y siempre revalidado con el servidor
+    response['Cache-Control'] = 'private, no-cache'
+    return response
+
+
+def serve_certificate(request, kind, object_id, fingerprint, filename, render):
+    """
+    Sirve el certificado almacenado respondiendo a peticiones condicionales.
+    `render` sólo se invoca cuando no existe un PDF con esa huella.
+    """
+    path = artifact_path(kind, object_id, fingerprint)
+    etag = f'"{fingerprint}"'
+    try:
+        last_modified = int(os.stat(path).st_mtime)
+    except FileNotFoundError:
+        last_modified = None
+
+    # El ETag se calcula sin renderizar: un 304 no genera ni lee el PDF
+    not_modified = get_conditional_response(request, etag=etag, last_modified=last_modified)
+    if not_modified is not None:
+        return _validator_headers(not_modified, etag, last_modified)
+
+    if last_modified is None:
+        path = store_artifact(kind, object_id, fingerprint, render())
+        last_modified = int(os.stat(path).st_mtime)
+
+    response = HttpResponse(content_type='application/pdf')
+    if not _offload_headers(response, path):
+        # Bytes en memoria en lugar de FileResponse: evita el warning de streaming en modo asíncrono
+        with open(path, 'rb') as pdf_file:
+            response.content = pdf_file.read()
+    response['Content-Disposition'] = f'attachment; filename="{filename}"'
+    return _validator_headers(response, etag, last_modified)
@@ -0,0 +1,219 @@
+"""
+Exportación masiva de certificados en un ZIP generado por streaming
+Los PDF se renderizan en un ProcessPoolExecutor con las mismas funciones
+(y por tanto las mismas POSICIONES_CERTIFICADOS) que la descarga individual.
+Los certificados ya almacenados en MEDIA_ROOT no se vuelven a renderizar.
+"""
+import multiprocessing
+import os
+import time
+import zipfile
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+
+import django
+from django.conf import settings
+
+from .certificate_artifacts import SITTING, artifact_path, store_artifact
+from .models import ManualCertificate, Sitting
+
+# Bytes de ZIP acumulados antes de entregarlos al cliente
+CHUNK_SIZE = 256 * 1024
+
+
+def certificados_plataforma(curso=None, desde=None, hasta=None, dnis=None):
+    """Sittings aprobados con certificado emitido (los cursos externos usan Google Drive)"""
+    queryset = Sitting.objects.filter(
+        complete=True,
+        certificate_code__isnull=False,
+        course__is_external=False,
+    ).exclude(certificate_code='').select_related('user', 'quiz__course')
+    if curso is not None:
+        queryset = queryset.filter(course=curso)
+    if desde is not None:
+        queryset = queryset.filter(fecha_aprobacion__date__gte=desde)
+    if hasta is not None:
+        queryset = queryset.filter(fecha_aprobacion__date__lte=hasta)
+    if dnis:
+        queryset = queryset.filter(user__username__in=dnis)
+    return queryset.order_by('course__code', 'certificate_code')
+
+
+def certificados_manuales(curso=None, desde=None, hasta=None, dnis=None):
+    queryset = ManualCertificate.objects.filter(activo=True).select_related('curso')
+    if curso is not None:
+        queryset = queryset.filter(curso=curso)
+    if desde is not None:
+        queryset = queryset.filter(fecha_aprobacion__gte=desde)
+    if hasta is not None:
+        queryset = queryset.filter(fecha_aprobacion__lte=hasta)
+    if dnis:
+        queryset = queryset.filter(dni__in=dnis)
+    return queryset.order_by('curso__code', 'certificate_code')
+
+
+def _render(kind, instance, base_url):
+    """Se ejecuta en el proceso hijo: sólo CPU, sin acceso a la base de datos"""
+    from .views import render_certificado_manual, render_certificado_sitting
+
+    if kind == SITTING:
+        return render_certificado_sitting(instance, base_url)
+    return render_certificado_manual(instance, instance.curso.code, base_url)
+
+
+def _describe(kind, instance, base_url):
+    from .views import (
+        huella_certificado_manual,
+        huella_certificado_sitting,
+        nombre_archivo_certificado_manual,
+        nombre_archivo_certificado_sitting,
+    )
+
+    if kind == SITTING:
+        return (
+            huella_certificado_sitting(instance, base_url),
+            nombre_archivo_certificado_sitting(instance),
+        )
+    return (
+        huella_certificado_manual(instance, instance.curso.code, base_url),
+        nombre_archivo_certificado_manual(instance),
+    )
+
+
+class ExportStats:
+    """Contadores de la exportación para reportar el throughput"""
+
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.rendered = 0
+        self.reused = 0
+        self.bytes = 0
+
+    @property
+    def total(self):
+        return self.rendered + self.reused
+
+    @property
+    def elapsed(self):
+        return time.perf_counter() - self.started
+
+    @property
+    def per_second(self):
+        return self.total / self.elapsed if self.elapsed else 0.0
+
+    def __str__(self):
+        return (
+            f"{self.total} certificados ({self.rendered} renderizados, {self.reused} reutilizados) "
+            f"en {self.elapsed:.1f} s: {self.per_second:.1f} certificados/s"
+        )
+
+
+def iter_certificados(querysets, base_url, workers=None, stats=None):
+    """
+    Genera (nombre_archivo, bytes_pdf) en el orden de los querysets.
+    Como máximo `workers * 2` PDF están en vuelo a la vez, así que la memoria no
+    depende del tamaño de la exportación. Con workers=0 se renderiza en este proceso.
+    """
+    if workers is None:
+        workers = settings.CERTIFICATE_EXPORT_WORKERS
+    stats = stats or ExportStats()
+    executor = None
+    if workers > 0:
+        # spawn: los hijos no heredan las conexiones abiertas a la base de datos.
+        # El inicializador debe ser django.setup: este módulo importa modelos
+        executor = ProcessPoolExecutor(
+            max_workers=workers,
+            mp_context=multiprocessing.get_context('spawn'),
+            initializer=django.setup,
+        )
+    pending = deque()
+
+    def drain_one():
+        kind, object_id, huella, filename, result = pending.popleft()
+        if executor is not None and not isinstance(result, bytes):
+            result = result.result()
+            store_artifact(kind, object_id, huella, result)
+        stats.bytes += len(result)
+        return filename, result
+
+    try:
+        for kind, queryset in querysets:
+            for instance in queryset.iterator(chunk_size=500):
+                huella, filename = _describe(kind, instance, base_url)
+                path = artifact_path(kind, instance.pk, huella)
+                if os.path.exists(path):
+                    with open(path, 'rb') as pdf_file:
+                        result = pdf_file.read()
+                    stats.reused += 1
+                elif executor is not None:
+                    result = executor.submit(_render, kind, instance, base_url)
+                    stats.rendered += 1
+                else:
+                    result = _render(kind, instance, base_url)
+                    store_artifact(kind, instance.pk, huella, result)
+                    stats.rendered += 1
+                pending.append((kind, instance.pk, huella, filename, result))
+
+                while len(pending) > max(workers, 1) * 2:
+                    yield drain_one()
+        while pending:
+            yield drain_one()
+    finally:
+        if executor is not None:
+            # Cliente desconectado o error: descartar lo que aún no empezó
+            # (shutdown(cancel_futures=True) requiere Python 3.9)
+            for _kind, _object_id, _huella, _filename, result in pending:
+                if not isinstance(result, bytes):
+                    result.cancel()
+            executor.shutdown(wait=True)
+
+
+class _ChunkBuffer:
+    """Destino no posicionable para ZipFile: acumula bytes hasta que se vacían"""
+
+    def __init__(self):
+        self._chunks = []
+        self.size = 0
+        self._offset = 0
+
+    def write(self, data):
+        self._chunks.append(bytes(data))
+        self.size += len(data)
+        self._offset += len(data)
+        return len(data)
+
+    def tell(self):
+        return self._offset
+
+    def flush(self):
+        pass
+
+    def pop(self):
+        data = b''.join(self._chunks)
+        self._chunks = []
+        self.size = 0
+        return data
+
+
+def stream_zip(certificados, resumen=None):
+    """
+    ZIP incremental a partir de (nombre, bytes); los PDF ya van comprimidos (ZIP_STORED).
+    `resumen` es un callable opcional cuyo texto se añade al final como exportacion.txt
+    """
+    buffer = _ChunkBuffer()
+    usados = set()
+    with zipfile.ZipFile(buffer, mode='w', compression=zipfile.ZIP_STORED) as archivo:
+        for filename, contenido in certificados:
+            nombre = filename
+            indice = 1
+            while nombre in usados:
+                base, extension = os.path.splitext(filename)
+                nombre = f'{base}-{indice}{extension}'
+                indice += 1
+            usados.add(nombre)
+            archivo.writestr(nombre, contenido)
+            if buffer.size >= CHUNK_SIZE:
+                yield buffer.pop()
+        if resumen is not None:
+            archivo.writestr('exportacion.txt', f'{resumen()}\n')
+    yield buffer.pop()
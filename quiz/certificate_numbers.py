@@ -0,0 +1,69 @@
+"""
+Numeración correlativa de certificados por curso
+La secuencia vive en Course.last_cert_code y la comparten los certificados
+automáticos (Sitting) y los manuales. Los números se reservan con un único
+UPDATE atómico sobre esa columna, sin leer ni guardar el resto del curso, de
+modo que dos aprobaciones simultáneas nunca reciben el mismo correlativo.
+"""
+from django.db import connections, router, transaction
+from django.db.models import F
+
+from course.models import Course
+
+
+def format_certificate_code(number):
+    """Correlativo con al menos 3 dígitos (ej: 1 -> "001")"""
+    return str(number).zfill(3)
+
+
+def _connection_for(course):
+    """Conexión de la base de datos donde se escribe el curso (puede no ser la default)"""
+    return connections[course._state.db or router.db_for_write(Course, instance=course)]
+
+
+def _supports_update_returning(connection):
+    if connection.vendor == 'postgresql':
+        return True
+    if connection.vendor == 'sqlite':
+        return connection.Database.sqlite_version_info >= (3, 35)
+    return False
+
+
+def reserve_certificate_numbers(course, count=1):
+    """
+    Reserva `count` correlativos consecutivos del curso y devuelve el `range`.
+    Un número reservado no se reutiliza aunque el certificado no llegue a guardarse
+    o se elimine después: los huecos en la numeración son esperados.
+    """
+    if count < 1:
+        raise ValueError('count debe ser mayor que cero')
+
+    connection = _connection_for(course)
+    if _supports_update_returning(connection):
+        # Un solo viaje a la base de datos: incrementa y devuelve el nuevo valor
+        table = connection.ops.quote_name(Course._meta.db_table)
+        column = connection.ops.quote_name('last_cert_code')
+        with connection.cursor() as cursor:
+            cursor.execute(
+                f'UPDATE {table} SET {column} = {column} + %s WHERE id = %s RETURNING {column}',
+                [count, course.pk],
+            )
+            row = cursor.fetchone()
+        if row is None:
+            raise Course.DoesNotExist(f'No existe el curso {course.pk}')
+        last = row[0]
+    else:
+        # El UPDATE bloquea la fila hasta el final de la transacción, así que la lectura es consistente
+        courses = Course.objects.using(connection.alias).filter(pk=course.pk)
+        with transaction.atomic(using=connection.alias):
+            if not courses.update(last_cert_code=F('last_cert_code') + count):
+                raise Course.DoesNotExist(f'No existe el curso {course.pk}')
+            last = courses.values_list('last_cert_code', flat=True).get()
+
+    course.last_cert_code = last
+    return range(last - count + 1, last + 1)
+
+
+def next_certificate_code(course):
+    """Reserva un correlativo y lo devuelve ya formateado"""
+    return format_certificate_code(reserve_certificate_numbers(course)[0])
@@ -0,0 +1,173 @@
+"""
+Caché por proceso de las plantillas PDF de certificados
+Evita abrir y parsear static/pdfs/<código>.pdf en cada descarga
+"""
+import io
+import os
+import threading
+from collections import OrderedDict
+
+from PyPDF2 import PdfReader, PdfWriter
+from PyPDF2.generic import ArrayObject, DecodedStreamObject, DictionaryObject, IndirectObject, NameObject
+from django.conf import settings
+from django.http import Http404
+
+TEMPLATES_DIR = os.path.join(settings.BASE_DIR, 'static', 'pdfs')
+DEFAULT_TEMPLATE = 'certificado_template.pdf'
+
+
+class TemplateCache:
+    """
+    LRU de plantillas PDF ya parseadas, limitado por el tamaño total de los archivos.
+    Una plantilla se vuelve a cargar si cambia su mtime o su tamaño en disco.
+    """
+
+    def __init__(self, max_bytes):
+        self.max_bytes = max_bytes
+        self._entries = OrderedDict()  # path -> (firma, tamaño, PdfReader, lock del reader)
+        self._total_bytes = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get_page(self, path, page_number=0):
+        """Devuelve la página de la plantilla; nunca debe modificarse en el llamador"""
+        return self.get_reader(path).pages[page_number]
+
+    def add_page(self, writer, path, page_number=0):
+        """
+        Copia la página de la plantilla dentro de `writer` y devuelve la copia.
+        PdfReader resuelve objetos con seek/read sobre un único buffer, así que la
+        copia se hace con el lock de esa plantilla (los renders en hilos la comparten).
+        """
+        reader, reader_lock = self._get_entry(path)
+        with reader_lock:
+            return writer.add_page(reader.pages[page_number])
+
+    def get_reader(self, path):
+        return self._get_entry(path)[0]
+
+    def _get_entry(self, path):
+        signature = template_signature(path)
+
+        with self._lock:
+            entry = self._entries.get(path)
+            if entry is not None and entry[0] == signature:
+                self._entries.move_to_end(path)
+                self.hits += 1
+                return entry[2], entry[3]
+
+        # Parsear fuera del lock: una plantilla de varios MB no debe bloquear a las demás
+        with open(path, 'rb') as template_file:
+            reader = PdfReader(io.BytesIO(template_file.read()))
+        reader_lock = threading.Lock()
+
+        with self._lock:
+            self.misses += 1
+            self._discard(path)
+            size = signature[1]
+            if size <= self.max_bytes:
+                self._entries[path] = (signature, size, reader, reader_lock)
+                self._total_bytes += size
+                while self._total_bytes > self.max_bytes:
+                    self._discard(next(iter(self._entries)))
+        return reader, reader_lock
+
+    def invalidate(self, path):
+        with self._lock:
+            self._discard(path)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._total_bytes = 0
+
+    def _discard(self, path):
+        entry = self._entries.pop(path, None)
+        if entry is not None:
+            self._total_bytes -= entry[1]
+
+
+template_cache = TemplateCache(
+    max_bytes=getattr(settings, 'CERTIFICATE_TEMPLATE_CACHE_MB', 64) * 1024 * 1024
+)
+
+
+def resolve_certificate_template(codigo):
+    """Ruta de la plantilla del curso, o la plantilla genérica como respaldo"""
+    for filename in (f'{codigo}.pdf', DEFAULT_TEMPLATE):
+        path = os.path.join(TEMPLATES_DIR, filename)
+        if os.path.exists(path):
+            return path
+    raise Http404("No se encontró la plantilla del certificado.")
+
+
+def template_signature(path):
+    """(mtime, tamaño) de la plantilla: cambia cuando se reemplaza el archivo"""
+    stat = os.stat(path)
+    return stat.st_mtime_ns, stat.st_size
+
+
+def _add_object(writer, obj):
+    """
+    Registra `obj` en el writer y devuelve su referencia indirecta.
+    PyPDF2 3.0.1 (fijado en requirements.txt) no tiene una API pública para esto;
+    es el único uso de PdfWriter._add_object y hay un test que lo vigila al
+    actualizar la dependencia.
+    """
+    return writer._add_object(obj)
+
+
+def _stream(writer, data):
+    stream = DecodedStreamObject()
+    stream.set_data(data)
+    return _add_object(writer, stream)
+
+
+def merge_overlay(template_path, overlay_buffer):
+    """
+    Superpone la primera página de `overlay_buffer` (generada con reportlab)
+    sobre la plantilla cacheada y devuelve los bytes del PDF resultante.
+
+    A diferencia de PageObject.merge_page, no se parsea el content stream de la
+    plantilla (lo más costoso del render): la capa de reportlab se inserta como
+    un Form XObject y el contenido original sólo se envuelve entre q/Q.
+    """
+    writer = PdfWriter()
+    # add_page clona la página dentro del writer: la plantilla cacheada queda intacta
+    page = template_cache.add_page(writer, template_path)
+    overlay_page = PdfReader(overlay_buffer).pages[0]
+
+    form = DecodedStreamObject()
+    form.set_data(overlay_page.get_contents().get_data())
+    form.update({
+        NameObject('/Type'): NameObject('/XObject'),
+        NameObject('/Subtype'): NameObject('/Form'),
+        NameObject('/BBox'): ArrayObject(overlay_page.mediabox),
+        NameObject('/Resources'): overlay_page['/Resources'].get_object().clone(writer),
+    })
+
+    resources = page['/Resources'].get_object()
+    xobjects = resources.get('/XObject')
+    xobjects = xobjects.get_object() if xobjects is not None else DictionaryObject()
+    nombre = NameObject('/CertOverlay')
+    while nombre in xobjects:
+        nombre = NameObject(nombre + '_')
+    xobjects[nombre] = _add_object(writer, form)
+    resources[NameObject('/XObject')] = xobjects
+
+    # raw_get conserva las referencias indirectas del contenido original
+    contents = page.raw_get('/Contents') if '/Contents' in page else ArrayObject()
+    if isinstance(contents.get_object(), ArrayObject):
+        contents = contents.get_object()
+    else:
+        if not isinstance(contents, IndirectObject):
+            contents = _add_object(writer, contents)
+        contents = [contents]
+    page[NameObject('/Contents')] = ArrayObject(
+        [_stream(writer, b'q\n'), *contents, _stream(writer, b'\nQ\nq ' + nombre.encode() + b' Do Q\n')]
+    )
+
+    resultado = io.BytesIO()
+    writer.write(resultado)
+    return resultado.getvalue()
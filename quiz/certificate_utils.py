@@ -2,7 +2,12 @@
 Utilidades para el manejo de certificados
 Funciones unificadas para lógica de fechas y estados
 """
-from datetime import date, timedelta, datetime
+import unicodedata
+from datetime import timedelta, datetime, time
+
+from django.db.models import Count, DateTimeField
+from django.db.models.functions import TruncMonth
+from django.utils import timezone
 
 
 def datetime_to_date(dt):
@@ -14,6 +19,12 @@ def datetime_to_date(dt):
     return dt
 
 
+def normalizar_busqueda(texto):
+    """Texto en minúsculas y sin tildes, para búsquedas por prefijo de nombre"""
+    sin_tildes = unicodedata.normalize('NFKD', texto or '').encode('ascii', 'ignore').decode('ascii')
+    return ' '.join(sin_tildes.lower().split())
+
+
 def is_certificate_active(certificate, hoy):
     """
     Determinar si un certificado está activo (no vencido)
@@ -25,13 +36,8 @@ def is_certificate_active(certificate, hoy):
     Returns:
         bool: True si el certificado está activo
     """
-    if hasattr(certificate, 'fecha_aprobacion'):  # Certificado automático
-        if certificate.fecha_aprobacion:
-            fecha_aprobacion = datetime_to_date(certificate.fecha_aprobacion)
-            return fecha_aprobacion >= hoy - timedelta(days=365)
-        return False
-    else:  # Certificado manual
-        return certificate.fecha_vencimiento >= hoy
+    fecha_vencimiento = get_certificate_expiration_date(certificate)
+    return fecha_vencimiento is not None and fecha_vencimiento >= hoy
 
 
 def is_certificate_expired(certificate, hoy):
@@ -45,13 +51,8 @@ def is_certificate_expired(certificate, hoy):
     Returns:
         bool: True si el certificado está vencido
     """
-    if hasattr(certificate, 'fecha_aprobacion'):  # Certificado automático
-        if certificate.fecha_aprobacion:
-            fecha_aprobacion = datetime_to_date(certificate.fecha_aprobacion)
-            return fecha_aprobacion < hoy - timedelta(days=365)
-        return True
-    else:  # Certificado manual
-        return certificate.fecha_vencimiento < hoy
+    fecha_vencimiento = get_certificate_expiration_date(certificate)
+    return fecha_vencimiento is None or fecha_vencimiento < hoy
 
 
 def is_certificate_expiring_soon(certificate, hoy, days=30):
@@ -66,34 +67,26 @@ def is_certificate_expiring_soon(certificate, hoy, days=30):
     Returns:
         bool: True si el certificado está por vencer
     """
-    if hasattr(certificate, 'fecha_aprobacion'):  # Certificado automático
-        if certificate.fecha_aprobacion:
-            fecha_aprobacion = datetime_to_date(certificate.fecha_aprobacion)
-            fecha_vencimiento = fecha_aprobacion + timedelta(days=365)
-            return hoy <= fecha_vencimiento <= hoy + timedelta(days=days)
+    fecha_vencimiento = get_certificate_expiration_date(certificate)
+    if fecha_vencimiento is None or not getattr(certificate, 'activo', True):
         return False
-    else:  # Certificado manual
-        return (certificate.activo and 
-               hoy < certificate.fecha_vencimiento <= hoy + timedelta(days=days))
+    return hoy <= fecha_vencimiento <= hoy + timedelta(days=days)
 
 
 def get_certificate_expiration_date(certificate):
     """
     Obtener la fecha de vencimiento de un certificado
     
+    Ambos tipos guardan fecha_vencimiento (fecha de aprobación + 365 días),
+    la misma que usa CertificateLedger.status_counts.
+    
     Args:
         certificate: Objeto Sitting (automático) o ManualCertificate (manual)
     
     Returns:
         date: Fecha de vencimiento del certificado
     """
-    if hasattr(certificate, 'fecha_aprobacion'):  # Certificado automático
-        if certificate.fecha_aprobacion:
-            fecha_aprobacion = datetime_to_date(certificate.fecha_aprobacion)
-            return fecha_aprobacion + timedelta(days=365)
-        return None
-    else:  # Certificado manual
-        return certificate.fecha_vencimiento
+    return certificate.fecha_vencimiento
 
 
 def get_certificate_status(certificate, hoy):
@@ -141,3 +134,54 @@ def get_certificate_status(certificate, hoy):
         'expiration_date': fecha_vencimiento,
         'days_until_expiration': days_until_expiration
     }
+
+
+def meses_recientes(hoy, cantidad=12):
+    """Primer día de cada uno de los últimos `cantidad` meses, del más antiguo al actual"""
+    mes = hoy.replace(day=1)
+    meses = [mes]
+    for _ in range(cantidad - 1):
+        mes = (mes - timedelta(days=1)).replace(day=1)
+        meses.append(mes)
+    return list(reversed(meses))
+
+
+def _resolver_campo(model, campo):
+    """Campo de modelo para una ruta como certificado_manual__fecha_generacion"""
+    partes = campo.split("__")
+    for parte in partes[:-1]:
+        model = model._meta.get_field(parte).related_model
+    return model._meta.get_field(partes[-1])
+
+
+def conteo_mensual(queryset, campo, desde):
+    """
+    Cantidad de filas por mes de `campo` (DateField o DateTimeField, también a través
+    de relaciones) desde `desde`,
+    agrupada en la base de datos: {primer día del mes: total}
+    """
+    if isinstance(_resolver_campo(queryset.model, campo), DateTimeField):
+        desde = timezone.make_aware(datetime.combine(desde, time.min))
+    filas = (
+        queryset.filter(**{f"{campo}__gte": desde})
+        .annotate(mes=TruncMonth(campo))
+        .order_by()
+        .values("mes")
+        .annotate(total=Count("pk"))
+    )
+    return {datetime_to_date(fila["mes"]): fila["total"] for fila in filas}
+
+
+def serie_mensual(meses, automaticos, manuales):
+    """Datos del gráfico mensual a partir de los conteos de conteo_mensual de cada tipo"""
+    datos = []
+    for mes in meses:
+        total_automaticos = automaticos.get(mes, 0)
+        total_manuales = manuales.get(mes, 0)
+        datos.append({
+            'mes': mes.strftime('%b %Y'),
+            'automaticos': total_automaticos,
+            'manuales': total_manuales,
+            'total': total_automaticos + total_manuales
+        })
+    return datos
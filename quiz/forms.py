@@ -152,6 +152,56 @@ MCQuestionFormSet = inlineformset_factory(
     extra=5,
 )
 
+class CertificateExportForm(forms.Form):
+    """Filtros de la exportación masiva de certificados en ZIP"""
+    curso = forms.ModelChoiceField(
+        queryset=None,
+        required=False,
+        label="Curso",
+        widget=forms.Select(attrs={'class': 'form-control'}),
+    )
+    desde = forms.DateField(
+        required=False,
+        label="Aprobados desde",
+        widget=forms.DateInput(attrs={'class': 'form-control', 'type': 'date'}),
+    )
+    hasta = forms.DateField(
+        required=False,
+        label="Aprobados hasta",
+        widget=forms.DateInput(attrs={'class': 'form-control', 'type': 'date'}),
+    )
+    dnis = forms.CharField(
+        required=False,
+        label="DNIs",
+        help_text="Separados por comas, espacios o saltos de línea.",
+        widget=forms.Textarea(attrs={'class': 'form-control', 'rows': 4}),
+    )
+    incluir_manuales = forms.BooleanField(
+        required=False,
+        initial=True,
+        label="Incluir certificados manuales",
+        widget=forms.CheckboxInput(attrs={'class': 'form-check-input'}),
+    )
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        from course.models import Course
+
+        self.fields['curso'].queryset = Course.objects.filter(is_external=False).order_by('code')
+
+    def clean_dnis(self):
+        return [dni for dni in re.split(r'[\s,;]+', self.cleaned_data.get('dnis', '')) if dni]
+
+    def clean(self):
+        cleaned_data = super().clean()
+        desde, hasta = cleaned_data.get('desde'), cleaned_data.get('hasta')
+        if desde and hasta and desde > hasta:
+            raise ValidationError("La fecha inicial no puede ser posterior a la final.")
+        if not any(cleaned_data.get(campo) for campo in ('curso', 'desde', 'hasta', 'dnis')):
+            raise ValidationError("Indique al menos un curso, un rango de fechas o una lista de DNIs.")
+        return cleaned_data
+
+
 class ManualCertificateForm(forms.ModelForm):
     class Meta:
         model = ManualCertificate
@@ -0,0 +1,253 @@
+#!/usr/bin/env python
+"""
+Comando de gestión para medir el rendimiento de los certificados
+Los datos de prueba se crean dentro de una transacción que se revierte al final
+"""
+import io
+import json
+import os
+import shutil
+import tempfile
+import time
+from datetime import date, timedelta
+from unittest import mock
+
+import qrcode
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+from django.test import RequestFactory, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from reportlab.lib.utils import ImageReader
+
+from core.qr import draw_qr, qr_matrix
+
+from accounts.models import User
+from course.models import Course, Program
+from quiz.certificate_artifacts import SITTING
+from quiz.certificate_export import ExportStats, certificados_plataforma, iter_certificados, stream_zip
+from quiz.certificate_templates import template_cache
+from quiz.models import CertificateLedger, ManualCertificate, Quiz, Sitting
+from quiz.views import (
+    CertificadosDashboardView,
+    CertificadosFiltrosAjaxView,
+    render_certificado_manual,
+    verificar_certificado,
+)
+
+SCENARIOS = ("lookup", "render", "export", "qr", "dashboard")
+
+
+def draw_qr_png(canvas, data, x, y, size):
+    """Ruta anterior: rasterizar con PIL, comprimir a PNG y volver a decodificar"""
+    qr_buffer = io.BytesIO()
+    qrcode.make(data).save(qr_buffer, format='PNG')
+    qr_buffer.seek(0)
+    canvas.drawImage(ImageReader(qr_buffer), x, y, width=size, height=size)
+
+
+class Command(BaseCommand):
+    help = 'Mide el rendimiento de la verificación y generación de certificados'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--scenario',
+            choices=SCENARIOS,
+            default='lookup',
+            help='Escenario a medir',
+        )
+        parser.add_argument(
+            '--sizes',
+            default='1000,5000,20000',
+            help='Cantidades de sittings a sembrar, separadas por comas',
+        )
+        parser.add_argument(
+            '--template',
+            default='C01-IPERC',
+            help='Código de curso cuya plantilla se usa en el escenario render',
+        )
+        parser.add_argument(
+            '--repeat',
+            type=int,
+            default=50,
+            help='Repeticiones por medición',
+        )
+
+    def handle(self, *args, **options):
+        try:
+            sizes = [int(size) for size in options['sizes'].split(',') if size]
+        except ValueError:
+            raise CommandError('--sizes debe ser una lista de enteros separados por comas')
+
+        handler = getattr(self, f"bench_{options['scenario']}")
+        with transaction.atomic():
+            handler(sizes, options['repeat'], options)
+            transaction.set_rollback(True)
+
+    def _seed_course(self, code='BENCH-01'):
+        program, _ = Program.objects.get_or_create(title='Benchmark')
+        course = Course.objects.create(
+            code=code, title='Curso de benchmark', program=program,
+            level='Bachelor', semester='First',
+        )
+        quiz = Quiz.objects.create(course=course, title='Examen de benchmark')
+        return course, quiz
+
+    def _seed_sittings(self, course, quiz, start, count):
+        """Crea `count` sittings aprobados con código correlativo a partir de `start`"""
+        now = timezone.now()
+        users = User.objects.bulk_create(
+            User(username=f'bench{start + i:07d}', first_name='Bench', last_name=str(start + i))
+            for i in range(count)
+        )
+        Sitting.objects.bulk_create(
+            (
+                Sitting(
+                    user=user, quiz=quiz, course=course,
+                    question_order=[1], question_list=[],
+                    current_score=1, complete=True,
+                    end=now, fecha_aprobacion=now,
+                    certificate_code=str(start + i + 1).zfill(3),
+                    full_code=f'{course.code}-{str(start + i + 1).zfill(3)}',
+                )
+                for i, user in enumerate(users)
+            ),
+            batch_size=1000,
+        )
+
+    def bench_lookup(self, sizes, repeat, options):
+        course, quiz = self._seed_course()
+        factory = RequestFactory()
+        seeded = 0
+
+        self.stdout.write(f'{"sittings":>10} {"ms/verificación":>16}')
+        for size in sorted(sizes):
+            self._seed_sittings(course, quiz, seeded, size - seeded)
+            seeded = size
+            # Consultar el último código emitido: el peor caso para un recorrido secuencial
+            codigo = f'{course.code}-{str(seeded).zfill(3)}'
+            request = factory.get(f'/quiz/verificar-certificado/{codigo}/')
+
+            started = time.perf_counter()
+            for _ in range(repeat):
+                verificar_certificado(request, codigo)
+            elapsed_ms = (time.perf_counter() - started) * 1000 / repeat
+
+            self.stdout.write(f'{size:>10} {elapsed_ms:>16.2f}')
+
+    def bench_render(self, sizes, repeat, options):
+        """Certificados por segundo con la caché de plantillas fría (vaciada en cada render) y caliente"""
+        codigo = options['template']
+        # Objetos sin guardar: el render no consulta la base de datos
+        curso = Course(code=codigo, title='Curso de benchmark')
+        certificate = ManualCertificate(
+            curso=curso, nombre_completo='Nombre Apellido Benchmark', dni='12345678',
+            puntaje=20, certificate_code='001',
+            fecha_aprobacion=date.today(), fecha_vencimiento=date.today() + timedelta(days=365),
+        )
+        base_url = f"https://{settings.ALLOWED_HOSTS[0] if settings.ALLOWED_HOSTS else 'localhost'}/"
+
+        self.stdout.write(f'{"caché":>8} {"ms/certificado":>15} {"certificados/s":>15}')
+        for label, clear in (('fría', True), ('caliente', False)):
+            template_cache.clear()
+            render_certificado_manual(certificate, codigo, base_url)  # calentamiento (fuentes, imports)
+            elapsed = 0.0
+            for _ in range(repeat):
+                if clear:
+                    template_cache.clear()
+                started = time.perf_counter()
+                render_certificado_manual(certificate, codigo, base_url)
+                elapsed += time.perf_counter() - started
+            self.stdout.write(f'{label:>8} {elapsed * 1000 / repeat:>15.2f} {repeat / elapsed:>15.1f}')
+
+    def bench_export(self, sizes, repeat, options):
+        """Throughput de la exportación ZIP sin pool y con un proceso por CPU (almacén vacío)"""
+        course, quiz = self._seed_course()
+        base_url = f"https://{settings.ALLOWED_HOSTS[0] if settings.ALLOWED_HOSTS else 'localhost'}/"
+        seeded = 0
+
+        self.stdout.write(f'{"certificados":>12} {"workers":>8} {"segundos":>9} {"certificados/s":>15}')
+        for size in sorted(sizes):
+            self._seed_sittings(course, quiz, seeded, size - seeded)
+            seeded = size
+            for workers in (0, os.cpu_count() or 1):
+                media_root = tempfile.mkdtemp()
+                try:
+                    with override_settings(MEDIA_ROOT=media_root):
+                        stats = ExportStats()
+                        querysets = [(SITTING, certificados_plataforma(curso=course))]
+                        for _ in stream_zip(iter_certificados(querysets, base_url, workers=workers, stats=stats)):
+                            pass
+                finally:
+                    shutil.rmtree(media_root, ignore_errors=True)
+                self.stdout.write(f'{size:>12} {workers:>8} {stats.elapsed:>9.1f} {stats.per_second:>15.1f}')
+
+    def bench_qr(self, sizes, repeat, options):
+        """Tiempo por certificado con el QR rasterizado (PNG) frente al QR vectorial con matriz fría y caliente"""
+        codigo = options['template']
+        curso = Course(code=codigo, title='Curso de benchmark')
+        certificate = ManualCertificate(
+            curso=curso, nombre_completo='Nombre Apellido Benchmark', dni='12345678',
+            puntaje=20, certificate_code='001',
+            fecha_aprobacion=date.today(), fecha_vencimiento=date.today() + timedelta(days=365),
+        )
+        base_url = f"https://{settings.ALLOWED_HOSTS[0] if settings.ALLOWED_HOSTS else 'localhost'}/"
+        render_certificado_manual(certificate, codigo, base_url)  # calentamiento (plantilla, fuentes)
+
+        self.stdout.write(f'{"QR":>16} {"ms/certificado":>15} {"certificados/s":>15} {"bytes":>8}')
+        for label, engine, cold in (
+            ('png', draw_qr_png, True),
+            ('vector frío', draw_qr, True),
+            ('vector caliente', draw_qr, False),
+        ):
+            elapsed = 0.0
+            with mock.patch('quiz.views.draw_qr', engine):
+                for index in range(repeat):
+                    if cold:
+                        # Un código distinto por certificado: la matriz no está memoizada
+                        qr_matrix.cache_clear()
+                        certificate.certificate_code = str(index + 2).zfill(3)
+                    started = time.perf_counter()
+                    pdf = render_certificado_manual(certificate, codigo, base_url)
+                    elapsed += time.perf_counter() - started
+            self.stdout.write(
+                f'{label:>16} {elapsed * 1000 / repeat:>15.2f} {repeat / elapsed:>15.1f} {len(pdf):>8}'
+            )
+
+    def bench_dashboard(self, sizes, repeat, options):
+        """Tiempo y consultas del dashboard de certificados y de sus filtros según el historial"""
+        course, quiz = self._seed_course()
+        admin = User.objects.create(username='bench-admin', is_staff=True, is_superuser=True)
+        factory = RequestFactory()
+        payload = json.dumps({
+            'tipo': 'todos',
+            'cursos': [str(course.pk)],
+            'fechaDesde': (date.today() - timedelta(days=200)).isoformat(),
+            'fechaHasta': date.today().isoformat(),
+        })
+        views = (
+            ('dashboard', CertificadosDashboardView.as_view(), lambda: factory.get('/')),
+            ('filtros', CertificadosFiltrosAjaxView.as_view(),
+             lambda: factory.post('/', data=payload, content_type='application/json')),
+        )
+        seeded = 0
+
+        self.stdout.write(f'{"sittings":>10} {"vista":>10} {"ms/petición":>12} {"consultas":>10}')
+        for size in sorted(sizes):
+            self._seed_sittings(course, quiz, seeded, size - seeded)
+            seeded = size
+            CertificateLedger.objects.rebuild()
+            for label, view, make_request in views:
+                elapsed = 0.0
+                for _ in range(repeat):
+                    request = make_request()
+                    request.user = admin
+                    started = time.perf_counter()
+                    with CaptureQueriesContext(connection) as queries:
+                        response = view(request)
+                        if hasattr(response, 'render'):
+                            response.render()
+                    elapsed += time.perf_counter() - started
+                self.stdout.write(f'{size:>10} {label:>10} {elapsed * 1000 / repeat:>12.2f} {len(queries):>10}')
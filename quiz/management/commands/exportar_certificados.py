@@ -0,0 +1,87 @@
+#!/usr/bin/env python
+"""
+Comando de gestión para exportar certificados en bloque a un archivo ZIP
+Pensado para exportaciones que no caben en el timeout de gunicorn
+"""
+import datetime
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from course.models import Course
+from quiz.certificate_artifacts import MANUAL, SITTING
+from quiz.certificate_export import (
+    ExportStats,
+    certificados_manuales,
+    certificados_plataforma,
+    iter_certificados,
+    stream_zip,
+)
+
+
+def _fecha(valor):
+    try:
+        return datetime.date.fromisoformat(valor)
+    except ValueError:
+        raise CommandError(f'Fecha inválida "{valor}", use el formato AAAA-MM-DD')
+
+
+class Command(BaseCommand):
+    help = 'Exporta certificados (plataforma y manuales) a un ZIP renderizando en paralelo'
+
+    def add_arguments(self, parser):
+        parser.add_argument('output', help='Ruta del archivo ZIP a generar')
+        parser.add_argument('--course', help='Código del curso')
+        parser.add_argument('--desde', type=_fecha, help='Fecha de aprobación inicial (AAAA-MM-DD)')
+        parser.add_argument('--hasta', type=_fecha, help='Fecha de aprobación final (AAAA-MM-DD)')
+        parser.add_argument(
+            '--dnis-file',
+            help='Archivo de texto con un DNI por línea',
+        )
+        parser.add_argument(
+            '--sin-manuales',
+            action='store_true',
+            help='Excluir los certificados manuales',
+        )
+        parser.add_argument(
+            '--workers',
+            type=int,
+            help='Procesos de render (por defecto CERTIFICATE_EXPORT_WORKERS o el número de CPUs; 0 = sin pool)',
+        )
+        parser.add_argument(
+            '--base-url',
+            help='Dominio usado en el QR de verificación (por defecto el primero de ALLOWED_HOSTS)',
+        )
+
+    def handle(self, *args, **options):
+        curso = None
+        if options['course']:
+            curso = Course.objects.filter(code=options['course']).first()
+            if curso is None:
+                raise CommandError(f'No se encontró el curso {options["course"]}')
+
+        dnis = []
+        if options['dnis_file']:
+            with open(options['dnis_file'], encoding='utf-8') as dnis_file:
+                dnis = [linea.strip() for linea in dnis_file if linea.strip()]
+
+        if not any((curso, options['desde'], options['hasta'], dnis)):
+            raise CommandError('Indique --course, --desde/--hasta o --dnis-file')
+
+        base_url = options['base_url'] or f"https://{settings.ALLOWED_HOSTS[0]}/"
+        filtros = {'curso': curso, 'desde': options['desde'], 'hasta': options['hasta'], 'dnis': dnis}
+        querysets = [(SITTING, certificados_plataforma(**filtros))]
+        if not options['sin_manuales']:
+            querysets.append((MANUAL, certificados_manuales(**filtros)))
+
+        self.stdout.write(self.style.SUCCESS('📦 Exportando certificados...'))
+        stats = ExportStats()
+        certificados = iter_certificados(querysets, base_url, workers=options['workers'], stats=stats)
+        with open(options['output'], 'wb') as output:
+            for chunk in stream_zip(certificados, resumen=stats.__str__):
+                output.write(chunk)
+                self.stdout.write(f'\r   {stats.total} certificados, {stats.per_second:.1f}/s', ending='')
+
+        self.stdout.write('')
+        self.stdout.write(self.style.SUCCESS(f'✅ {stats}'))
+        self.stdout.write(f'   {stats.bytes / (1024 * 1024):.1f} MB escritos en {options["output"]}')
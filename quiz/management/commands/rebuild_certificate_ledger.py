@@ -0,0 +1,36 @@
+"""
+Comando de gestión para reconstruir el registro de certificados (CertificateLedger)
+Útil después de cargas masivas con bulk_create/update, que no envían señales
+"""
+from django.core.management.base import BaseCommand
+
+from quiz.models import CertificateLedger
+
+
+class Command(BaseCommand):
+    help = 'Reconstruye el registro de certificados desde los sittings aprobados y los certificados manuales'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--quiz',
+            type=int,
+            action='append',
+            dest='quiz_ids',
+            help='Recalcular solo los certificados automáticos de este examen (se puede repetir)',
+        )
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=1000,
+            help='Filas por INSERT (default: 1000)',
+        )
+
+    def handle(self, *args, **options):
+        antes = CertificateLedger.objects.count()
+        automaticos, manuales = CertificateLedger.objects.rebuild(
+            quiz_ids=options['quiz_ids'], batch_size=options['batch_size']
+        )
+        self.stdout.write(f'📋 Filas antes: {antes}, después: {CertificateLedger.objects.count()}')
+        self.stdout.write(self.style.SUCCESS(
+            f'✅ Registro reconstruido: {automaticos} automáticos, {manuales} manuales'
+        ))
@@ -0,0 +1,39 @@
+"""
+Comando de gestión para reparar Quiz.question_count
+Compara el valor guardado con el número real de preguntas y corrige las diferencias
+"""
+from django.core.management.base import BaseCommand
+from django.db.models import Count
+
+from quiz.models import Quiz, refresh_question_counts
+
+
+class Command(BaseCommand):
+    help = 'Recalcula el número de preguntas guardado en cada examen (Quiz.question_count)'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--dry-run',
+            action='store_true',
+            help='Mostrar los exámenes desincronizados sin corregirlos',
+        )
+
+    def handle(self, *args, **options):
+        quizzes = Quiz.objects.annotate(real_count=Count('question')).order_by('id')
+        mismatched = [quiz for quiz in quizzes if quiz.question_count != quiz.real_count]
+
+        for quiz in mismatched:
+            self.stdout.write(
+                f'⚠️  {quiz.title} (ID {quiz.id}): guardado {quiz.question_count}, real {quiz.real_count}'
+            )
+
+        if not mismatched:
+            self.stdout.write(self.style.SUCCESS('✅ Todos los exámenes tienen el conteo correcto'))
+            return
+
+        if options['dry_run']:
+            self.stdout.write(self.style.WARNING(f'🔍 DRY-RUN: {len(mismatched)} exámenes por corregir'))
+            return
+
+        refresh_question_counts([quiz.id for quiz in mismatched])
+        self.stdout.write(self.style.SUCCESS(f'✅ {len(mismatched)} exámenes corregidos'))
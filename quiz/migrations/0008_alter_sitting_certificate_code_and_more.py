@@ -0,0 +1,272 @@
+# Generated by Django 4.2 on 2026-10-18 07:19
+
+from django.conf import settings
+import django.core.validators
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("course", "0011_course_is_external_upload_external_url_and_more"),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ("quiz", "0007_sitting_certificate_code"),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name="sitting",
+            name="certificate_code",
+            field=models.CharField(blank=True, max_length=32, null=True),
+        ),
+        migrations.AlterUniqueTogether(
+            name="sitting",
+            unique_together={("course", "certificate_code")},
+        ),
+        migrations.CreateModel(
+            name="SittingAuditLog",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                (
+                    "field_changed",
+                    models.CharField(max_length=50, verbose_name="Campo Modificado"),
+                ),
+                (
+                    "old_value",
+                    models.TextField(
+                        blank=True, null=True, verbose_name="Valor Anterior"
+                    ),
+                ),
+                (
+                    "new_value",
+                    models.TextField(blank=True, null=True, verbose_name="Valor Nuevo"),
+                ),
+                (
+                    "changed_at",
+                    models.DateTimeField(
+                        auto_now_add=True, verbose_name="Fecha de Cambio"
+                    ),
+                ),
+                (
+                    "reason",
+                    models.TextField(
+                        blank=True, null=True, verbose_name="Motivo del Cambio"
+                    ),
+                ),
+                (
+                    "ip_address",
+                    models.GenericIPAddressField(
+                        blank=True, null=True, verbose_name="Dirección IP"
+                    ),
+                ),
+                (
+                    "user_agent",
+                    models.TextField(blank=True, null=True, verbose_name="User Agent"),
+                ),
+                (
+                    "changed_by",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        to=settings.AUTH_USER_MODEL,
+                        verbose_name="Modificado por",
+                    ),
+                ),
+                (
+                    "sitting",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="audit_logs",
+                        to="quiz.sitting",
+                    ),
+                ),
+            ],
+            options={
+                "verbose_name": "Log de Auditoría de Examen",
+                "verbose_name_plural": "Logs de Auditoría de Exámenes",
+                "ordering": ["-changed_at"],
+            },
+        ),
+        migrations.CreateModel(
+            name="ManualCertificate",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                (
+                    "nombre_completo",
+                    models.CharField(max_length=200, verbose_name="Nombre Completo"),
+                ),
+                ("dni", models.CharField(max_length=20, verbose_name="DNI")),
+                (
+                    "puntaje",
+                    models.IntegerField(
+                        help_text="Puntaje en escala de 20",
+                        validators=[
+                            django.core.validators.MinValueValidator(0),
+                            django.core.validators.MaxValueValidator(20),
+                        ],
+                        verbose_name="Puntaje",
+                    ),
+                ),
+                (
+                    "fecha_aprobacion",
+                    models.DateField(verbose_name="Fecha de Aprobación"),
+                ),
+                (
+                    "fecha_vencimiento",
+                    models.DateField(
+                        editable=False, verbose_name="Fecha de Vencimiento"
+                    ),
+                ),
+                (
+                    "certificate_code",
+                    models.CharField(
+                        editable=False,
+                        max_length=32,
+                        verbose_name="Código del Certificado",
+                    ),
+                ),
+                (
+                    "fecha_generacion",
+                    models.DateTimeField(
+                        auto_now_add=True, verbose_name="Fecha de Generación"
+                    ),
+                ),
+                ("activo", models.BooleanField(default=True, verbose_name="Activo")),
+                (
+                    "curso",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        to="course.course",
+                        verbose_name="Curso",
+                    ),
+                ),
+                (
+                    "generado_por",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        to=settings.AUTH_USER_MODEL,
+                        verbose_name="Generado por",
+                    ),
+                ),
+            ],
+            options={
+                "verbose_name": "Certificado Manual",
+                "verbose_name_plural": "Certificados Manuales",
+                "ordering": ["-fecha_generacion"],
+                "unique_together": {("dni", "curso", "certificate_code")},
+            },
+        ),
+        migrations.CreateModel(
+            name="ExternalCourseEnrollment",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                (
+                    "score",
+                    models.DecimalField(
+                        blank=True,
+                        decimal_places=2,
+                        default=None,
+                        help_text="Nota del alumno (escala de 0 a 20)",
+                        max_digits=5,
+                        null=True,
+                        validators=[
+                            django.core.validators.MinValueValidator(0),
+                            django.core.validators.MaxValueValidator(20),
+                        ],
+                        verbose_name="Nota",
+                    ),
+                ),
+                (
+                    "certificate_url",
+                    models.URLField(
+                        blank=True,
+                        help_text="Enlace de Google Drive al certificado del alumno",
+                        max_length=500,
+                        null=True,
+                        verbose_name="URL del Certificado",
+                    ),
+                ),
+                (
+                    "dni",
+                    models.CharField(
+                        blank=True,
+                        help_text="Documento Nacional de Identidad del alumno",
+                        max_length=20,
+                        verbose_name="DNI",
+                    ),
+                ),
+                (
+                    "fecha_registro",
+                    models.DateTimeField(
+                        auto_now_add=True, verbose_name="Fecha de Registro"
+                    ),
+                ),
+                (
+                    "fecha_actualizacion",
+                    models.DateTimeField(
+                        auto_now=True, verbose_name="Fecha de Actualización"
+                    ),
+                ),
+                ("activo", models.BooleanField(default=True, verbose_name="Activo")),
+                (
+                    "course",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="external_enrollments",
+                        to="course.course",
+                        verbose_name="Curso",
+                    ),
+                ),
+                (
+                    "creado_por",
+                    models.ForeignKey(
+                        blank=True,
+                        null=True,
+                        on_delete=django.db.models.deletion.SET_NULL,
+                        related_name="external_courses_created",
+                        to=settings.AUTH_USER_MODEL,
+                        verbose_name="Creado por",
+                    ),
+                ),
+                (
+                    "user",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="external_course_enrollments",
+                        to=settings.AUTH_USER_MODEL,
+                        verbose_name="Usuario",
+                    ),
+                ),
+            ],
+            options={
+                "verbose_name": "Inscripción en Curso Externo",
+                "verbose_name_plural": "Inscripciones en Cursos Externos",
+                "ordering": ["-fecha_registro"],
+                "unique_together": {("user", "course")},
+            },
+        ),
+    ]
@@ -0,0 +1,56 @@
+# Generated by Django 4.2 on 2026-10-18 07:20
+
+from django.db import migrations, models
+from django.db.models import F, Value
+from django.db.models.functions import Concat
+
+
+def backfill_full_code(apps, schema_editor):
+    """Rellena <código_curso>-<correlativo> para los certificados existentes"""
+    Course = apps.get_model("course", "Course")
+    Sitting = apps.get_model("quiz", "Sitting")
+    ManualCertificate = apps.get_model("quiz", "ManualCertificate")
+
+    for course_id, code in Course.objects.values_list("id", "code"):
+        full_code = Concat(Value(f"{code}-"), F("certificate_code"))
+        Sitting.objects.filter(course_id=course_id).exclude(
+            certificate_code__isnull=True
+        ).exclude(certificate_code="").update(full_code=full_code)
+        ManualCertificate.objects.filter(curso_id=course_id).exclude(
+            certificate_code=""
+        ).update(full_code=full_code)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("quiz", "0008_alter_sitting_certificate_code_and_more"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="manualcertificate",
+            name="full_code",
+            field=models.CharField(
+                blank=True,
+                db_index=True,
+                editable=False,
+                max_length=240,
+                null=True,
+                verbose_name="Código completo del certificado",
+            ),
+        ),
+        migrations.AddField(
+            model_name="sitting",
+            name="full_code",
+            field=models.CharField(
+                blank=True,
+                editable=False,
+                max_length=240,
+                null=True,
+                unique=True,
+                verbose_name="Código completo del certificado",
+            ),
+        ),
+        migrations.RunPython(backfill_full_code, migrations.RunPython.noop),
+    ]
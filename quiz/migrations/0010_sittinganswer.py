@@ -0,0 +1,77 @@
+# Generated by Django 4.2 on 2026-10-18 12:05
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("quiz", "0009_certificate_full_code"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="SittingAnswer",
+            fields=[
+                ("id", models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name="ID")),
+                ("position", models.PositiveIntegerField(verbose_name="Position")),
+                ("answer", models.TextField(blank=True, verbose_name="Answer")),
+                ("correct", models.BooleanField(default=False, verbose_name="Correct")),
+                (
+                    "choice",
+                    models.ForeignKey(
+                        blank=True,
+                        null=True,
+                        on_delete=django.db.models.deletion.SET_NULL,
+                        related_name="+",
+                        to="quiz.choice",
+                        verbose_name="Choice",
+                    ),
+                ),
+                (
+                    "question",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="sitting_answers",
+                        to="quiz.question",
+                        verbose_name="Question",
+                    ),
+                ),
+                (
+                    "sitting",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="answers",
+                        to="quiz.sitting",
+                        verbose_name="Sitting",
+                    ),
+                ),
+            ],
+            options={
+                "ordering": ["sitting", "position"],
+                "indexes": [models.Index(fields=["question", "correct"], name="quiz_answer_question_idx")],
+                "unique_together": {("sitting", "question")},
+            },
+        ),
+        # Las columnas de texto se conservan hasta convertir los datos (0011)
+        migrations.RenameField(
+            model_name="sitting",
+            old_name="question_order",
+            new_name="legacy_question_order",
+        ),
+        migrations.RenameField(
+            model_name="sitting",
+            old_name="question_list",
+            new_name="legacy_question_list",
+        ),
+        migrations.AddField(
+            model_name="sitting",
+            name="question_order",
+            field=models.JSONField(blank=True, default=list, verbose_name="Question Order"),
+        ),
+        migrations.AddField(
+            model_name="sitting",
+            name="question_list",
+            field=models.JSONField(blank=True, default=list, verbose_name="Question List"),
+        ),
+    ]
@@ -0,0 +1,96 @@
+# Generated by Django 4.2 on 2026-10-18 12:05
+
+import json
+
+from django.db import migrations
+
+BATCH_SIZE = 500
+
+
+def _ids(value):
+    return [int(item) for item in (value or "").split(",") if item.strip().isdigit()]
+
+
+def _answers(value):
+    try:
+        answers = json.loads(value or "{}")
+    except ValueError:
+        return {}
+    return answers if isinstance(answers, dict) else {}
+
+
+def forwards(apps, schema_editor):
+    """Pasa las listas separadas por comas a JSON y user_answers a filas de SittingAnswer"""
+    Sitting = apps.get_model("quiz", "Sitting")
+    SittingAnswer = apps.get_model("quiz", "SittingAnswer")
+    Question = apps.get_model("quiz", "Question")
+    Choice = apps.get_model("quiz", "Choice")
+
+    question_ids = set(Question.objects.values_list("id", flat=True))
+    choice_questions = dict(Choice.objects.values_list("id", "question_id"))
+
+    sittings = Sitting.objects.only(
+        "id", "legacy_question_order", "legacy_question_list", "incorrect_questions", "user_answers"
+    )
+    pending = []
+    for sitting in sittings.iterator(chunk_size=BATCH_SIZE):
+        order = _ids(sitting.legacy_question_order)
+        incorrect = set(_ids(sitting.incorrect_questions))
+        sitting.question_order = order
+        sitting.question_list = _ids(sitting.legacy_question_list)
+        sitting.save(update_fields=["question_order", "question_list"])
+
+        answers = {}
+        for question_id, guess in _answers(sitting.user_answers).items():
+            if str(question_id).isdigit():
+                answers[int(question_id)] = "" if guess is None else str(guess)
+        # Preguntas marcadas como incorrectas sin respuesta registrada
+        for question_id in incorrect - answers.keys():
+            answers[question_id] = ""
+
+        for question_id, guess in answers.items():
+            if question_id not in question_ids:
+                continue
+            choice_id = int(guess) if guess.isdigit() else None
+            pending.append(
+                SittingAnswer(
+                    sitting_id=sitting.id,
+                    question_id=question_id,
+                    position=order.index(question_id) if question_id in order else len(order),
+                    choice_id=choice_id if choice_questions.get(choice_id) == question_id else None,
+                    answer=guess,
+                    correct=question_id not in incorrect,
+                )
+            )
+        if len(pending) >= BATCH_SIZE:
+            SittingAnswer.objects.bulk_create(pending)
+            pending = []
+    SittingAnswer.objects.bulk_create(pending)
+
+
+def backwards(apps, schema_editor):
+    Sitting = apps.get_model("quiz", "Sitting")
+    SittingAnswer = apps.get_model("quiz", "SittingAnswer")
+
+    for sitting in Sitting.objects.iterator(chunk_size=BATCH_SIZE):
+        answers = list(SittingAnswer.objects.filter(sitting_id=sitting.id).order_by("position"))
+        sitting.legacy_question_order = "".join(f"{question_id}," for question_id in sitting.question_order)
+        sitting.legacy_question_list = "".join(f"{question_id}," for question_id in sitting.question_list)
+        sitting.incorrect_questions = "".join(
+            f"{answer.question_id}," for answer in answers if not answer.correct
+        )
+        sitting.user_answers = json.dumps({str(answer.question_id): answer.answer for answer in answers})
+        sitting.save(
+            update_fields=["legacy_question_order", "legacy_question_list", "incorrect_questions", "user_answers"]
+        )
+    SittingAnswer.objects.all().delete()
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("quiz", "0010_sittinganswer"),
+    ]
+
+    operations = [
+        migrations.RunPython(forwards, backwards),
+    ]
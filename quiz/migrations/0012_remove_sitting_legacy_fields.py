@@ -0,0 +1,50 @@
+# Generated by Django 4.2 on 2026-10-18 12:05
+
+import django.core.validators
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("quiz", "0011_convert_sitting_answers"),
+    ]
+
+    operations = [
+        # blank=True permite volver a crear las columnas vacías al revertir
+        migrations.AlterField(
+            model_name="sitting",
+            name="legacy_question_order",
+            field=models.CharField(
+                blank=True,
+                max_length=1024,
+                validators=[django.core.validators.validate_comma_separated_integer_list],
+                verbose_name="Question Order",
+            ),
+        ),
+        migrations.AlterField(
+            model_name="sitting",
+            name="legacy_question_list",
+            field=models.CharField(
+                blank=True,
+                max_length=1024,
+                validators=[django.core.validators.validate_comma_separated_integer_list],
+                verbose_name="Question List",
+            ),
+        ),
+        migrations.RemoveField(
+            model_name="sitting",
+            name="legacy_question_order",
+        ),
+        migrations.RemoveField(
+            model_name="sitting",
+            name="legacy_question_list",
+        ),
+        migrations.RemoveField(
+            model_name="sitting",
+            name="incorrect_questions",
+        ),
+        migrations.RemoveField(
+            model_name="sitting",
+            name="user_answers",
+        ),
+    ]
@@ -0,0 +1,36 @@
+# Generated by Django 4.2 on 2026-10-18 08:00
+
+from django.db import migrations, models
+from django.db.models.functions import Coalesce
+
+
+def fill_question_count(apps, schema_editor):
+    """Calcula question_count de los exámenes existentes en un solo UPDATE"""
+    Quiz = apps.get_model("quiz", "Quiz")
+    Through = apps.get_model("quiz", "Question").quiz.through
+    count = (
+        Through.objects.filter(quiz_id=models.OuterRef("pk"))
+        .order_by()
+        .values("quiz_id")
+        .annotate(total=models.Count("id"))
+        .values("total")
+    )
+    Quiz.objects.update(question_count=Coalesce(models.Subquery(count), 0))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("quiz", "0012_remove_sitting_legacy_fields"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="quiz",
+            name="question_count",
+            field=models.PositiveIntegerField(
+                default=0, editable=False, verbose_name="Question count"
+            ),
+        ),
+        migrations.RunPython(fill_question_count, migrations.RunPython.noop),
+    ]
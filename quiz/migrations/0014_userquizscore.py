@@ -0,0 +1,136 @@
+# Generated by Django 4.2 on 2026-10-18 08:03
+
+import re
+from collections import defaultdict
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+
+# Cada entrada de Progress.score es "<examen>,<puntaje>,<posible>,"
+ENTRY_RE = re.compile(r"(?P<quiz>.*?),(?P<score>\d+),(?P<possible>\d+),")
+
+
+def forwards(apps, schema_editor):
+    """Pasa las cadenas de Progress.score a filas de UserQuizScore"""
+    Progress = apps.get_model("quiz", "Progress")
+    Quiz = apps.get_model("quiz", "Quiz")
+    SittingAnswer = apps.get_model("quiz", "SittingAnswer")
+    UserQuizScore = apps.get_model("quiz", "UserQuizScore")
+
+    titles = defaultdict(list)
+    for quiz_id, title in Quiz.objects.values_list("id", "title"):
+        titles[title].append(quiz_id)
+
+    totals = defaultdict(lambda: [0, 0])
+    unresolved_users = set()
+    for user_id, score in Progress.objects.exclude(score="").values_list("user_id", "score"):
+        for entry in ENTRY_RE.finditer(score):
+            quiz_ids = titles.get(entry.group("quiz"), [])
+            if len(quiz_ids) != 1:
+                # str(question.quiz) guardaba "quiz.Quiz.None": la clave no identifica el examen
+                unresolved_users.add(user_id)
+                continue
+            total = totals[(user_id, quiz_ids[0])]
+            total[0] += int(entry.group("score"))
+            total[1] += int(entry.group("possible"))
+
+    # Para esas entradas la mejor fuente disponible son las respuestas guardadas
+    answers = (
+        SittingAnswer.objects.filter(sitting__user_id__in=unresolved_users)
+        .values("sitting__user_id", "sitting__quiz_id")
+        .annotate(
+            score=models.Count("id", filter=models.Q(correct=True)),
+            possible=models.Count("id"),
+        )
+        .order_by()
+    )
+    for row in answers:
+        key = (row["sitting__user_id"], row["sitting__quiz_id"])
+        if key not in totals:
+            totals[key] = [row["score"], row["possible"]]
+
+    UserQuizScore.objects.bulk_create(
+        [
+            UserQuizScore(user_id=user_id, quiz_id=quiz_id, score=score, possible=possible)
+            for (user_id, quiz_id), (score, possible) in totals.items()
+        ],
+        batch_size=500,
+    )
+
+
+def backwards(apps, schema_editor):
+    Progress = apps.get_model("quiz", "Progress")
+    UserQuizScore = apps.get_model("quiz", "UserQuizScore")
+
+    strings = defaultdict(str)
+    for user_id, title, score, possible in UserQuizScore.objects.order_by("id").values_list(
+        "user_id", "quiz__title", "score", "possible"
+    ):
+        strings[user_id] += f"{title},{score},{possible},"
+    for progress in Progress.objects.filter(user_id__in=strings):
+        progress.score = strings[progress.user_id][:1024]
+        progress.save(update_fields=["score"])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ("quiz", "0013_quiz_question_count"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="UserQuizScore",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("score", models.PositiveIntegerField(default=0, verbose_name="Score")),
+                (
+                    "possible",
+                    models.PositiveIntegerField(default=0, verbose_name="Possible"),
+                ),
+                (
+                    "quiz",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="user_scores",
+                        to="quiz.quiz",
+                        verbose_name="Quiz",
+                    ),
+                ),
+                (
+                    "user",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="quiz_scores",
+                        to=settings.AUTH_USER_MODEL,
+                        verbose_name="User",
+                    ),
+                ),
+            ],
+            options={
+                "verbose_name": "User quiz score",
+                "verbose_name_plural": "User quiz scores",
+                "unique_together": {("user", "quiz")},
+            },
+        ),
+        migrations.AlterField(
+            model_name="progress",
+            name="score",
+            field=models.CharField(blank=True, default="", max_length=1024, verbose_name="Score"),
+        ),
+        migrations.RunPython(forwards, backwards),
+        migrations.RemoveField(
+            model_name="progress",
+            name="score",
+        ),
+    ]
@@ -0,0 +1,19 @@
+# Generated by Django 4.2 on 2026-10-18 08:05
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("quiz", "0014_userquizscore"),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="sitting",
+            index=models.Index(
+                fields=["user", "quiz", "complete"], name="quiz_sitting_user_quiz_idx"
+            ),
+        ),
+    ]
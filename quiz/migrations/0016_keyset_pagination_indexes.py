@@ -0,0 +1,25 @@
+# Generated by Django 4.2 on 2026-10-18 08:12
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("quiz", "0015_sitting_user_quiz_index"),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="externalcourseenrollment",
+            index=models.Index(
+                fields=["fecha_registro", "id"], name="quiz_extenroll_fecha_idx"
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="manualcertificate",
+            index=models.Index(
+                fields=["fecha_generacion", "id"], name="quiz_manualcert_fecha_idx"
+            ),
+        ),
+    ]
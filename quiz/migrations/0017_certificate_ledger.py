@@ -0,0 +1,194 @@
+# Generated by Django 4.2 on 2026-10-18 08:18
+
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import migrations, models
+from django.db.models.functions import Coalesce
+from django.utils.timezone import localdate
+import django.db.models.deletion
+
+VIGENCIA = timedelta(days=365)
+
+
+def fill_ledger(apps, schema_editor):
+    """Carga el registro con el último sitting aprobado por usuario+examen y los certificados manuales"""
+    Sitting = apps.get_model("quiz", "Sitting")
+    ManualCertificate = apps.get_model("quiz", "ManualCertificate")
+    CertificateLedger = apps.get_model("quiz", "CertificateLedger")
+
+    approved = (
+        Sitting.objects.filter(complete=True, quiz__question_count__gt=0)
+        .alias(score_percent=models.F("current_score") * 100)
+        .filter(score_percent__gte=models.F("quiz__pass_mark") * models.F("quiz__question_count"))
+        .annotate(fecha_efectiva=Coalesce("fecha_aprobacion", "end", "start"))
+        .select_related("user")
+        .order_by("user_id", "quiz_id", "-fecha_efectiva", "-pk")
+    )
+    rows, seen = [], set()
+    for sitting in approved.iterator(chunk_size=1000):
+        if (sitting.user_id, sitting.quiz_id) in seen:
+            continue
+        seen.add((sitting.user_id, sitting.quiz_id))
+        user = sitting.user
+        fecha_aprobacion = localdate(sitting.fecha_efectiva)
+        rows.append(
+            CertificateLedger(
+                tipo="automatico",
+                sitting_id=sitting.pk,
+                user_id=sitting.user_id,
+                quiz_id=sitting.quiz_id,
+                curso_id=sitting.course_id,
+                nombre_completo=(
+                    f"{user.first_name} {user.last_name}" if user.first_name and user.last_name else user.username
+                ),
+                dni=user.username,
+                fecha_aprobacion=fecha_aprobacion,
+                fecha_vencimiento=fecha_aprobacion + VIGENCIA,
+                full_code=sitting.full_code,
+            )
+        )
+    for certificate in ManualCertificate.objects.iterator(chunk_size=1000):
+        rows.append(
+            CertificateLedger(
+                tipo="manual",
+                certificado_manual_id=certificate.pk,
+                curso_id=certificate.curso_id,
+                nombre_completo=certificate.nombre_completo,
+                dni=certificate.dni,
+                fecha_aprobacion=certificate.fecha_aprobacion,
+                fecha_vencimiento=certificate.fecha_vencimiento,
+                full_code=certificate.full_code,
+                activo=certificate.activo,
+            )
+        )
+    CertificateLedger.objects.bulk_create(rows, batch_size=1000)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("course", "0011_course_is_external_upload_external_url_and_more"),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ("quiz", "0016_keyset_pagination_indexes"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="CertificateLedger",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                (
+                    "tipo",
+                    models.CharField(
+                        choices=[("automatico", "Automático"), ("manual", "Manual")],
+                        max_length=10,
+                        verbose_name="Tipo",
+                    ),
+                ),
+                (
+                    "nombre_completo",
+                    models.CharField(max_length=200, verbose_name="Nombre Completo"),
+                ),
+                ("dni", models.CharField(max_length=150, verbose_name="DNI")),
+                (
+                    "fecha_aprobacion",
+                    models.DateField(verbose_name="Fecha de Aprobación"),
+                ),
+                (
+                    "fecha_vencimiento",
+                    models.DateField(verbose_name="Fecha de Vencimiento"),
+                ),
+                (
+                    "full_code",
+                    models.CharField(
+                        blank=True,
+                        max_length=240,
+                        null=True,
+                        verbose_name="Código completo del certificado",
+                    ),
+                ),
+                ("activo", models.BooleanField(default=True, verbose_name="Activo")),
+                (
+                    "certificado_manual",
+                    models.OneToOneField(
+                        blank=True,
+                        null=True,
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="ledger_entry",
+                        to="quiz.manualcertificate",
+                    ),
+                ),
+                (
+                    "curso",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        to="course.course",
+                        verbose_name="Curso",
+                    ),
+                ),
+                (
+                    "quiz",
+                    models.ForeignKey(
+                        blank=True,
+                        null=True,
+                        on_delete=django.db.models.deletion.CASCADE,
+                        to="quiz.quiz",
+                    ),
+                ),
+                (
+                    "sitting",
+                    models.OneToOneField(
+                        blank=True,
+                        null=True,
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="ledger_entry",
+                        to="quiz.sitting",
+                    ),
+                ),
+                (
+                    "user",
+                    models.ForeignKey(
+                        blank=True,
+                        null=True,
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="certificate_ledger",
+                        to=settings.AUTH_USER_MODEL,
+                    ),
+                ),
+            ],
+            options={
+                "verbose_name": "Registro de Certificado",
+                "verbose_name_plural": "Registro de Certificados",
+            },
+        ),
+        migrations.AddIndex(
+            model_name="certificateledger",
+            index=models.Index(
+                fields=["curso", "fecha_aprobacion"], name="quiz_ledger_curso_fecha_idx"
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="certificateledger",
+            index=models.Index(
+                fields=["fecha_vencimiento"], name="quiz_ledger_vencimiento_idx"
+            ),
+        ),
+        migrations.AddConstraint(
+            model_name="certificateledger",
+            constraint=models.UniqueConstraint(
+                condition=models.Q(("tipo", "automatico")),
+                fields=("user", "quiz"),
+                name="quiz_ledger_user_quiz_uniq",
+            ),
+        ),
+        migrations.RunPython(fill_ledger, migrations.RunPython.noop),
+    ]
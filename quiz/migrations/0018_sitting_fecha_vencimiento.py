@@ -0,0 +1,47 @@
+# Generated by Django 4.2 on 2026-10-18 08:23
+
+from datetime import timedelta
+
+from django.db import migrations, models
+from django.utils.timezone import localdate
+
+VIGENCIA = timedelta(days=365)
+
+
+def fill_fecha_vencimiento(apps, schema_editor):
+    Sitting = apps.get_model("quiz", "Sitting")
+    pending = []
+    for sitting in Sitting.objects.filter(fecha_aprobacion__isnull=False).only("fecha_aprobacion").iterator(chunk_size=1000):
+        sitting.fecha_vencimiento = localdate(sitting.fecha_aprobacion) + VIGENCIA
+        pending.append(sitting)
+        if len(pending) >= 1000:
+            Sitting.objects.bulk_update(pending, ["fecha_vencimiento"])
+            pending = []
+    Sitting.objects.bulk_update(pending, ["fecha_vencimiento"])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("quiz", "0017_certificate_ledger"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="sitting",
+            name="fecha_vencimiento",
+            field=models.DateField(
+                blank=True,
+                editable=False,
+                null=True,
+                verbose_name="Fecha de Vencimiento",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="sitting",
+            index=models.Index(
+                fields=["fecha_vencimiento"], name="quiz_sitting_vencimiento_idx"
+            ),
+        ),
+        migrations.RunPython(fill_fecha_vencimiento, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,54 @@
+# Generated by Django 4.2 on 2026-10-18 08:35
+
+import unicodedata
+
+from django.db import migrations, models
+
+
+def normalizar(texto):
+    sin_tildes = unicodedata.normalize("NFKD", texto or "").encode("ascii", "ignore").decode("ascii")
+    return " ".join(sin_tildes.lower().split())
+
+
+def fill_nombre_busqueda(apps, schema_editor):
+    CertificateLedger = apps.get_model("quiz", "CertificateLedger")
+    pending = []
+    for entry in CertificateLedger.objects.only("nombre_completo").iterator(chunk_size=1000):
+        entry.nombre_busqueda = normalizar(entry.nombre_completo)
+        pending.append(entry)
+        if len(pending) >= 1000:
+            CertificateLedger.objects.bulk_update(pending, ["nombre_busqueda"])
+            pending = []
+    CertificateLedger.objects.bulk_update(pending, ["nombre_busqueda"])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("quiz", "0018_sitting_fecha_vencimiento"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="certificateledger",
+            name="nombre_busqueda",
+            field=models.CharField(blank=True, editable=False, max_length=200),
+        ),
+        migrations.AddIndex(
+            model_name="certificateledger",
+            index=models.Index(
+                fields=["nombre_busqueda"],
+                name="quiz_ledger_nombre_idx",
+                opclasses=["varchar_pattern_ops"],
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="certificateledger",
+            index=models.Index(
+                fields=["dni"],
+                name="quiz_ledger_dni_idx",
+                opclasses=["varchar_pattern_ops"],
+            ),
+        ),
+        migrations.RunPython(fill_nombre_busqueda, migrations.RunPython.noop),
+    ]
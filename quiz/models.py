@@ -1,5 +1,3 @@
-import json
-import re
 from decimal import Decimal, ROUND_HALF_UP
 
 from django.apps import apps
@@ -7,21 +5,29 @@ from django.conf import settings
 from django.core.exceptions import ImproperlyConfigured, ValidationError
 from django.core.validators import (
     MaxValueValidator,
-    validate_comma_separated_integer_list,
     MinValueValidator,
 )
-from django.db import models
+from django.db import IntegrityError, connections, models, transaction
 from django.db.models import Q
-from django.db.models.signals import pre_save
+from django.db.models.functions import Cast, Coalesce, Concat, Mod, RowNumber
+from django.db.models.signals import m2m_changed, post_delete, post_save, pre_delete, pre_save
 from django.urls import reverse
-from django.utils.timezone import now
+from django.utils.timezone import localdate, now
 from django.utils.translation import gettext_lazy as _
 from django.dispatch import receiver
 from model_utils.managers import InheritanceManager
+import threading
 from datetime import timedelta
+from itertools import islice
 
 from course.models import Course
+from core.cache_versions import CERTIFICATES, user_scope, versioned_cache
 from core.utils import unique_slug_generator
+from .answer_key import get_answer_key
+from .certificate_artifacts import MANUAL, SITTING, invalidate_artifacts
+from .certificate_numbers import format_certificate_code, next_certificate_code, reserve_certificate_numbers
+from .certificate_utils import normalizar_busqueda
+from .question_bundle import cache_sitting_questions, evict_sitting_questions, get_sitting_question
 
 CHOICE_ORDER_OPTIONS = (
     ("content", _("Content")),
@@ -29,6 +35,9 @@ CHOICE_ORDER_OPTIONS = (
     ("none", _("None")),
 )
 
+# Vigencia de un certificado desde su fecha de aprobación
+CERTIFICATE_VALIDITY = timedelta(days=365)
+
 CATEGORY_OPTIONS = (
     ("assignment", _("Assignment")),
     ("exam", _("Exam")),
@@ -98,6 +107,12 @@ class Quiz(models.Model):
         ),
     )
     timestamp = models.DateTimeField(auto_now=True)
+    # Copia de question_set.count(); la mantienen las señales de Question (ver refresh_question_counts)
+    question_count = models.PositiveIntegerField(
+        default=0,
+        editable=False,
+        verbose_name=_("Question count"),
+    )
 
     objects = QuizManager()
 
@@ -108,6 +123,13 @@ class Quiz(models.Model):
     def __str__(self):
         return self.title
 
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        # pass_mark guardado: quiz_ledger_receiver solo reconstruye el registro si cambió
+        instance._loaded_pass_mark = instance.__dict__.get("pass_mark")
+        return instance
+
     def save(self, *args, **kwargs):
         if self.single_attempt:
             self.exam_paper = True
@@ -115,14 +137,28 @@ class Quiz(models.Model):
         if not (0 <= self.pass_mark <= 100):
             raise ValidationError(_("Pass mark must be between 0 and 100."))
 
+        update_fields = kwargs.get("update_fields")
+        if not self._state.adding and (update_fields is None or "question_count" in update_fields):
+            # question_count lo mantiene refresh_question_counts: una instancia cargada
+            # antes de agregar preguntas tendría un valor desactualizado y lo pisaría
+            stored = (
+                Quiz._base_manager.using(kwargs.get("using") or self._state.db)
+                .filter(pk=self.pk)
+                .values_list("question_count", flat=True)
+                .first()
+            )
+            if stored is not None:
+                self.question_count = stored
+
         super().save(*args, **kwargs)
+        self._loaded_pass_mark = self.pass_mark
 
     def get_questions(self):
         return self.question_set.all().select_subclasses()
 
     @property
     def get_max_score(self):
-        return self.get_questions().count()
+        return self.question_count
 
     def get_absolute_url(self):
         return reverse("quiz_index", kwargs={"slug": self.course.slug})
@@ -136,7 +172,7 @@ def quiz_pre_save_receiver(sender, instance, **kwargs):
 
 class ProgressManager(models.Manager):
     def new_progress(self, user):
-        new_progress = self.create(user=user, score="")
+        new_progress = self.create(user=user)
         return new_progress
 
 
@@ -144,11 +180,6 @@ class Progress(models.Model):
     user = models.OneToOneField(
         settings.AUTH_USER_MODEL, verbose_name=_("User"), on_delete=models.CASCADE
     )
-    score = models.CharField(
-        max_length=1024,
-        verbose_name=_("Score"),
-        validators=[validate_comma_separated_integer_list],
-    )
 
     objects = ProgressManager()
 
@@ -157,32 +188,30 @@ class Progress(models.Model):
         verbose_name_plural = _("User progress records")
 
     def list_all_cat_scores(self):
-        return {}  # Implement as needed
-
-    def update_score(self, question, score_to_add=0, possible_to_add=0):
+        """Respondidas correctamente, incorrectas y porcentaje por categoría de examen, en una sola consulta"""
+        labels = dict(CATEGORY_OPTIONS)
+        rows = (
+            UserQuizScore.objects.filter(user_id=self.user_id)
+            .values("quiz__category")
+            .annotate(score=models.Sum("score"), possible=models.Sum("possible"))
+            .order_by("quiz__category")
+        )
+        scores = {}
+        for row in rows:
+            label = labels.get(row["quiz__category"], _("Sin categoría"))
+            possible = row["possible"] or 0
+            percent = int(round(row["score"] * 100 / possible)) if possible else 0
+            scores[label] = [row["score"], possible - row["score"], percent]
+        return scores
+
+    def update_score(self, quiz, score_to_add=0, possible_to_add=0):
         if not isinstance(score_to_add, int) or not isinstance(possible_to_add, int):
             return _("Error"), _("Invalid score values.")
-
-        to_find = re.escape(str(question.quiz)) + r",(?P<score>\d+),(?P<possible>\d+),"
-        match = re.search(to_find, self.score, re.IGNORECASE)
-
-        if match:
-            updated_score = int(match.group("score")) + abs(score_to_add)
-            updated_possible = int(match.group("possible")) + abs(possible_to_add)
-            new_score = ",".join(
-                [str(question.quiz), str(updated_score), str(updated_possible), ""]
-            )
-            self.score = self.score.replace(match.group(), new_score)
-            self.save()
-        else:
-            self.score += ",".join(
-                [str(question.quiz), str(score_to_add), str(possible_to_add), ""]
-            )
-            self.save()
+        UserQuizScore.objects.add(self.user_id, quiz, score_to_add, possible_to_add)
 
     def show_exams(self):
         # Obtener todos los exámenes completados del usuario
-        sittings = Sitting.objects.filter(user=self.user, complete=True).order_by("-end")
+        sittings = Sitting.objects.filter(user=self.user, complete=True).select_related("quiz").order_by("-end")
         # Agrupar por curso y quiz, mostrar solo el aprobado si existe
         filtered = []
         vistos = set()
@@ -195,13 +224,143 @@ class Progress(models.Model):
                 vistos.add(key)
             else:
                 # Solo agregar el no aprobado si no hay aprobado para ese curso/quiz
-                if not Sitting.objects.filter(user=self.user, course=sitting.course, quiz=sitting.quiz, complete=True, current_score__gte=sitting.quiz.pass_mark * sitting.quiz.get_max_score / 100).exists():
+                if not Sitting.objects.approved().filter(user=self.user, course_id=sitting.course_id, quiz_id=sitting.quiz_id).exists():
                     filtered.append(sitting)
                     vistos.add(key)
         return filtered
 
 
-class SittingManager(models.Manager):
+class UserQuizScoreManager(models.Manager):
+    def add(self, user, quiz, score_to_add=0, possible_to_add=0):
+        """Suma puntaje con un UPDATE atómico; la fila se crea con la primera respuesta del examen"""
+        user_id = getattr(user, "pk", user)
+        quiz_id = getattr(quiz, "pk", quiz)
+        score_to_add, possible_to_add = abs(score_to_add), abs(possible_to_add)
+        increments = {
+            "score": models.F("score") + score_to_add,
+            "possible": models.F("possible") + possible_to_add,
+        }
+        if self.filter(user_id=user_id, quiz_id=quiz_id).update(**increments):
+            return
+        try:
+            with transaction.atomic():
+                self.create(user_id=user_id, quiz_id=quiz_id, score=score_to_add, possible=possible_to_add)
+        except IntegrityError:
+            # Otra petición creó la fila entre el UPDATE y el INSERT
+            self.filter(user_id=user_id, quiz_id=quiz_id).update(**increments)
+
+
+class UserQuizScore(models.Model):
+    """Preguntas respondidas correctamente / respondidas en total por usuario y examen"""
+
+    user = models.ForeignKey(
+        settings.AUTH_USER_MODEL, related_name="quiz_scores", on_delete=models.CASCADE, verbose_name=_("User")
+    )
+    quiz = models.ForeignKey(Quiz, related_name="user_scores", on_delete=models.CASCADE, verbose_name=_("Quiz"))
+    score = models.PositiveIntegerField(default=0, verbose_name=_("Score"))
+    possible = models.PositiveIntegerField(default=0, verbose_name=_("Possible"))
+
+    objects = UserQuizScoreManager()
+
+    class Meta:
+        verbose_name = _("User quiz score")
+        verbose_name_plural = _("User quiz scores")
+        unique_together = ["user", "quiz"]
+
+    def __str__(self):
+        return f"{self.user} - {self.quiz}: {self.score}/{self.possible}"
+
+
+# Fecha usada para mostrar/reportar la aprobación (ver Sitting.approval_effective_date)
+EFFECTIVE_DATE = Coalesce("fecha_aprobacion", "end", "start")
+
+
+def _certificate_date(value):
+    """Fecha (local) de un DateTimeField de aprobación"""
+    return localdate(value) if value.tzinfo is not None else value.date()
+
+
+class JSONArrayLength(models.Func):
+    """Número de elementos de un JSONField que guarda una lista"""
+    function = "JSON_ARRAY_LENGTH"
+    output_field = models.IntegerField()
+
+    def as_postgresql(self, compiler, connection, **extra_context):
+        return super().as_sql(compiler, connection, function="JSONB_ARRAY_LENGTH", **extra_context)
+
+    def as_mysql(self, compiler, connection, **extra_context):
+        return super().as_sql(compiler, connection, function="JSON_LENGTH", **extra_context)
+
+
+def _count_subquery(queryset):
+    return Coalesce(
+        models.Subquery(
+            queryset.order_by().values("user_id").annotate(total=models.Count("pk")).values("total")
+        ),
+        0,
+    )
+
+
+class SittingQuerySet(models.QuerySet):
+    def approved(self):
+        """
+        Sittings completos que aprueban según Sitting.check_if_passed, en SQL: el
+        porcentaje se calcula sobre las preguntas del propio sitting (question_order),
+        no sobre Quiz.question_count, así que agregar preguntas no cambia el historial.
+        get_percent_correct redondea con round() (mitades al par), por eso
+        round(100*s/n) >= p equivale a 200*s > (2p-1)*n, o a la igualdad con p par.
+        """
+        passes = (
+            models.Q(doubled_score__gt=models.F("pass_threshold"))
+            | models.Q(doubled_score=models.F("pass_threshold"), pass_mark_parity=0)
+        )
+        return self.filter(complete=True).alias(
+            question_total=JSONArrayLength("question_order"),
+            doubled_score=models.F("current_score") * 200,
+            pass_mark_parity=Mod("quiz__pass_mark", 2),
+        ).alias(
+            pass_threshold=(models.F("quiz__pass_mark") * 2 - 1) * models.F("question_total"),
+        ).filter(
+            # El porcentaje se limita a 0..100: con pass_mark <= 0 aprueba siempre
+            models.Q(quiz__pass_mark__lte=0)
+            | models.Q(passes, question_total__gt=0, quiz__pass_mark__lte=100)
+        )
+
+    def latest_per_user_quiz(self):
+        """
+        Un sitting por usuario+examen: el de fecha efectiva de aprobación más reciente
+        (mismo criterio que Sitting.approval_effective_date). PostgreSQL usa DISTINCT ON;
+        los demás motores ROW_NUMBER() OVER (PARTITION BY usuario, examen).
+        """
+        newest_first = [EFFECTIVE_DATE.desc(), models.F("pk").desc()]
+        if connections[self.db].features.can_distinct_on_fields:
+            latest = self.order_by("user_id", "quiz_id", *newest_first).distinct("user_id", "quiz_id")
+        else:
+            latest = self.alias(
+                position=models.Window(
+                    RowNumber(),
+                    partition_by=[models.F("user_id"), models.F("quiz_id")],
+                    order_by=newest_first,
+                )
+            ).filter(position=1)
+        return self.model._default_manager.filter(pk__in=latest.values("pk"))
+
+    def with_attempt_counts(self):
+        """Intentos completos y aprobados del mismo usuario+examen, como subconsultas correlacionadas"""
+        attempts = Sitting.objects.filter(
+            user_id=models.OuterRef("user_id"), quiz_id=models.OuterRef("quiz_id"), complete=True
+        )
+        return self.annotate(
+            total_attempts=_count_subquery(attempts),
+            approved_attempts=_count_subquery(attempts.approved()),
+        )
+
+    def with_effective_date(self):
+        """Anota fecha_efectiva (nunca nula: start siempre existe), usable como clave de orden/cursor"""
+        return self.annotate(fecha_efectiva=EFFECTIVE_DATE)
+
+
+class SittingManager(models.Manager.from_queryset(SittingQuerySet)):
     def new_sitting(self, user, quiz, course):
         if quiz.random_order:
             question_set = quiz.question_set.all().select_subclasses().order_by("?")
@@ -216,30 +375,22 @@ class SittingManager(models.Manager):
                 )
             )
 
-        questions = ",".join(map(str, question_ids)) + ","
-
         new_sitting = self.create(
             user=user,
             quiz=quiz,
             course=course,
-            question_order=questions,
-            question_list=questions,
-            incorrect_questions="",
+            question_order=question_ids,
+            question_list=list(question_ids),
             current_score=0,
             complete=False,
-            user_answers="{}",
         )
+        # Las páginas siguientes del examen leen las preguntas desde la caché
+        cache_sitting_questions(new_sitting, question_set)
         return new_sitting
 
     def user_sitting(self, user, quiz, course):
         # Verificar si ya existe un registro aprobado
-        approved_sitting = self.filter(
-            user=user,
-            quiz=quiz,
-            course=course,
-            complete=True,
-            current_score__gte=quiz.pass_mark * quiz.get_max_score / 100
-        ).first()
+        approved_sitting = self.approved().filter(user=user, quiz=quiz, course=course).exists()
         if approved_sitting:
             return False  # No permitir crear uno nuevo si ya aprobó
         if (
@@ -266,37 +417,41 @@ class Sitting(models.Model):
     course = models.ForeignKey(
         Course, verbose_name=_("Course"), on_delete=models.CASCADE
     )
-    question_order = models.CharField(
-        max_length=1024,
-        verbose_name=_("Question Order"),
-        validators=[validate_comma_separated_integer_list],
+    # Listas de ids de preguntas; las respuestas viven en SittingAnswer
+    question_order = models.JSONField(
+        default=list, blank=True, verbose_name=_("Question Order")
     )
-    question_list = models.CharField(
-        max_length=1024,
-        verbose_name=_("Question List"),
-        validators=[validate_comma_separated_integer_list],
-    )
-    incorrect_questions = models.CharField(
-        max_length=1024,
-        blank=True,
-        verbose_name=_("Incorrect questions"),
-        validators=[validate_comma_separated_integer_list],
+    question_list = models.JSONField(
+        default=list, blank=True, verbose_name=_("Question List")
     )
     current_score = models.IntegerField(verbose_name=_("Current Score"))
     complete = models.BooleanField(default=False, verbose_name=_("Complete"))
-    user_answers = models.TextField(
-        blank=True, default="{}", verbose_name=_("User Answers")
-    )
     start = models.DateTimeField(auto_now_add=True, verbose_name=_("Start"))
     end = models.DateTimeField(null=True, blank=True, verbose_name=_("End"))
     fecha_aprobacion = models.DateTimeField(null=True, blank=True, verbose_name=_("Fecha de Aprobación"))  # Nuevo campo
+    fecha_vencimiento = models.DateField(
+        null=True, blank=True, editable=False, verbose_name=_("Fecha de Vencimiento")
+    )  # fecha_aprobacion + CERTIFICATE_VALIDITY, se recalcula en save()
     certificate_code = models.CharField(max_length=32, blank=True, null=True)  # Nuevo campo para el código del certificado
+    full_code = models.CharField(
+        max_length=240,
+        unique=True,
+        null=True,
+        blank=True,
+        editable=False,
+        verbose_name=_("Código completo del certificado"),
+    )  # <código_curso>-<correlativo>, indexado para la verificación pública por QR
     
     objects = SittingManager()
 
     class Meta:
         permissions = (("view_sittings", _("Can see completed exams.")),)
         unique_together = ['course', 'certificate_code']
+        indexes = [
+            # Deduplicación usuario+examen y conteo de intentos en la lista de calificación
+            models.Index(fields=["user", "quiz", "complete"], name="quiz_sitting_user_quiz_idx"),
+            models.Index(fields=["fecha_vencimiento"], name="quiz_sitting_vencimiento_idx"),
+        ]
 
     def save(self, *args, **kwargs):
         # Si no tiene un código de certificado asignado Y ha aprobado el examen, generarlo
@@ -306,29 +461,35 @@ class Sitting(models.Model):
             # Cada curso tiene su propia secuencia de certificados (automáticos y manuales)
             # El certificate_code almacena solo el número correlativo (ej: "001", "002")
             # El código completo mostrado en PDF es: <código_curso>-<correlativo> (ej: "C01-001")
-            new_code = self.course.last_cert_code + 1  # Incrementar el último código
-            # Generar un código con 3 dígitos
-            certificate_code = str(new_code).zfill(3)
-            self.certificate_code = certificate_code
-
-            # Actualizar el último código utilizado para este curso
-            self.course.last_cert_code = new_code
-            self.course.save()  # Guardamos el curso con el último código actualizado
-            
+            # Reserva atómica: no lee ni guarda el curso completo
+            self.certificate_code = next_certificate_code(self.course)
+
+        if self.certificate_code:
+            self.full_code = f"{self.course.code}-{self.certificate_code}"
+
+        # Igual que en ManualCertificate: siempre derivada de la fecha de aprobación
+        self.fecha_vencimiento = (
+            _certificate_date(self.fecha_aprobacion) + CERTIFICATE_VALIDITY if self.fecha_aprobacion else None
+        )
+        if kwargs.get("update_fields") is not None and "fecha_aprobacion" in kwargs["update_fields"]:
+            kwargs["update_fields"] = {*kwargs["update_fields"], "fecha_vencimiento"}
+
         super(Sitting, self).save(*args, **kwargs)
 
     def get_first_question(self):
         if not self.question_list:
             return False
-        first_question_id = int(self.question_list.split(",", 1)[0])
-        return Question.objects.get_subclass(id=first_question_id)
+        question = get_sitting_question(self, self.question_list[0])
+        if question is None:
+            # La pregunta ya no existe: mismo error que antes de la caché
+            raise Question.DoesNotExist
+        return question
 
     def remove_first_question(self):
         if not self.question_list:
             return
-        _, remaining_questions = self.question_list.split(",", 1)
-        self.question_list = remaining_questions
-        self.save()
+        self.question_list = self.question_list[1:]
+        self.save(update_fields=["question_list"])
 
     def add_to_score(self, points):
         self.current_score += int(points)
@@ -339,7 +500,7 @@ class Sitting(models.Model):
         return self.current_score
 
     def _question_ids(self):
-        return [int(q) for q in self.question_order.split(",") if q]
+        return self.question_order
 
     @property
     def get_percent_correct(self):
@@ -356,6 +517,7 @@ class Sitting(models.Model):
         if self.check_if_passed:
             self.fecha_aprobacion = now()
         self.save()
+        evict_sitting_questions(self.pk)
 
     @property
     def approval_effective_date(self):
@@ -392,35 +554,39 @@ class Sitting(models.Model):
             user_agent=request.META.get('HTTP_USER_AGENT') if request else None
         )
         
-        # Invalidar caché relacionado
-        from django.core.cache import cache
-        cache.delete_many([
-            f"quiz_marking_stats_{self.user.id}_*",
-            f"certificados_dashboard_*",
-            f"sitting_{self.id}_*"
-        ])
-        
+        # El PDF almacenado muestra la fecha anterior
+        invalidate_artifacts(SITTING, self.id)
+
+        # Las cachés de certificados y del progreso del usuario se invalidan al
+        # sincronizar el registro de certificados en la señal post_save
         return True
 
+    def _question_position(self, question_id):
+        try:
+            return self.question_order.index(question_id)
+        except ValueError:
+            return len(self.question_order)
+
     def add_incorrect_question(self, question):
-        incorrect_ids = self.get_incorrect_questions
-        incorrect_ids.append(question.id)
-        self.incorrect_questions = ",".join(map(str, incorrect_ids)) + ","
+        marked = self.answers.filter(question=question).update(correct=False)
+        if not marked:
+            SittingAnswer.objects.create(
+                sitting=self,
+                question=question,
+                position=self._question_position(question.id),
+                correct=False,
+            )
         if self.complete:
             self.add_to_score(-1)
-        self.save()
 
     @property
     def get_incorrect_questions(self):
-        return [int(q) for q in self.incorrect_questions.split(",") if q]
+        # Usa las respuestas precargadas con prefetch_related("answers") si existen
+        return [answer.question_id for answer in self.answers.all() if not answer.correct]
 
     def remove_incorrect_question(self, question):
-        incorrect_ids = self.get_incorrect_questions
-        if question.id in incorrect_ids:
-            incorrect_ids.remove(question.id)
-            self.incorrect_questions = ",".join(map(str, incorrect_ids)) + ","
+        if self.answers.filter(question=question, correct=False).update(correct=True):
             self.add_to_score(1)
-            self.save()
 
     @property
     def check_if_passed(self):
@@ -433,11 +599,44 @@ class Sitting(models.Model):
         else:
             return _("No has podido pasar este examen, inténtalo de nuevo.")
 
-    def add_user_answer(self, question, guess):
-        user_answers = json.loads(self.user_answers)
-        user_answers[str(question.id)] = guess
-        self.user_answers = json.dumps(user_answers)
-        self.save()
+    def record_answer(self, question, guess, is_correct):
+        """
+        Registra la respuesta a la pregunta actual: un UPDATE del sitting
+        (puntaje y pregunta siguiente) condicionado a que la pregunta siga
+        siendo la primera pendiente, y la fila de SittingAnswer. Un doble envío
+        del formulario no suma dos veces: devuelve False y recarga el sitting.
+        Debe llamarse dentro de una transacción.
+        """
+        if not self.question_list:
+            return False
+
+        updated = Sitting.objects.filter(pk=self.pk, question_list__0=question.id).update(
+            current_score=models.F("current_score") + int(is_correct),
+            question_list=self.question_list[1:],
+        )
+        if not updated:
+            self.refresh_from_db()
+            return False
+
+        self.current_score += int(is_correct)
+        self.question_list = self.question_list[1:]
+        self.add_user_answer(question, guess, is_correct)
+        return True
+
+    def add_user_answer(self, question, guess, is_correct=False):
+        is_choice = isinstance(question, MCQuestion) and str(guess).isdigit()
+        return SittingAnswer.objects.create(
+            sitting=self,
+            question=question,
+            position=self._question_position(question.id),
+            choice_id=int(guess) if is_choice else None,
+            answer=str(guess),
+            correct=is_correct,
+        )
+
+    def answers_by_question(self):
+        """Respuesta (tal como se envió) por id de pregunta"""
+        return {answer.question_id: answer.answer for answer in self.answers.all()}
 
     def get_questions(self, with_answers=False):
         question_ids = self._question_ids()
@@ -446,9 +645,15 @@ class Sitting(models.Model):
             key=lambda q: question_ids.index(q.id),
         )
         if with_answers:
-            user_answers = json.loads(self.user_answers)
+            answer_key = get_answer_key(self.quiz)
+            user_answers = self.answers_by_question()
             for question in questions:
-                question.user_answer = user_answers.get(str(question.id))
+                question.user_answer = user_answers.get(question.id)
+                question.user_answer_text = (
+                    answer_key.answer_text(question, question.user_answer)
+                    if question.user_answer is not None
+                    else ""
+                )
         return questions
 
     @property
@@ -460,9 +665,51 @@ class Sitting(models.Model):
         return len(self._question_ids())
 
     def progress(self):
-        answered = len(json.loads(self.user_answers))
+        # Cada respuesta registrada saca la pregunta de question_list
         total = self.get_max_score
-        return answered, total
+        return total - len(self.question_list), total
+
+
+class SittingAnswerQuerySet(models.QuerySet):
+    def question_stats(self):
+        """Respuestas totales y correctas por pregunta, agregadas en SQL"""
+        return (
+            self.values("question_id")
+            .annotate(
+                respuestas=models.Count("id"),
+                correctas=models.Count("id", filter=Q(correct=True)),
+            )
+            .order_by("question_id")
+        )
+
+
+class SittingAnswer(models.Model):
+    """Respuesta de un participante a una pregunta dentro de un sitting"""
+
+    sitting = models.ForeignKey(
+        Sitting, related_name="answers", on_delete=models.CASCADE, verbose_name=_("Sitting")
+    )
+    question = models.ForeignKey(
+        "Question", related_name="sitting_answers", on_delete=models.CASCADE, verbose_name=_("Question")
+    )
+    position = models.PositiveIntegerField(verbose_name=_("Position"))
+    choice = models.ForeignKey(
+        "Choice", null=True, blank=True, related_name="+", on_delete=models.SET_NULL, verbose_name=_("Choice")
+    )
+    answer = models.TextField(blank=True, verbose_name=_("Answer"))
+    correct = models.BooleanField(default=False, verbose_name=_("Correct"))
+
+    objects = SittingAnswerQuerySet.as_manager()
+
+    class Meta:
+        ordering = ["sitting", "position"]
+        unique_together = ["sitting", "question"]
+        indexes = [
+            models.Index(fields=["question", "correct"], name="quiz_answer_question_idx"),
+        ]
+
+    def __str__(self):
+        return f"{self.sitting_id} - {self.question_id}: {self.answer}"
 
 
 class Question(models.Model):
@@ -526,6 +773,10 @@ class MCQuestion(Question):
             return queryset
 
     def get_choices(self):
+        # Alternativas precargadas por la caché de preguntas del sitting
+        preloaded = getattr(self, "preloaded_choices", None)
+        if preloaded is not None:
+            return preloaded
         return self.order_choices(Choice.objects.filter(question=self))
 
     def get_choices_list(self):
@@ -579,6 +830,31 @@ class EssayQuestion(Question):
         return str(guess)
 
 
+class ExternalCourseEnrollmentQuerySet(models.QuerySet):
+    def for_sittings(self, sittings):
+        """
+        Inscripciones activas de los sittings de cursos externos en una sola consulta,
+        indexadas por (user_id, course_id). Los sittings deben traer quiz__course
+        """
+        pairs = {
+            (sitting.user_id, sitting.quiz.course_id)
+            for sitting in sittings
+            if sitting.quiz.course.is_external
+        }
+        if not pairs:
+            return {}
+        enrollments = self.filter(
+            activo=True,
+            user_id__in={user_id for user_id, _ in pairs},
+            course_id__in={course_id for _, course_id in pairs},
+        )
+        return {
+            (enrollment.user_id, enrollment.course_id): enrollment
+            for enrollment in enrollments
+            if (enrollment.user_id, enrollment.course_id) in pairs
+        }
+
+
 class ExternalCourseEnrollment(models.Model):
     """
     Modelo para gestionar cursos externos donde el certificado se almacena en Google Drive.
@@ -640,11 +916,17 @@ class ExternalCourseEnrollment(models.Model):
         verbose_name=_("Activo")
     )
 
+    objects = ExternalCourseEnrollmentQuerySet.as_manager()
+
     class Meta:
         verbose_name = _("Inscripción en Curso Externo")
         verbose_name_plural = _("Inscripciones en Cursos Externos")
         ordering = ['-fecha_registro']
         unique_together = ['user', 'course']
+        indexes = [
+            # Clave de la paginación por cursor del listado
+            models.Index(fields=['fecha_registro', 'id'], name='quiz_extenroll_fecha_idx'),
+        ]
 
     def __str__(self):
         nota = f"{self.score}" if self.score is not None else "Pendiente"
@@ -698,6 +980,33 @@ class ExternalCourseEnrollment(models.Model):
         return new_score
 
 
+class ManualCertificateManager(models.Manager):
+    def bulk_create_numbered(self, certificates, batch_size=None):
+        """
+        Inserta certificados manuales en bloque (importaciones) reservando los
+        correlativos de cada curso en una sola operación.
+        """
+        certificates = list(certificates)
+        por_curso = {}
+        for certificate in certificates:
+            if not certificate.certificate_code:
+                por_curso.setdefault(certificate.curso_id, []).append(certificate)
+
+        for pendientes in por_curso.values():
+            curso = pendientes[0].curso
+            for certificate, number in zip(pendientes, reserve_certificate_numbers(curso, len(pendientes))):
+                certificate.certificate_code = format_certificate_code(number)
+
+        for certificate in certificates:
+            certificate.full_code = f"{certificate.curso.code}-{certificate.certificate_code}"
+            if certificate.fecha_aprobacion:
+                certificate.fecha_vencimiento = certificate.fecha_aprobacion + CERTIFICATE_VALIDITY
+        created = self.bulk_create(certificates, batch_size=batch_size)
+        # bulk_create no envía post_save
+        CertificateLedger.objects.add_manual(created)
+        return created
+
+
 class ManualCertificate(models.Model):
     nombre_completo = models.CharField(max_length=200, verbose_name="Nombre Completo")
     dni = models.CharField(max_length=20, verbose_name="DNI")
@@ -710,6 +1019,14 @@ class ManualCertificate(models.Model):
     fecha_aprobacion = models.DateField(verbose_name="Fecha de Aprobación")
     fecha_vencimiento = models.DateField(editable=False, verbose_name="Fecha de Vencimiento")
     certificate_code = models.CharField(max_length=32, editable=False, verbose_name="Código del Certificado")
+    full_code = models.CharField(
+        max_length=240,
+        null=True,
+        blank=True,
+        db_index=True,
+        editable=False,
+        verbose_name="Código completo del certificado",
+    )
     fecha_generacion = models.DateTimeField(auto_now_add=True, verbose_name="Fecha de Generación")
     generado_por = models.ForeignKey(
         'accounts.User',
@@ -718,11 +1035,17 @@ class ManualCertificate(models.Model):
     )
     activo = models.BooleanField(default=True, verbose_name="Activo")
 
+    objects = ManualCertificateManager()
+
     class Meta:
         verbose_name = "Certificado Manual"
         verbose_name_plural = "Certificados Manuales"
         ordering = ['-fecha_generacion']
         unique_together = ['dni', 'curso', 'certificate_code']
+        indexes = [
+            # Clave de la paginación por cursor del listado
+            models.Index(fields=['fecha_generacion', 'id'], name='quiz_manualcert_fecha_idx'),
+        ]
 
     def __str__(self):
         return f"{self.nombre_completo} - {self.curso.code} - {self.certificate_code}"
@@ -733,65 +1056,14 @@ class ManualCertificate(models.Model):
             # Cada curso tiene su propia secuencia de certificados (automáticos y manuales)
             # El certificate_code almacena solo el número correlativo (ej: "001", "002")
             # El código completo mostrado en PDF es: <código_curso>-<correlativo> (ej: "C01-001")
-            new_code = self.curso.last_cert_code + 1
-            self.certificate_code = str(new_code).zfill(3)
-            self.curso.last_cert_code = new_code
-            self.curso.save()
+            self.certificate_code = next_certificate_code(self.curso)
+        self.full_code = f"{self.curso.code}-{self.certificate_code}"
         # Actualizar siempre la fecha de vencimiento en base a la fecha de aprobación
         if self.fecha_aprobacion:
-            self.fecha_vencimiento = self.fecha_aprobacion + timedelta(days=365)
+            self.fecha_vencimiento = self.fecha_aprobacion + CERTIFICATE_VALIDITY
         super().save(*args, **kwargs)
-
-    def delete(self, *args, **kwargs):
-        """
-        Elimina el certificado y ajusta el contador del curso si es necesario.
-        Si este certificado tiene el código más alto del curso, decrementa el contador.
-        """
-        curso = self.curso
-        
-        # Eliminar el certificado primero
-        super().delete(*args, **kwargs)
-        
-        # Verificar si hay otros certificados manuales o automáticos con códigos más altos
-        from django.db.models import Max
-        from quiz.models import Sitting
-        
-        # Obtener el código máximo de certificados manuales restantes
-        # Usar una consulta más compatible que funcione con SQLite, PostgreSQL y MySQL
-        manual_certs = ManualCertificate.objects.filter(
-            curso=curso
-        ).exclude(certificate_code__isnull=True).exclude(certificate_code='')
-        
-        max_manual_code = None
-        for cert in manual_certs:
-            if cert.certificate_code and cert.certificate_code.isdigit():
-                code_int = int(cert.certificate_code)
-                if max_manual_code is None or code_int > max_manual_code:
-                    max_manual_code = code_int
-        
-        # Obtener el código máximo de certificados automáticos (Sitting)
-        sittings = Sitting.objects.filter(
-            quiz__course=curso
-        ).exclude(certificate_code__isnull=True).exclude(certificate_code='')
-        
-        max_sitting_code = None
-        for sitting in sittings:
-            if sitting.certificate_code and sitting.certificate_code.isdigit():
-                code_int = int(sitting.certificate_code)
-                if max_sitting_code is None or code_int > max_sitting_code:
-                    max_sitting_code = code_int
-        
-        # Encontrar el código máximo real
-        max_real_code = 0
-        if max_manual_code is not None:
-            max_real_code = max(max_real_code, max_manual_code)
-        if max_sitting_code is not None:
-            max_real_code = max(max_real_code, max_sitting_code)
-        
-        # Si el contador del curso es mayor que el código máximo real, ajustarlo
-        if curso.last_cert_code > max_real_code:
-            curso.last_cert_code = max_real_code
-            curso.save(update_fields=['last_cert_code'])
+        # Cualquier edición puede cambiar el contenido del PDF almacenado
+        invalidate_artifacts(MANUAL, self.pk)
 
     @property
     def esta_vencido(self):
@@ -799,6 +1071,270 @@ class ManualCertificate(models.Model):
         return date.today() > self.fecha_vencimiento
 
 
+class CertificateLedgerQuerySet(models.QuerySet):
+    def buscar(self, termino):
+        """
+        Certificados cuyo titular empieza por `termino` (sin distinguir tildes ni
+        mayúsculas) o cuyo DNI empieza por `termino`; ambos filtros usan índices
+        """
+        termino = (termino or "").strip()
+        if not termino:
+            return self
+        return self.filter(Q(nombre_busqueda__startswith=normalizar_busqueda(termino)) | Q(dni__startswith=termino))
+
+    def beneficiarios(self):
+        """
+        Totales por beneficiario: participantes agrupados por usuario y titulares de
+        certificados manuales agrupados por DNI y nombre, combinados con UNION ALL
+        y ordenados por total de certificados. Se puede paginar con slicing.
+        """
+        fecha = models.DateField()
+        texto = models.CharField()
+        entero = models.IntegerField()
+        participantes = (
+            self.filter(tipo=CertificateLedger.AUTOMATICO)
+            .values("user_id")
+            .annotate(
+                beneficiario_id=Cast("user_id", texto),
+                nombre=models.Max("nombre_completo"),
+                email=models.Max("user__email"),
+                tipo_beneficiario=models.Value("Participante", output_field=texto),
+                total=models.Count("pk"),
+                automaticos=models.Count("pk"),
+                manuales=models.Value(0, output_field=entero),
+                ultimo=models.Max("fecha_aprobacion", output_field=fecha),
+            )
+        )
+        titulares = (
+            self.filter(tipo=CertificateLedger.MANUAL)
+            .values("dni", "nombre_completo")
+            .annotate(
+                beneficiario_id=Concat(models.Value("manual_"), "dni", output_field=texto),
+                nombre=models.Max("nombre_completo"),
+                email=models.Value("No disponible", output_field=texto),
+                tipo_beneficiario=models.Value("Certificado Manual", output_field=texto),
+                total=models.Count("pk"),
+                automaticos=models.Value(0, output_field=entero),
+                manuales=models.Count("pk"),
+                ultimo=models.Max("fecha_aprobacion", output_field=fecha),
+            )
+        )
+        columnas = [
+            "beneficiario_id", "nombre", "email", "tipo_beneficiario",
+            "total", "automaticos", "manuales", "ultimo",
+        ]
+        return (
+            participantes.values(*columnas)
+            .union(titulares.values(*columnas), all=True)
+            .order_by("-total", "nombre", "beneficiario_id")
+        )
+
+    def status_counts(self, hoy, dias=30):
+        """
+        Totales, activos, vencidos y por vencer (en los próximos `dias`) de cada tipo
+        en una sola consulta con agregados condicionales:
+        {"automatico": {"total": n, "activos": n, ...}, "manual": {...}}
+        """
+        conditions = {
+            "total": Q(),
+            "activos": Q(fecha_vencimiento__gte=hoy),
+            "vencidos": Q(fecha_vencimiento__lt=hoy),
+            "por_vencer": Q(activo=True, fecha_vencimiento__range=(hoy, hoy + timedelta(days=dias))),
+        }
+        tipos = (CertificateLedger.AUTOMATICO, CertificateLedger.MANUAL)
+        row = self.aggregate(**{
+            f"{tipo}_{name}": models.Count("pk", filter=Q(tipo=tipo) & condition)
+            for tipo in tipos
+            for name, condition in conditions.items()
+        })
+        return {tipo: {name: row[f"{tipo}_{name}"] for name in conditions} for tipo in tipos}
+
+    def por_curso(self, hoy):
+        """
+        Una fila por curso (agrupada en SQL) con total, activos, vencidos y el
+        último certificado (fecha de aprobación y titular) del queryset.
+        """
+        ultimo = self.filter(curso=models.OuterRef("curso_id")).order_by("-fecha_aprobacion", "-pk")
+        return self.order_by().values("curso_id").annotate(
+            total=models.Count("pk"),
+            activos=models.Count("pk", filter=Q(fecha_vencimiento__gte=hoy)),
+            vencidos=models.Count("pk", filter=Q(fecha_vencimiento__lt=hoy)),
+            ultimo_fecha=models.Max("fecha_aprobacion"),
+            ultimo_nombre=models.Subquery(ultimo.values("nombre_completo")[:1]),
+        )
+
+
+class CertificateLedgerManager(models.Manager.from_queryset(CertificateLedgerQuerySet)):
+    """
+    Mantiene el registro de certificados: una fila por certificado automático
+    (el sitting aprobado más reciente de cada usuario+examen) y una por certificado manual.
+    """
+
+    def _automatic_row(self, sitting):
+        fecha_aprobacion = _certificate_date(sitting.approval_effective_date)
+        return self.model(
+            tipo=CertificateLedger.AUTOMATICO,
+            sitting=sitting,
+            user_id=sitting.user_id,
+            quiz_id=sitting.quiz_id,
+            curso_id=sitting.course_id,
+            nombre_completo=sitting.user.get_full_name,
+            nombre_busqueda=normalizar_busqueda(sitting.user.get_full_name),
+            dni=sitting.user.username,
+            fecha_aprobacion=fecha_aprobacion,
+            fecha_vencimiento=sitting.fecha_vencimiento or fecha_aprobacion + CERTIFICATE_VALIDITY,
+            full_code=sitting.full_code,
+            activo=True,
+        )
+
+    def _manual_row(self, certificate):
+        return self.model(
+            tipo=CertificateLedger.MANUAL,
+            certificado_manual=certificate,
+            curso_id=certificate.curso_id,
+            nombre_completo=certificate.nombre_completo,
+            nombre_busqueda=normalizar_busqueda(certificate.nombre_completo),
+            dni=certificate.dni,
+            fecha_aprobacion=certificate.fecha_aprobacion,
+            fecha_vencimiento=certificate.fecha_vencimiento,
+            full_code=certificate.full_code,
+            activo=certificate.activo,
+        )
+
+    @staticmethod
+    def _row_values(row):
+        return {
+            field.attname: getattr(row, field.attname)
+            for field in row._meta.concrete_fields
+            if not field.primary_key
+        }
+
+    def _bulk_insert(self, rows, batch_size):
+        total = 0
+        while True:
+            batch = list(islice(rows, batch_size))
+            if not batch:
+                return total
+            self.bulk_create(batch)
+            total += len(batch)
+
+    def sync_sitting(self, user_id, quiz_id):
+        """Recalcula el certificado automático de un usuario+examen"""
+        latest = (
+            Sitting.objects.approved()
+            .filter(user_id=user_id, quiz_id=quiz_id)
+            .select_related("user")
+            .order_by(EFFECTIVE_DATE.desc(), "-pk")
+            .first()
+        )
+        # Cambia el estado del certificado y del curso en el progreso del usuario
+        versioned_cache.bump(CERTIFICATES, user_scope(user_id))
+        if latest is None:
+            self.filter(tipo=CertificateLedger.AUTOMATICO, user_id=user_id, quiz_id=quiz_id).delete()
+            return None
+        row = self._automatic_row(latest)
+        return self.update_or_create(
+            tipo=CertificateLedger.AUTOMATICO,
+            user_id=user_id,
+            quiz_id=quiz_id,
+            defaults=self._row_values(row),
+        )[0]
+
+    def sync_manual(self, certificate):
+        row = self._manual_row(certificate)
+        versioned_cache.bump(CERTIFICATES)
+        return self.update_or_create(certificado_manual=certificate, defaults=self._row_values(row))[0]
+
+    def add_manual(self, certificates, batch_size=1000):
+        """Filas de certificados manuales insertados con bulk_create (sin señales)"""
+        versioned_cache.bump(CERTIFICATES)
+        return self._bulk_insert((self._manual_row(certificate) for certificate in certificates), batch_size)
+
+    def rebuild(self, quiz_ids=None, batch_size=1000):
+        """
+        Reconstruye el registro desde Sitting y ManualCertificate. Con quiz_ids solo
+        se recalculan los certificados automáticos de esos exámenes.
+        Devuelve (automáticos, manuales) insertados.
+        """
+        approved = Sitting.objects.approved()
+        automatic_rows = self.filter(tipo=CertificateLedger.AUTOMATICO)
+        if quiz_ids is not None:
+            approved = approved.filter(quiz_id__in=quiz_ids)
+            automatic_rows = automatic_rows.filter(quiz_id__in=quiz_ids)
+        latest = approved.latest_per_user_quiz().select_related("user")
+
+        with transaction.atomic():
+            automatic_rows.delete()
+            automaticos = self._bulk_insert(
+                (self._automatic_row(sitting) for sitting in latest.iterator(chunk_size=batch_size)),
+                batch_size,
+            )
+            manuales = 0
+            if quiz_ids is None:
+                self.filter(tipo=CertificateLedger.MANUAL).delete()
+                manuales = self.add_manual(ManualCertificate.objects.iterator(chunk_size=batch_size), batch_size)
+            versioned_cache.bump(CERTIFICATES)
+        return automaticos, manuales
+
+
+class CertificateLedger(models.Model):
+    """
+    Registro desnormalizado de certificados emitidos (automáticos y manuales) para
+    los dashboards. Lo mantienen las señales de Sitting, ManualCertificate, Quiz y
+    User; rebuild_certificate_ledger lo reconstruye completo.
+    """
+    AUTOMATICO = "automatico"
+    MANUAL = "manual"
+    TIPO_CHOICES = (
+        (AUTOMATICO, "Automático"),
+        (MANUAL, "Manual"),
+    )
+
+    tipo = models.CharField(max_length=10, choices=TIPO_CHOICES, verbose_name="Tipo")
+    sitting = models.OneToOneField(
+        Sitting, null=True, blank=True, on_delete=models.CASCADE, related_name="ledger_entry"
+    )
+    certificado_manual = models.OneToOneField(
+        ManualCertificate, null=True, blank=True, on_delete=models.CASCADE, related_name="ledger_entry"
+    )
+    user = models.ForeignKey(
+        settings.AUTH_USER_MODEL, null=True, blank=True, on_delete=models.CASCADE, related_name="certificate_ledger"
+    )
+    quiz = models.ForeignKey(Quiz, null=True, blank=True, on_delete=models.CASCADE)
+    curso = models.ForeignKey(Course, on_delete=models.CASCADE, verbose_name="Curso")
+    nombre_completo = models.CharField(max_length=200, verbose_name="Nombre Completo")
+    nombre_busqueda = models.CharField(max_length=200, blank=True, editable=False)  # normalizar_busqueda(nombre_completo)
+    dni = models.CharField(max_length=150, verbose_name="DNI")
+    fecha_aprobacion = models.DateField(verbose_name="Fecha de Aprobación")
+    fecha_vencimiento = models.DateField(verbose_name="Fecha de Vencimiento")
+    full_code = models.CharField(max_length=240, null=True, blank=True, verbose_name="Código completo del certificado")
+    activo = models.BooleanField(default=True, verbose_name="Activo")
+
+    objects = CertificateLedgerManager()
+
+    class Meta:
+        verbose_name = "Registro de Certificado"
+        verbose_name_plural = "Registro de Certificados"
+        constraints = [
+            # Un certificado automático por usuario+examen
+            models.UniqueConstraint(
+                fields=["user", "quiz"],
+                condition=Q(tipo="automatico"),
+                name="quiz_ledger_user_quiz_uniq",
+            ),
+        ]
+        indexes = [
+            models.Index(fields=["curso", "fecha_aprobacion"], name="quiz_ledger_curso_fecha_idx"),
+            models.Index(fields=["fecha_vencimiento"], name="quiz_ledger_vencimiento_idx"),
+            # Búsqueda por prefijo (LIKE 'texto%'); en PostgreSQL requiere varchar_pattern_ops
+            models.Index(fields=["nombre_busqueda"], opclasses=["varchar_pattern_ops"], name="quiz_ledger_nombre_idx"),
+            models.Index(fields=["dni"], opclasses=["varchar_pattern_ops"], name="quiz_ledger_dni_idx"),
+        ]
+
+    def __str__(self):
+        return f"{self.nombre_completo} - {self.full_code or self.get_tipo_display()}"
+
+
 class SittingAuditLog(models.Model):
     """Log de auditoría para cambios en fecha_aprobacion de exámenes"""
     sitting = models.ForeignKey(Sitting, on_delete=models.CASCADE, related_name='audit_logs')
@@ -822,3 +1358,150 @@ class SittingAuditLog(models.Model):
     
     def __str__(self):
         return f"{self.sitting} - {self.field_changed} - {self.changed_at.strftime('%d/%m/%Y %H:%M')}"
+
+
+@receiver(post_save, sender=Sitting)
+def sitting_ledger_receiver(sender, instance, **kwargs):
+    # Completar, recalificar o editar la fecha de aprobación puede cambiar el certificado
+    if instance.complete:
+        CertificateLedger.objects.sync_sitting(instance.user_id, instance.quiz_id)
+
+
+@receiver(post_delete, sender=Sitting)
+def sitting_post_delete_receiver(sender, instance, **kwargs):
+    invalidate_artifacts(SITTING, instance.pk)
+    evict_sitting_questions(instance.pk)
+    if instance.complete:
+        # Si era el certificado vigente, pasa a serlo el siguiente intento aprobado
+        CertificateLedger.objects.sync_sitting(instance.user_id, instance.quiz_id)
+
+
+@receiver(post_save, sender=ManualCertificate)
+def manual_certificate_ledger_receiver(sender, instance, **kwargs):
+    CertificateLedger.objects.sync_manual(instance)
+
+
+@receiver(post_delete, sender=ManualCertificate)
+def manual_certificate_post_delete_receiver(sender, instance, **kwargs):
+    invalidate_artifacts(MANUAL, instance.pk)
+    # La fila del registro se borra en cascada, sin pasar por el manager
+    versioned_cache.bump(CERTIFICATES)
+
+
+@receiver(post_save, sender=Quiz)
+def quiz_ledger_receiver(sender, instance, created, update_fields=None, **kwargs):
+    # Solo un cambio de pass_mark cambia qué sittings están aprobados
+    if created or (update_fields is not None and "pass_mark" not in update_fields):
+        return
+    if instance.pass_mark != getattr(instance, "_loaded_pass_mark", None):
+        schedule_ledger_rebuild([instance.pk])
+
+
+@receiver(post_save, sender=settings.AUTH_USER_MODEL)
+def user_ledger_receiver(sender, instance, created, update_fields=None, **kwargs):
+    if created or (update_fields and not {"first_name", "last_name", "username"} & set(update_fields)):
+        return
+    updated = CertificateLedger.objects.filter(user=instance).update(
+        nombre_completo=instance.get_full_name,
+        nombre_busqueda=normalizar_busqueda(instance.get_full_name),
+        dni=instance.username,
+    )
+    if updated:
+        versioned_cache.bump(CERTIFICATES)
+
+
+def touch_quizzes(quiz_ids):
+    """Actualiza Quiz.timestamp: invalida la clave de respuestas cacheada de esos exámenes"""
+    if quiz_ids:
+        Quiz.objects.filter(pk__in=quiz_ids).update(timestamp=now())
+
+
+_pending_ledger_rebuilds = threading.local()
+
+
+def schedule_ledger_rebuild(quiz_ids):
+    """
+    Reconstruye el registro de esos exámenes al confirmar la transacción, una sola
+    vez por examen aunque se pida varias veces (p. ej. question_set.set() en un formulario)
+    """
+    if not hasattr(_pending_ledger_rebuilds, "quiz_ids"):
+        _pending_ledger_rebuilds.quiz_ids = set()
+    _pending_ledger_rebuilds.quiz_ids.update(quiz_ids)
+    # Las llamadas extra no hacen nada: la primera que se ejecuta vacía el conjunto.
+    # Si la transacción se revierte, esos exámenes se reconstruyen en el próximo commit.
+    transaction.on_commit(_run_pending_ledger_rebuilds)
+
+
+def _run_pending_ledger_rebuilds():
+    quiz_ids = getattr(_pending_ledger_rebuilds, "quiz_ids", None)
+    if quiz_ids:
+        _pending_ledger_rebuilds.quiz_ids = set()
+        CertificateLedger.objects.rebuild(quiz_ids=sorted(quiz_ids))
+
+
+def refresh_question_counts(quiz_ids=None):
+    """Recalcula Quiz.question_count en un solo UPDATE (todos los exámenes si quiz_ids es None)"""
+    if quiz_ids is not None and not quiz_ids:
+        return 0
+    through = Question.quiz.through
+    count = (
+        through.objects.filter(quiz_id=models.OuterRef("pk"))
+        .order_by()
+        .values("quiz_id")
+        .annotate(total=models.Count("id"))
+        .values("total")
+    )
+    quizzes = Quiz.objects.all() if quiz_ids is None else Quiz.objects.filter(pk__in=quiz_ids)
+    # Cambiar el conjunto de preguntas también invalida la clave de respuestas.
+    # No toca el registro de certificados: la aprobación se calcula sobre las
+    # preguntas de cada sitting, no sobre question_count
+    return quizzes.update(
+        question_count=Coalesce(models.Subquery(count), 0),
+        timestamp=now(),
+    )
+
+
+def _question_quiz_ids(question_id):
+    return list(Quiz.objects.filter(question__id=question_id).values_list("id", flat=True))
+
+
+@receiver(post_save, sender=Question)
+@receiver(post_save, sender=MCQuestion)
+@receiver(post_save, sender=EssayQuestion)
+def question_answer_key_receiver(sender, instance, **kwargs):
+    touch_quizzes(_question_quiz_ids(instance.pk))
+
+
+@receiver(pre_delete, sender=Question)
+@receiver(pre_delete, sender=MCQuestion)
+@receiver(pre_delete, sender=EssayQuestion)
+def question_pre_delete_receiver(sender, instance, **kwargs):
+    # Después del borrado ya no existe la relación con los exámenes
+    instance._deleted_from_quiz_ids = _question_quiz_ids(instance.pk)
+
+
+@receiver(post_delete, sender=Question)
+@receiver(post_delete, sender=MCQuestion)
+@receiver(post_delete, sender=EssayQuestion)
+def question_post_delete_receiver(sender, instance, **kwargs):
+    refresh_question_counts(getattr(instance, "_deleted_from_quiz_ids", None) or [])
+
+
+@receiver(post_save, sender=Choice)
+@receiver(post_delete, sender=Choice)
+def choice_answer_key_receiver(sender, instance, **kwargs):
+    touch_quizzes(_question_quiz_ids(instance.question_id))
+
+
+@receiver(m2m_changed, sender=Question.quiz.through)
+def question_quiz_changed_receiver(sender, instance, action, reverse, pk_set, **kwargs):
+    if reverse:
+        # instance es el Quiz (quiz.question_set.add/remove/clear)
+        if action in ("post_add", "post_remove", "post_clear"):
+            refresh_question_counts([instance.pk])
+    elif action == "pre_clear":
+        instance._cleared_quiz_ids = _question_quiz_ids(instance.pk)
+    elif action == "post_clear":
+        refresh_question_counts(getattr(instance, "_cleared_quiz_ids", []))
+    elif action in ("post_add", "post_remove"):
+        refresh_question_counts(pk_set)
@@ -0,0 +1,40 @@
+"""
+Preguntas de un sitting precargadas en la caché
+Al iniciar el examen se guardan las preguntas (ya con su subclase) y sus
+alternativas; cada página del examen las toma de aquí sin consultar Question
+ni Choice. La entrada se elimina al completar el sitting o al vencer el TTL.
+"""
+from django.core.cache import cache
+
+from . import models
+from .answer_key import get_answer_key
+
+SITTING_QUESTIONS_TTL = 4 * 60 * 60
+
+
+def sitting_questions_cache_key(sitting_id):
+    return f"sitting_questions_{sitting_id}"
+
+
+def cache_sitting_questions(sitting, questions):
+    """Guarda las preguntas (instancias de MCQuestion/EssayQuestion) con sus alternativas ya ordenadas"""
+    answer_key = get_answer_key(sitting.quiz)
+    bundle = {}
+    for question in questions:
+        question.preloaded_choices = answer_key.choices(question)
+        bundle[question.id] = question
+    cache.set(sitting_questions_cache_key(sitting.pk), bundle, SITTING_QUESTIONS_TTL)
+    return bundle
+
+
+def get_sitting_question(sitting, question_id):
+    """Pregunta del sitting desde la caché; si la entrada expiró se vuelve a construir"""
+    bundle = cache.get(sitting_questions_cache_key(sitting.pk))
+    if bundle is None or question_id not in bundle:
+        questions = models.Question.objects.filter(id__in=sitting.question_order).select_subclasses()
+        bundle = cache_sitting_questions(sitting, questions)
+    return bundle.get(question_id)
+
+
+def evict_sitting_questions(sitting_id):
+    cache.delete(sitting_questions_cache_key(sitting_id))
@@ -1,6 +1,8 @@
 from django import template
 from datetime import timedelta
 
+from quiz.answer_key import get_answer_key
+
 register = template.Library()
 
 
@@ -10,7 +12,8 @@ def correct_answer_for_all(context, question):
     processes the correct answer based on a given question object
     if the answer is incorrect, informs the user
     """
-    answers = question.get_choices()
+    quiz = context.get("quiz")
+    answers = get_answer_key(quiz).choices(question) if quiz else question.get_choices()
     incorrect_list = context.get("incorrect_questions", [])
     if question.id in incorrect_list:
         user_was_incorrect = True
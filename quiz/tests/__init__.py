@@ -0,0 +1,2 @@
+# quiz/tests/__init__.py
+# This ensures that tests is treated as a package.
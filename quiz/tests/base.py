@@ -0,0 +1,55 @@
+from django.utils import timezone
+
+from accounts.models import User
+from course.models import Course, Program
+from quiz.models import Choice, MCQuestion, Quiz, Sitting
+
+
+class QuizFixturesMixin:
+    """Helpers para crear cursos, exámenes y sittings mínimos en los tests"""
+
+    def create_course(self, code="C01-IPERC", **kwargs):
+        program, _ = Program.objects.get_or_create(title="Seguridad")
+        defaults = {
+            "title": f"Curso {code}",
+            "program": program,
+            "level": "Bachelor",
+            "semester": "First",
+        }
+        defaults.update(kwargs)
+        return Course.objects.create(code=code, **defaults)
+
+    def create_quiz(self, course, questions=2, **kwargs):
+        quiz = Quiz.objects.create(course=course, title=f"Examen {course.code}", **kwargs)
+        for index in range(questions):
+            question = MCQuestion.objects.create(content=f"Pregunta {index + 1}")
+            question.quiz.add(quiz)
+            Choice.objects.create(question=question, choice_text="Correcta", correct=True)
+            Choice.objects.create(question=question, choice_text="Incorrecta", correct=False)
+        return quiz
+
+    def create_user(self, username, **kwargs):
+        defaults = {
+            "first_name": "Ana",
+            "last_name": "Pérez",
+            "accepted_terms_at": timezone.now(),
+            "accepted_privacy_at": timezone.now(),
+        }
+        defaults.update(kwargs)
+        return User.objects.create(username=username, **defaults)
+
+    def create_approved_sitting(self, user, quiz):
+        question_ids = list(quiz.question_set.values_list("id", flat=True))
+        sitting = Sitting(
+            user=user,
+            quiz=quiz,
+            course=quiz.course,
+            question_order=question_ids,
+            question_list=[],
+            current_score=len(question_ids),
+            complete=True,
+            end=timezone.now(),
+            fecha_aprobacion=timezone.now(),
+        )
+        sitting.save()
+        return sitting
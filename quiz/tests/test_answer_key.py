@@ -0,0 +1,63 @@
+from django.core.cache import cache
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from quiz.answer_key import get_answer_key
+from quiz.models import Choice, Quiz, Sitting
+from quiz.tests.base import QuizFixturesMixin
+
+
+class AnswerKeyTests(QuizFixturesMixin, TestCase):
+    def setUp(self):
+        cache.clear()
+        self.course = self.create_course()
+        self.quiz = self.create_quiz(self.course, questions=2)
+        self.question = self.quiz.question_set.select_subclasses().first()
+        self.correct = Choice.objects.get(question=self.question, correct=True)
+        self.wrong = Choice.objects.get(question=self.question, correct=False)
+
+    def fresh_quiz(self):
+        return Quiz.objects.get(pk=self.quiz.pk)
+
+    def test_grades_and_describes_answers_without_queries(self):
+        get_answer_key(self.fresh_quiz())
+        quiz = self.fresh_quiz()
+        with self.assertNumQueries(0):
+            answer_key = get_answer_key(quiz)
+            self.assertTrue(answer_key.is_correct(self.question, str(self.correct.pk)))
+            self.assertFalse(answer_key.is_correct(self.question, str(self.wrong.pk)))
+            self.assertFalse(answer_key.is_correct(self.question, "no-es-un-id"))
+            self.assertEqual(answer_key.answer_text(self.question, self.wrong.pk), "Incorrecta")
+            self.assertEqual(len(answer_key.choices(self.question)), 2)
+
+    def test_choice_edit_invalidates_key(self):
+        get_answer_key(self.fresh_quiz())
+        self.wrong.correct = True
+        self.wrong.save()
+        self.assertTrue(get_answer_key(self.fresh_quiz()).is_correct(self.question, self.wrong.pk))
+
+    def test_removing_question_from_quiz_invalidates_key(self):
+        get_answer_key(self.fresh_quiz())
+        self.question.quiz.remove(self.quiz)
+        self.assertEqual(get_answer_key(self.fresh_quiz()).choices(self.question), [])
+
+    def marking_detail_queries(self, questions):
+        quiz = self.create_quiz(self.create_course(code=f"C{questions:02d}-QZ"), questions=questions)
+        sitting = Sitting.objects.new_sitting(self.create_user(f"user{questions}"), quiz, quiz.course)
+        while sitting.question_list:
+            question = sitting.get_first_question()
+            choice = Choice.objects.get(question=question, correct=False)
+            sitting.record_answer(question, str(choice.pk), False)
+
+        url = reverse("quiz_marking_detail", kwargs={"pk": sitting.pk})
+        self.client.get(url)  # calentar caché y sesión
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(url)
+        self.assertContains(response, "Incorrecta", count=questions)
+        return len(queries)
+
+    def test_marking_detail_queries_do_not_grow_with_questions(self):
+        self.client.force_login(self.create_user("admin", is_superuser=True, is_staff=True))
+        self.assertEqual(self.marking_detail_queries(3), self.marking_detail_queries(9))
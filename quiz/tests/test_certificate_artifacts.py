@@ -0,0 +1,88 @@
+import os
+import shutil
+import tempfile
+from datetime import date, timedelta
+from unittest import mock
+
+from django.test import TestCase, override_settings
+from django.urls import reverse
+
+from quiz import views
+from quiz.certificate_artifacts import MANUAL, SITTING, artifacts_root
+from quiz.models import ManualCertificate
+from quiz.tests.base import QuizFixturesMixin
+
+
+class CertificateArtifactTests(QuizFixturesMixin, TestCase):
+    def setUp(self):
+        media_root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, media_root)
+        settings_override = override_settings(MEDIA_ROOT=media_root)
+        settings_override.enable()
+        self.addCleanup(settings_override.disable)
+
+        self.course = self.create_course(code="C01-IPERC")
+        self.quiz = self.create_quiz(self.course)
+        self.admin = self.create_user("admin", is_superuser=True, is_staff=True)
+        self.client.force_login(self.admin)
+        self.sitting = self.create_approved_sitting(self.create_user("10000001"), self.quiz)
+        self.url = reverse("generar_certificado", kwargs={"sitting_id": self.sitting.id})
+
+    def stored_files(self, kind, object_id):
+        directory = os.path.join(artifacts_root(), kind, str(object_id))
+        return sorted(os.listdir(directory)) if os.path.isdir(directory) else []
+
+    def test_repeat_download_is_served_without_rendering(self):
+        first = self.client.get(self.url)
+        self.assertEqual(first.status_code, 200)
+        self.assertTrue(first.content.startswith(b"%PDF"))
+        self.assertEqual(len(self.stored_files(SITTING, self.sitting.id)), 1)
+
+        with mock.patch.object(views, "render_certificado_sitting") as render:
+            second = self.client.get(self.url)
+            not_modified = self.client.get(self.url, HTTP_IF_NONE_MATCH=first["ETag"])
+        render.assert_not_called()
+        self.assertEqual(second.content, first.content)
+        self.assertEqual(not_modified.status_code, 304)
+        self.assertEqual(not_modified["ETag"], first["ETag"])
+
+    def test_approval_date_change_invalidates_artifact(self):
+        first = self.client.get(self.url)
+        self.sitting.update_approval_date_freely(
+            self.sitting.fecha_aprobacion - timedelta(days=30), self.admin
+        )
+        self.assertEqual(self.stored_files(SITTING, self.sitting.id), [])
+
+        second = self.client.get(self.url, HTTP_IF_NONE_MATCH=first["ETag"])
+        self.assertEqual(second.status_code, 200)
+        self.assertNotEqual(second["ETag"], first["ETag"])
+
+    def test_manual_certificate_save_invalidates_artifact(self):
+        certificate = ManualCertificate.objects.create(
+            nombre_completo="Luis Soto",
+            dni="20000002",
+            curso=self.course,
+            puntaje=18,
+            fecha_aprobacion=date(2025, 3, 1),
+            generado_por=self.admin,
+        )
+        url = reverse("descargar_certificado_manual", kwargs={"cert_id": certificate.id})
+        self.client.get(url)
+        self.assertEqual(len(self.stored_files(MANUAL, certificate.id)), 1)
+
+        certificate.nombre_completo = "Luis Soto Ramos"
+        certificate.save()
+        self.assertEqual(self.stored_files(MANUAL, certificate.id), [])
+
+    @override_settings(
+        CERTIFICATE_ARTIFACT_OFFLOAD="x-accel-redirect",
+        CERTIFICATE_ARTIFACT_ACCEL_PREFIX="/protected/certificados/",
+    )
+    def test_accel_redirect_offload(self):
+        response = self.client.get(self.url)
+        stored = self.stored_files(SITTING, self.sitting.id)[0]
+        self.assertEqual(
+            response["X-Accel-Redirect"],
+            f"/protected/certificados/{SITTING}/{self.sitting.id}/{stored}",
+        )
+        self.assertEqual(response.content, b"")
@@ -0,0 +1,199 @@
+import json
+from datetime import date, timedelta
+
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+
+from accounts.models import User
+from course.models import CourseAllocation
+from quiz.certificate_utils import meses_recientes
+from quiz.models import CertificateLedger, ManualCertificate, Sitting
+from quiz.tests.base import QuizFixturesMixin
+
+
+class CertificadosDashboardTests(QuizFixturesMixin, TestCase):
+    """Dashboard sobre 50.000 sittings: la cantidad de consultas no depende del volumen"""
+
+    SITTINGS = 50_000
+    USERS = 5_000
+
+    @classmethod
+    def setUpTestData(cls):
+        fixtures = cls()
+        cls.admin = fixtures.create_user("admin", is_superuser=True, is_staff=True)
+        cls.quizzes = []
+        for index in range(5):
+            course = fixtures.create_course(code=f"C{index:02d}-DB")
+            cls.quizzes += [fixtures.create_quiz(course, questions=1) for _ in range(2)]
+        allocation = CourseAllocation.objects.create(lecturer=fixtures.create_user("instructor", first_name="Iris"))
+        allocation.courses.add(cls.quizzes[0].course)
+
+        users = User.objects.bulk_create(User(username=f"7{index:07d}") for index in range(cls.USERS))
+        now = timezone.now()
+        Sitting.objects.bulk_create(
+            (
+                Sitting(
+                    user=users[index % cls.USERS],
+                    quiz=cls.quizzes[(index // cls.USERS) % len(cls.quizzes)],
+                    course=cls.quizzes[(index // cls.USERS) % len(cls.quizzes)].course,
+                    question_order=[1],
+                    current_score=index % 4 != 0,  # uno de cada cuatro reprueba
+                    complete=True,
+                    end=now,
+                    fecha_aprobacion=now - timedelta(days=index % 500),
+                    fecha_vencimiento=(now - timedelta(days=index % 500)).date() + timedelta(days=365),
+                )
+                for index in range(cls.SITTINGS)
+            ),
+            batch_size=2000,
+        )
+        CertificateLedger.objects.rebuild()
+        ManualCertificate.objects.create(
+            nombre_completo="Luis Soto", dni="30000001", curso=cls.quizzes[0].course,
+            puntaje=18, fecha_aprobacion=date.today(), generado_por=cls.admin,
+        )
+
+    def test_dashboard_queries_do_not_depend_on_history(self):
+        self.client.force_login(self.admin)
+        self.client.get(reverse("certificados_dashboard"))  # calentar sesión
+
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(reverse("certificados_dashboard"))
+
+        self.assertEqual(response.status_code, 200)
+        context = response.context
+        self.assertEqual(context["total_automaticos"], self.SITTINGS * 3 // 4)
+        self.assertEqual(context["total_manuales"], 1)
+        self.assertEqual(context["total_cursos"], 5)
+        # Los usuarios con índice múltiplo de 4 reprueban todos sus intentos
+        self.assertEqual(context["total_estudiantes_certificados"], self.USERS * 3 // 4)
+        desde = meses_recientes(date.today(), 12)[0]
+        self.assertEqual(
+            sum(row["automaticos"] for row in context["datos_mensuales"]),
+            CertificateLedger.objects.filter(
+                tipo=CertificateLedger.AUTOMATICO, fecha_aprobacion__gte=desde
+            ).count(),
+        )
+        self.assertEqual(context["datos_mensuales"][-1]["manuales"], 1)
+        self.assertEqual(context["cursos_detalle"][0]["total_certificados"], self.SITTINGS * 3 // 4 // 5)
+        self.assertEqual(context["cursos_detalle"][0]["instructor"].first_name, "Iris")
+        # Sesión y usuario más once consultas agregadas o acotadas, con cualquier volumen
+        self.assertLessEqual(len(queries), 13)
+
+    def test_filters_run_a_fixed_number_of_queries(self):
+        self.client.force_login(self.admin)
+        url = reverse("certificados_filtros_ajax")
+        payload = json.dumps({
+            "tipo": "todos",
+            "cursos": [str(self.quizzes[0].course_id), str(self.quizzes[2].course_id)],
+            "fechaDesde": (date.today() - timedelta(days=200)).isoformat(),
+            "fechaHasta": date.today().isoformat(),
+        })
+        self.client.post(url, data=payload, content_type="application/json")  # calentar sesión
+
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.post(url, data=payload, content_type="application/json")
+
+        data = response.json()["data"]
+        self.assertEqual(data["total_manuales"], 1)
+        self.assertEqual(data["total_automaticos"], sum(row["automaticos"] for row in data["datos_mensuales"]))
+        # Sesión y usuario, estados de ambos tipos y una agrupación mensual por tipo
+        self.assertEqual(len(queries), 5)
+
+    def test_course_statistics_run_one_query_per_certificate_kind(self):
+        self.client.force_login(self.admin)
+        url = reverse("estadisticas_por_curso_ajax")
+        payload = {"curso_ids[]": sorted({str(quiz.course_id) for quiz in self.quizzes})}
+        self.client.post(url, payload)  # calentar sesión
+
+        with CaptureQueriesContext(connection) as queries:
+            estadisticas = self.client.post(url, payload).json()["estadisticas"]
+
+        self.assertEqual(len(estadisticas), 5)
+        self.assertEqual(sum(row["total_automaticos"] for row in estadisticas), self.SITTINGS * 3 // 4)
+        self.assertEqual(sum(row["total_manuales"] for row in estadisticas), 1)
+        # Sesión y usuario, cursos y una consulta agrupada por tipo de certificado
+        self.assertEqual(len(queries), 5)
+
+
+class CertificadosFiltrosTests(QuizFixturesMixin, TestCase):
+    def setUp(self):
+        self.admin = self.create_user("admin", is_superuser=True, is_staff=True)
+        self.course = self.create_course()
+        self.quiz = self.create_quiz(self.course)
+        self.client.force_login(self.admin)
+
+    def approved(self, username, days_ago):
+        sitting = self.create_approved_sitting(self.create_user(username), self.quiz)
+        sitting.fecha_aprobacion = timezone.now() - timedelta(days=days_ago)
+        sitting.save()
+
+    def filter(self, **filtros):
+        response = self.client.post(
+            reverse("certificados_filtros_ajax"), data=json.dumps(filtros), content_type="application/json"
+        )
+        return response.json()["data"]
+
+    def test_type_and_date_filters(self):
+        self.approved("10000001", days_ago=5)
+        self.approved("10000002", days_ago=90)
+        self.approved("10000003", days_ago=400)
+        ManualCertificate.objects.create(
+            nombre_completo="Luis Soto", dni="30000001", curso=self.course,
+            puntaje=18, fecha_aprobacion=date.today(), generado_por=self.admin,
+        )
+
+        todos = self.filter()
+        self.assertEqual(
+            (todos["total_automaticos"], todos["automaticos_vencidos"], todos["total_manuales"]), (3, 1, 1)
+        )
+        self.assertEqual(todos["datos_mensuales"][-1]["manuales"], 1)
+
+        recientes = self.filter(
+            tipo="automaticos",
+            fechaDesde=(date.today() - timedelta(days=30)).isoformat(),
+            fechaHasta=date.today().isoformat(),
+        )
+        self.assertEqual((recientes["total_automaticos"], recientes["total_manuales"]), (1, 0))
+        self.assertEqual(sum(row["automaticos"] for row in recientes["datos_mensuales"]), 1)
+
+        self.assertEqual(self.filter(tipo="manuales")["total_certificados"], 1)
+
+    def test_course_statistics(self):
+        self.approved("10000001", days_ago=5)
+        self.approved("10000002", days_ago=400)
+        ManualCertificate.objects.create(
+            nombre_completo="Luis Soto", dni="30000001", curso=self.course,
+            puntaje=18, fecha_aprobacion=date.today() - timedelta(days=20), generado_por=self.admin,
+        )
+        otro = self.create_course(code="C02-ES")
+
+        response = self.client.post(reverse("estadisticas_por_curso_ajax"), {"curso_ids[]": [self.course.pk, otro.pk]})
+        estadisticas = {row["curso_id"]: row for row in response.json()["estadisticas"]}
+
+        curso = estadisticas[self.course.pk]
+        self.assertEqual(
+            (curso["total_automaticos"], curso["total_manuales"], curso["total_activos"], curso["total_vencidos"]),
+            (2, 1, 2, 1),
+        )
+        self.assertEqual(curso["ultimo_certificado"]["tipo"], "Automático")
+        self.assertEqual(curso["ultimo_certificado"]["fecha"], (date.today() - timedelta(days=5)).strftime("%d/%m/%Y"))
+        self.assertEqual((estadisticas[otro.pk]["total_curso"], estadisticas[otro.pk]["ultimo_certificado"]), (0, None))
+
+    def test_dashboard_summary_is_cached_until_a_certificate_changes(self):
+        self.approved("10000001", days_ago=5)
+        url = reverse("certificados_dashboard")
+        self.client.get(url)
+
+        with CaptureQueriesContext(connection) as queries:
+            self.client.get(url)
+        # Los estados de ambos tipos salen de la caché
+        self.assertFalse(any("automatico_por_vencer" in query["sql"] for query in queries))
+
+        # Editar la fecha de aprobación invalida el resumen cacheado
+        Sitting.objects.get().update_approval_date_freely(timezone.now() - timedelta(days=400), self.admin)
+        context = self.client.get(url).context
+        self.assertEqual((context["automaticos_vencidos"], context["automaticos_activos"]), (1, 0))
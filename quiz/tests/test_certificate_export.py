@@ -0,0 +1,87 @@
+import io
+import os
+import shutil
+import tempfile
+import zipfile
+from datetime import date
+
+from django.core.management import call_command
+from django.test import TestCase, override_settings
+from django.urls import reverse
+
+from quiz.certificate_artifacts import SITTING
+from quiz.certificate_export import certificados_plataforma, iter_certificados
+from quiz.models import ManualCertificate
+from quiz.tests.base import QuizFixturesMixin
+
+
+class CertificateExportTests(QuizFixturesMixin, TestCase):
+    def setUp(self):
+        self.tmpdir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.tmpdir)
+        settings_override = override_settings(
+            MEDIA_ROOT=self.tmpdir, CERTIFICATE_EXPORT_WORKERS=0
+        )
+        settings_override.enable()
+        self.addCleanup(settings_override.disable)
+
+        self.course = self.create_course(code="C01-IPERC")
+        self.other_course = self.create_course(code="C02-PA")
+        self.admin = self.create_user("admin", is_superuser=True, is_staff=True)
+        quiz = self.create_quiz(self.course)
+        self.sittings = [
+            self.create_approved_sitting(self.create_user(f"1000000{index}"), quiz)
+            for index in range(3)
+        ]
+        self.create_approved_sitting(self.create_user("20000001"), self.create_quiz(self.other_course))
+        ManualCertificate.objects.create(
+            nombre_completo="Luis Soto",
+            dni="30000001",
+            curso=self.course,
+            puntaje=18,
+            fecha_aprobacion=date(2025, 3, 1),
+            generado_por=self.admin,
+        )
+
+    def export(self, **params):
+        self.client.force_login(self.admin)
+        response = self.client.get(reverse("exportar_certificados_zip"), params)
+        self.assertEqual(response.status_code, 200)
+        archive = zipfile.ZipFile(io.BytesIO(b"".join(response.streaming_content)))
+        return archive
+
+    def test_exports_course_certificates_as_zip(self):
+        archive = self.export(curso=self.course.pk, incluir_manuales="on")
+        pdfs = [name for name in archive.namelist() if name.endswith(".pdf")]
+        self.assertEqual(len(pdfs), 4)
+        self.assertTrue(all(name.startswith("C01-IPERC-") for name in pdfs))
+        self.assertTrue(archive.read(pdfs[0]).startswith(b"%PDF"))
+        self.assertIn("certificados/s", archive.read("exportacion.txt").decode())
+
+    def test_filters_by_dni_list(self):
+        archive = self.export(dnis="10000001\n30000001", incluir_manuales="on")
+        pdfs = sorted(name for name in archive.namelist() if name.endswith(".pdf"))
+        self.assertEqual(len(pdfs), 2)
+
+    def test_requires_a_filter(self):
+        self.client.force_login(self.admin)
+        response = self.client.get(reverse("exportar_certificados_zip"), {"incluir_manuales": "on"})
+        self.assertTemplateUsed(response, "quiz/exportar_certificados.html")
+        self.assertTrue(response.context["form"].errors)
+
+    def test_command_renders_with_process_pool(self):
+        output = os.path.join(self.tmpdir, "export.zip")
+        call_command(
+            "exportar_certificados", output, course="C01-IPERC", workers=2,
+            base_url="https://example.com/", stdout=io.StringIO(),
+        )
+        with zipfile.ZipFile(output) as archive:
+            pdfs = [name for name in archive.namelist() if name.endswith(".pdf")]
+        self.assertEqual(len(pdfs), 4)
+
+    def test_closing_the_stream_early_cancels_pending_renders(self):
+        querysets = [(SITTING, certificados_plataforma(curso=self.course))]
+        exported = iter_certificados(querysets, "https://example.com/", workers=2)
+        _filename, pdf = next(exported)
+        self.assertTrue(pdf.startswith(b"%PDF"))
+        exported.close()  # cliente desconectado: cancela y cierra el pool sin errores
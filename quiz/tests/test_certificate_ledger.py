@@ -0,0 +1,253 @@
+import io
+import json
+from datetime import date, timedelta
+from unittest import mock
+
+from django.core.management import call_command
+from django.db import connection, transaction
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+
+from quiz.models import CertificateLedger, ManualCertificate, MCQuestion, Quiz, Sitting
+from quiz.tests.base import QuizFixturesMixin
+
+
+class CertificateLedgerTests(QuizFixturesMixin, TestCase):
+    def setUp(self):
+        self.course = self.create_course()
+        self.quiz = self.create_quiz(self.course, questions=2, pass_mark=50)
+        self.user = self.create_user("10000001")
+        self.admin = self.create_user("admin", is_superuser=True)
+
+    def attempt(self, score, days_ago=0):
+        sitting = self.create_approved_sitting(self.user, self.quiz)
+        fecha = timezone.now() - timedelta(days=days_ago)
+        sitting.current_score = score
+        sitting.fecha_aprobacion = fecha
+        sitting.save()
+        return sitting
+
+    def manual(self, **kwargs):
+        defaults = {
+            "nombre_completo": "Luis Soto", "dni": "30000001", "curso": self.course,
+            "puntaje": 18, "fecha_aprobacion": date(2025, 3, 1), "generado_por": self.admin,
+        }
+        defaults.update(kwargs)
+        return ManualCertificate.objects.create(**defaults)
+
+    def automatic_rows(self):
+        return list(CertificateLedger.objects.filter(tipo=CertificateLedger.AUTOMATICO))
+
+    def test_keeps_one_row_per_user_and_quiz_for_the_latest_approved_attempt(self):
+        older = self.attempt(2, days_ago=10)
+        newer = self.attempt(1, days_ago=1)
+        self.attempt(0)  # reprobado: no emite certificado
+
+        [row] = self.automatic_rows()
+        self.assertEqual(row.sitting, newer)
+        self.assertEqual((row.nombre_completo, row.dni, row.curso), ("Ana Pérez", "10000001", self.course))
+        self.assertEqual(row.full_code, newer.full_code)
+        self.assertEqual(row.fecha_vencimiento, row.fecha_aprobacion + timedelta(days=365))
+
+        newer.delete()
+        [row] = self.automatic_rows()
+        self.assertEqual(row.sitting, older)
+
+    def test_regrading_below_the_pass_mark_removes_the_certificate(self):
+        sitting = self.attempt(1)
+        question = self.quiz.question_set.first()
+        sitting.add_incorrect_question(question)
+        self.assertEqual(self.automatic_rows(), [])
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.quiz.pass_mark = 0
+            self.quiz.save()
+        self.assertEqual(len(self.automatic_rows()), 1)
+
+    def test_only_pass_mark_changes_rebuild_the_quiz(self):
+        self.attempt(2)
+        with mock.patch.object(CertificateLedger.objects, "rebuild") as rebuild:
+            with self.captureOnCommitCallbacks(execute=True):
+                quiz = Quiz.objects.get(pk=self.quiz.pk)
+                quiz.title = "Examen renombrado"
+                quiz.save()
+                MCQuestion.objects.create(content="Extra").quiz.add(quiz)
+            rebuild.assert_not_called()
+
+            # Varios cambios en la misma transacción: una sola reconstrucción al confirmar
+            with self.captureOnCommitCallbacks(execute=True):
+                with transaction.atomic():
+                    for pass_mark in (60, 70):
+                        quiz.pass_mark = pass_mark
+                        quiz.save()
+                    rebuild.assert_not_called()
+            rebuild.assert_called_once()
+            self.assertIn(quiz.pk, rebuild.call_args.kwargs["quiz_ids"])
+
+    def test_adding_questions_after_a_pass_keeps_the_certificate(self):
+        sitting = self.attempt(1)  # 1/2 = 50 %
+        with self.captureOnCommitCallbacks(execute=True):
+            MCQuestion.objects.create(content="Extra").quiz.add(self.quiz)
+        self.assertEqual([row.sitting for row in self.automatic_rows()], [sitting])
+
+        CertificateLedger.objects.rebuild(quiz_ids=[self.quiz.pk])
+        self.assertEqual([row.sitting for row in self.automatic_rows()], [sitting])
+
+    def test_follows_manual_certificates_and_holder_names(self):
+        certificate = self.manual()
+        certificate.activo = False
+        certificate.save()
+        row = CertificateLedger.objects.get(certificado_manual=certificate)
+        self.assertEqual((row.tipo, row.activo, row.fecha_vencimiento), (CertificateLedger.MANUAL, False, date(2026, 3, 1)))
+
+        self.attempt(2)
+        self.user.first_name = "María"
+        self.user.save()
+        self.assertEqual(self.automatic_rows()[0].nombre_completo, "María Pérez")
+
+        certificate.delete()
+        self.assertFalse(CertificateLedger.objects.filter(tipo=CertificateLedger.MANUAL).exists())
+
+    def test_rebuild_command_restores_rows_written_without_signals(self):
+        self.attempt(2)
+        self.manual()
+        Sitting.objects.create(
+            user=self.create_user("10000002"), quiz=self.quiz, course=self.course,
+            question_order=[1, 2], current_score=2, complete=True,
+        )
+        CertificateLedger.objects.all().delete()
+        Sitting.objects.bulk_create([
+            Sitting(
+                user=self.create_user("10000003"), quiz=self.quiz, course=self.course,
+                question_order=[1, 2], current_score=2, complete=True, fecha_aprobacion=timezone.now(),
+            )
+        ])
+
+        out = io.StringIO()
+        call_command("rebuild_certificate_ledger", stdout=out)
+        self.assertIn("3 automáticos, 1 manuales", out.getvalue())
+        self.assertEqual(
+            sorted(CertificateLedger.objects.values_list("dni", flat=True)),
+            ["10000001", "10000002", "10000003", "30000001"],
+        )
+
+
+class CertificateStatusTests(QuizFixturesMixin, TestCase):
+    def setUp(self):
+        self.course = self.create_course()
+        self.quiz = self.create_quiz(self.course)
+        self.admin = self.create_user("admin", is_superuser=True)
+        self.hoy = timezone.localdate()
+
+    def approved(self, username, days_ago):
+        sitting = self.create_approved_sitting(self.create_user(username), self.quiz)
+        sitting.fecha_aprobacion = timezone.now() - timedelta(days=days_ago)
+        sitting.save()
+        return sitting
+
+    def test_sitting_expiry_follows_the_approval_date(self):
+        sitting = self.approved("10000001", days_ago=0)
+        self.assertEqual(sitting.fecha_vencimiento, self.hoy + timedelta(days=365))
+
+        sitting.update_approval_date_freely(timezone.now() - timedelta(days=400), self.admin)
+        sitting.refresh_from_db()
+        self.assertEqual(sitting.fecha_vencimiento, self.hoy - timedelta(days=35))
+        self.assertEqual(CertificateLedger.objects.get(sitting=sitting).fecha_vencimiento, sitting.fecha_vencimiento)
+
+    def test_status_counts_for_both_kinds_in_one_query(self):
+        self.approved("10000001", days_ago=10)    # activo
+        self.approved("10000002", days_ago=350)   # activo y por vencer
+        self.approved("10000003", days_ago=400)   # vencido
+        for dni, aprobado, activo in [("1", 20, True), ("2", 340, True), ("3", 340, False), ("4", 500, True)]:
+            ManualCertificate.objects.create(
+                nombre_completo=f"Persona {dni}", dni=dni, curso=self.course, puntaje=15,
+                fecha_aprobacion=self.hoy - timedelta(days=aprobado), generado_por=self.admin, activo=activo,
+            )
+
+        with self.assertNumQueries(1):
+            estados = CertificateLedger.objects.status_counts(self.hoy)
+        self.assertEqual(
+            estados[CertificateLedger.AUTOMATICO], {"total": 3, "activos": 2, "vencidos": 1, "por_vencer": 1}
+        )
+        self.assertEqual(
+            estados[CertificateLedger.MANUAL], {"total": 4, "activos": 3, "vencidos": 1, "por_vencer": 1}
+        )
+
+    def test_dashboard_uses_the_ledger_counts(self):
+        self.approved("10000001", days_ago=10)
+        self.approved("10000002", days_ago=400)
+        self.client.force_login(self.admin)
+        context = self.client.get(reverse("certificados_dashboard")).context
+        self.assertEqual(
+            (context["total_automaticos"], context["automaticos_activos"], context["automaticos_vencidos"]),
+            (2, 1, 1),
+        )
+
+    def test_filters_apply_to_the_ledger_counts(self):
+        self.approved("10000001", days_ago=10)
+        other = self.create_course(code="C02-PA")
+        self.create_approved_sitting(self.create_user("10000002"), self.create_quiz(other))
+        self.client.force_login(self.admin)
+        response = self.client.post(
+            reverse("certificados_filtros_ajax"),
+            data=json.dumps({"tipo": "automaticos", "cursos": [str(other.pk)]}),
+            content_type="application/json",
+        )
+        data = response.json()["data"]
+        self.assertEqual((data["total_automaticos"], data["automaticos_activos"], data["total_manuales"]), (1, 1, 0))
+
+
+class BeneficiariosTests(QuizFixturesMixin, TestCase):
+    def setUp(self):
+        self.course = self.create_course()
+        self.quizzes = [self.create_quiz(self.create_course(code=f"C{index:02d}-BN")) for index in range(3)]
+        self.admin = self.create_user("admin", is_superuser=True, is_staff=True)
+        self.client.force_login(self.admin)
+
+    def manual(self, nombre, dni, dias=0):
+        return ManualCertificate.objects.create(
+            nombre_completo=nombre, dni=dni, curso=self.course, puntaje=18,
+            fecha_aprobacion=date(2025, 3, 1) - timedelta(days=dias), generado_por=self.admin,
+        )
+
+    def get(self, **params):
+        return self.client.get(reverse("beneficiarios_ajax"), params).json()
+
+    def test_groups_by_user_and_by_manual_holder(self):
+        user = self.create_user("10000001", first_name="Ana", last_name="Pérez", email="ana@example.com")
+        for quiz in self.quizzes[:2]:
+            self.create_approved_sitting(user, quiz)
+        self.create_approved_sitting(user, self.quizzes[0])  # segundo intento: mismo certificado
+        self.manual("Luis Soto", "30000001")
+        self.manual("Luis Soto", "30000001", dias=40)
+        self.manual("Eva Ríos", "30000002")
+
+        data = self.get()
+        rows = {row["id"]: row for row in data["beneficiarios"]}
+        self.assertEqual(data["pagination"]["total_items"], 3)
+        self.assertEqual(
+            (rows[str(user.pk)]["total_certificados"], rows[str(user.pk)]["email"], rows[str(user.pk)]["tipo"]),
+            (2, "ana@example.com", "Participante"),
+        )
+        self.assertEqual(
+            (rows["manual_30000001"]["manuales"], rows["manual_30000001"]["ultimo_certificado"]),
+            (2, "01/03/2025"),
+        )
+        self.assertEqual([row["total_certificados"] for row in data["beneficiarios"]], [2, 2, 1])
+
+    def test_paginates_in_the_database_and_searches_by_prefix(self):
+        for index in range(20):
+            self.manual(f"Persona {index:02d}", f"4{index:07d}")
+        self.manual("José Ñúñez", "50000001")
+
+        with CaptureQueriesContext(connection) as queries:
+            data = self.get(page=2)
+        self.assertEqual(len(data["beneficiarios"]), 6)
+        self.assertEqual(data["pagination"]["total_pages"], 2)
+        self.assertTrue(any("LIMIT 15 OFFSET 15" in query["sql"] for query in queries))
+
+        self.assertEqual([row["nombre"] for row in self.get(buscar="jose nu")["beneficiarios"]], ["José Ñúñez"])
+        self.assertEqual(self.get(buscar="4000001")["pagination"]["total_items"], 10)
+        self.assertEqual(self.get(page=99)["pagination"]["current_page"], 2)
@@ -0,0 +1,129 @@
+import threading
+import time
+from datetime import date
+
+from django.db import OperationalError, close_old_connections
+from django.utils.connection import ConnectionDoesNotExist
+from django.test import TestCase, TransactionTestCase
+
+from course.models import Course
+from quiz.certificate_numbers import reserve_certificate_numbers
+from quiz.models import ManualCertificate, Sitting
+from quiz.tests.base import QuizFixturesMixin
+
+
+class CertificateNumberTests(QuizFixturesMixin, TestCase):
+    def setUp(self):
+        self.course = self.create_course()
+        self.admin = self.create_user("admin", is_superuser=True)
+
+    def manual_certificate(self, dni):
+        return ManualCertificate.objects.create(
+            nombre_completo="Luis Soto", dni=dni, curso=self.course,
+            puntaje=18, fecha_aprobacion=date(2025, 3, 1), generado_por=self.admin,
+        )
+
+    def test_reserves_consecutive_ranges(self):
+        self.assertEqual(list(reserve_certificate_numbers(self.course, 3)), [1, 2, 3])
+        self.assertEqual(list(reserve_certificate_numbers(self.course)), [4])
+        self.course.refresh_from_db()
+        self.assertEqual(self.course.last_cert_code, 4)
+
+    def test_does_not_overwrite_other_course_fields(self):
+        stale = Course.objects.get(pk=self.course.pk)
+        Course.objects.filter(pk=self.course.pk).update(title="Título editado")
+        reserve_certificate_numbers(stale)
+        self.assertEqual(Course.objects.get(pk=self.course.pk).title, "Título editado")
+
+    def test_uses_the_database_the_course_was_loaded_from(self):
+        course = Course.objects.get(pk=self.course.pk)
+        course._state.db = "replica"
+        with self.assertRaises(ConnectionDoesNotExist):
+            reserve_certificate_numbers(course)
+
+    def test_sittings_and_manual_certificates_share_the_sequence(self):
+        sitting = self.create_approved_sitting(self.create_user("10000001"), self.create_quiz(self.course))
+        manual = ManualCertificate.objects.create(
+            nombre_completo="Luis Soto", dni="30000001", curso=self.course,
+            puntaje=18, fecha_aprobacion=date(2025, 3, 1), generado_por=self.admin,
+        )
+        self.assertEqual((sitting.certificate_code, manual.certificate_code), ("001", "002"))
+        self.assertEqual(manual.full_code, "C01-IPERC-002")
+
+    def test_deleting_the_latest_certificate_does_not_reuse_its_number(self):
+        first = self.manual_certificate("30000001")
+        latest = self.manual_certificate("30000002")
+        latest.delete()
+        self.course.refresh_from_db()
+        self.assertEqual(self.course.last_cert_code, 2)
+        self.assertEqual(self.manual_certificate("30000003").certificate_code, "003")
+        self.assertEqual(first.certificate_code, "001")
+
+    def test_bulk_import_reserves_numbers_once_per_course(self):
+        other = self.create_course(code="C02-PA")
+        certificates = [
+            ManualCertificate(
+                nombre_completo=f"Persona {index}", dni=f"4000000{index}", curso=curso,
+                puntaje=16, fecha_aprobacion=date(2025, 1, 10), generado_por=self.admin,
+            )
+            for index, curso in enumerate([self.course, other, self.course, self.course])
+        ]
+        # Dos reservas de correlativos, el INSERT de certificados y el del registro
+        with self.assertNumQueries(4):
+            ManualCertificate.objects.bulk_create_numbered(certificates)
+
+        codes = ManualCertificate.objects.order_by("curso__code", "certificate_code").values_list(
+            "full_code", "fecha_vencimiento"
+        )
+        self.assertEqual(
+            [code for code, _ in codes],
+            ["C01-IPERC-001", "C01-IPERC-002", "C01-IPERC-003", "C02-PA-001"],
+        )
+        self.assertEqual(codes[0][1], date(2026, 1, 10))
+
+
+class ConcurrentCertificateNumberTests(QuizFixturesMixin, TransactionTestCase):
+    threads = 12
+
+    def test_simultaneous_completions_get_unique_numbers(self):
+        course = self.create_course()
+        quiz = self.create_quiz(course)
+        sittings = []
+        for index in range(self.threads):
+            sitting = self.create_approved_sitting(self.create_user(f"5000{index:04d}"), quiz)
+            Sitting.objects.filter(pk=sitting.pk).update(complete=False, certificate_code=None, full_code=None)
+            sittings.append(Sitting.objects.get(pk=sitting.pk))
+        Course.objects.filter(pk=course.pk).update(last_cert_code=0)
+
+        barrier = threading.Barrier(self.threads)
+        errors = []
+
+        def complete(sitting):
+            try:
+                barrier.wait()
+                for _attempt in range(50):
+                    try:
+                        sitting.mark_quiz_complete()
+                        break
+                    except OperationalError:
+                        # SQLite en memoria rechaza escritores concurrentes en lugar de esperar
+                        close_old_connections()
+                        time.sleep(0.01)
+                else:
+                    raise AssertionError("mark_quiz_complete siguió bloqueado tras 50 intentos")
+            except Exception as error:
+                errors.append(error)
+            finally:
+                close_old_connections()
+
+        workers = [threading.Thread(target=complete, args=(sitting,)) for sitting in sittings]
+        for worker in workers:
+            worker.start()
+        for worker in workers:
+            worker.join()
+
+        self.assertEqual(errors, [])
+        codes = list(Sitting.objects.filter(course=course).values_list("certificate_code", flat=True))
+        self.assertNotIn(None, codes)
+        self.assertEqual(len(set(codes)), self.threads)
+        self.assertEqual(Course.objects.get(pk=course.pk).last_cert_code, max(map(int, codes)))
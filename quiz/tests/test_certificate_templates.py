@@ -0,0 +1,106 @@
+import io
+import os
+import shutil
+import tempfile
+from concurrent.futures import ThreadPoolExecutor
+
+import PyPDF2
+from PyPDF2 import PdfReader, PdfWriter
+from PyPDF2.generic import DecodedStreamObject, IndirectObject
+from django.test import SimpleTestCase
+from reportlab.lib.pagesizes import A4, landscape
+from reportlab.pdfgen import canvas
+
+from quiz.certificate_templates import (
+    TEMPLATES_DIR,
+    TemplateCache,
+    _add_object,
+    merge_overlay,
+    template_cache,
+)
+
+
+def overlay_pdf(text):
+    buffer = io.BytesIO()
+    pdf = canvas.Canvas(buffer, pagesize=landscape(A4))
+    pdf.drawString(100, 100, text)
+    pdf.showPage()
+    pdf.save()
+    buffer.seek(0)
+    return buffer
+
+
+class TemplateCacheTests(SimpleTestCase):
+    def setUp(self):
+        self.tmpdir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.tmpdir)
+        self.source = os.path.join(TEMPLATES_DIR, "anexo4.pdf")
+
+    def copy_template(self, name):
+        path = os.path.join(self.tmpdir, name)
+        shutil.copyfile(self.source, path)
+        return path
+
+    def test_second_read_is_a_hit(self):
+        cache = TemplateCache(max_bytes=10 * 1024 * 1024)
+        path = self.copy_template("a.pdf")
+        first = cache.get_reader(path)
+        self.assertIs(cache.get_reader(path), first)
+        self.assertEqual((cache.hits, cache.misses), (1, 1))
+
+    def test_reloads_when_file_changes(self):
+        cache = TemplateCache(max_bytes=10 * 1024 * 1024)
+        path = self.copy_template("a.pdf")
+        first = cache.get_reader(path)
+        stat = os.stat(path)
+        os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000_000))
+        self.assertIsNot(cache.get_reader(path), first)
+        self.assertEqual(cache.misses, 2)
+
+    def test_evicts_least_recently_used(self):
+        size = os.path.getsize(self.source)
+        cache = TemplateCache(max_bytes=size * 2)
+        a, b, c = (self.copy_template(name) for name in ("a.pdf", "b.pdf", "c.pdf"))
+        cache.get_reader(a)
+        cache.get_reader(b)
+        cache.get_reader(a)
+        cache.get_reader(c)
+        self.assertEqual(list(cache._entries), [a, c])
+
+
+class MergeOverlayTests(SimpleTestCase):
+    def test_cached_template_is_not_modified(self):
+        path = os.path.join(TEMPLATES_DIR, "anexo4.pdf")
+        template_cache.invalidate(path)
+        merge_overlay(path, overlay_pdf("PRIMERO"))
+        resultado = merge_overlay(path, overlay_pdf("SEGUNDO"))
+
+        page = PdfReader(io.BytesIO(resultado)).pages[0]
+        xobjects = page["/Resources"]["/XObject"]
+        overlays = [name for name in xobjects if name.startswith("/CertOverlay")]
+        self.assertEqual(overlays, ["/CertOverlay"])
+        self.assertIn(b"SEGUNDO", xobjects["/CertOverlay"].get_data())
+        self.assertNotIn("/CertOverlay", template_cache.get_page(path)["/Resources"]["/XObject"])
+
+    def test_concurrent_renders_share_the_cached_template(self):
+        path = os.path.join(TEMPLATES_DIR, "anexo4.pdf")
+        template_cache.invalidate(path)
+        textos = [f"ALUMNO {index}" for index in range(16)]
+        with ThreadPoolExecutor(max_workers=8) as executor:
+            resultados = list(executor.map(lambda texto: merge_overlay(path, overlay_pdf(texto)), textos))
+
+        for texto, resultado in zip(textos, resultados):
+            page = PdfReader(io.BytesIO(resultado)).pages[0]
+            self.assertIn(texto.encode(), page["/Resources"]["/XObject"]["/CertOverlay"].get_data())
+
+
+class PrivateApiTests(SimpleTestCase):
+    def test_add_object_helper_matches_the_pinned_pypdf2(self):
+        # Al actualizar PyPDF2 revisar _add_object: usa PdfWriter._add_object (privado)
+        self.assertEqual(PyPDF2.__version__, "3.0.1")
+        writer = PdfWriter()
+        stream = DecodedStreamObject()
+        stream.set_data(b"q Q")
+        reference = _add_object(writer, stream)
+        self.assertIsInstance(reference, IndirectObject)
+        self.assertIs(reference.get_object(), stream)
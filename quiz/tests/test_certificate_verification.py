@@ -0,0 +1,79 @@
+from datetime import date
+
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from quiz.models import ManualCertificate
+from quiz.tests.base import QuizFixturesMixin
+
+
+class CertificateFullCodeTests(QuizFixturesMixin, TestCase):
+    def setUp(self):
+        self.course = self.create_course(code="C01-IPERC")
+        self.quiz = self.create_quiz(self.course)
+        self.admin = self.create_user("admin", is_superuser=True, is_staff=True)
+
+    def test_sitting_stores_full_code_when_approved(self):
+        sitting = self.create_approved_sitting(self.create_user("10000001"), self.quiz)
+        self.assertEqual(sitting.certificate_code, "001")
+        self.assertEqual(sitting.full_code, "C01-IPERC-001")
+
+    def test_manual_certificate_stores_full_code(self):
+        certificate = ManualCertificate.objects.create(
+            nombre_completo="Luis Soto",
+            dni="20000002",
+            curso=self.course,
+            puntaje=18,
+            fecha_aprobacion=date(2025, 3, 1),
+            generado_por=self.admin,
+        )
+        self.assertEqual(certificate.full_code, f"C01-IPERC-{certificate.certificate_code}")
+
+
+class VerificarCertificadoTests(QuizFixturesMixin, TestCase):
+    def setUp(self):
+        self.course = self.create_course(code="C02-PA")
+        self.quiz = self.create_quiz(self.course)
+        self.admin = self.create_user("admin", is_superuser=True, is_staff=True)
+
+    def verify(self, codigo):
+        url = reverse("verificar_certificado", kwargs={"codigo": codigo})
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(url)
+        return response, len(queries)
+
+    def test_finds_platform_certificate(self):
+        sitting = self.create_approved_sitting(self.create_user("10000001"), self.quiz)
+        response, _ = self.verify(sitting.full_code)
+        self.assertEqual(response.context["tipo"], "plataforma")
+        self.assertEqual(response.context["sitting"], sitting)
+
+    def test_finds_active_manual_certificate(self):
+        certificate = ManualCertificate.objects.create(
+            nombre_completo="Luis Soto",
+            dni="20000002",
+            curso=self.course,
+            puntaje=18,
+            fecha_aprobacion=date(2025, 3, 1),
+            generado_por=self.admin,
+        )
+        response, _ = self.verify(certificate.full_code)
+        self.assertEqual(response.context["tipo"], "manual")
+        self.assertEqual(response.context["certificate"], certificate)
+
+    def test_unknown_code_renders_not_found(self):
+        response, _ = self.verify("C02-PA-999")
+        self.assertTemplateUsed(response, "quiz/certificado_no_encontrado.html")
+
+    def test_query_count_does_not_grow_with_sittings(self):
+        first = self.create_approved_sitting(self.create_user("10000001"), self.quiz)
+        _, baseline = self.verify(first.full_code)
+
+        for index in range(2, 30):
+            self.create_approved_sitting(self.create_user(f"1000{index:04d}"), self.quiz)
+
+        _, queries = self.verify(first.full_code)
+        self.assertEqual(queries, baseline)
+        self.assertLessEqual(queries, 2)
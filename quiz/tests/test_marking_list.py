@@ -0,0 +1,105 @@
+from datetime import timedelta
+
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+
+from quiz.models import ExternalCourseEnrollment, Sitting
+from quiz.tests.base import QuizFixturesMixin
+
+
+class QuizMarkingListTests(QuizFixturesMixin, TestCase):
+    def setUp(self):
+        self.course = self.create_course()
+        self.quiz = self.create_quiz(self.course, questions=2)
+        self.client.force_login(self.create_user("admin", is_superuser=True, is_staff=True))
+        self.url = reverse("quiz_marking")
+
+    def sitting(self, user, days_ago, score=2):
+        sitting = self.create_approved_sitting(user, self.quiz)
+        Sitting.objects.filter(pk=sitting.pk).update(
+            current_score=score, fecha_aprobacion=timezone.now() - timedelta(days=days_ago)
+        )
+        return sitting
+
+    def test_one_row_per_user_and_quiz_with_attempt_counts(self):
+        ana, luis = self.create_user("10000001"), self.create_user("10000002")
+        self.sitting(ana, days_ago=10)
+        latest = self.sitting(ana, days_ago=2)
+        self.sitting(ana, days_ago=1, score=0)  # desaprobado: no aparece pero cuenta como intento
+        other = self.sitting(luis, days_ago=5)
+
+        response = self.client.get(self.url)
+
+        rows = response.context["object_list"]
+        self.assertEqual([sitting.pk for sitting in rows], [latest.pk, other.pk])
+        self.assertEqual((rows[0].total_attempts, rows[0].approved_attempts), (3, 2))
+        self.assertEqual(response.context["page_obj"].paginator.count, 2)
+        self.assertEqual(response.context["examenes_aprobados_unicos"], 2)
+
+    def test_page_queries_do_not_grow_with_sittings(self):
+        def page_queries():
+            cursor = self.client.get(self.url).context["page_obj"].next_cursor
+            with CaptureQueriesContext(connection) as queries:
+                response = self.client.get(self.url, {"cursor": cursor})
+            self.assertEqual(response.context["page_obj"].start_index(), 16)
+            self.assertFalse(any("OFFSET" in query["sql"] for query in queries))
+            return len(queries)
+
+        for index in range(20):
+            self.sitting(self.create_user(f"2000{index:04d}"), days_ago=index)
+        baseline = page_queries()
+        for index in range(20, 60):
+            self.sitting(self.create_user(f"2000{index:04d}"), days_ago=index)
+        self.assertEqual(page_queries(), baseline)
+
+    def test_external_enrollments_are_loaded_in_one_query(self):
+        external = self.create_course(code="C09-EXT", is_external=True)
+        quiz = self.create_quiz(external, questions=2)
+
+        def add_external(count):
+            for _ in range(count):
+                user = self.create_user(f"3000{ExternalCourseEnrollment.objects.count():04d}")
+                self.create_approved_sitting(user, quiz)
+                ExternalCourseEnrollment.objects.create(
+                    user=user, course=external, score=18, certificate_url="https://drive.example/c"
+                )
+
+        def page_queries():
+            with CaptureQueriesContext(connection) as queries:
+                response = self.client.get(self.url)
+            enrollment_queries = [q for q in queries if 'FROM "quiz_externalcourseenrollment"' in q["sql"]]
+            self.assertEqual(len(enrollment_queries), 1)
+            return response, len(queries)
+
+        add_external(3)
+        _, baseline = page_queries()
+        add_external(12)
+        response, queries = page_queries()
+
+        self.assertEqual(queries, baseline)
+        rows = response.context["object_list"]
+        self.assertEqual(len(rows), 15)
+        self.assertTrue(all(sitting.external_enrollment.user_id == sitting.user_id for sitting in rows))
+        self.assertContains(response, "https://drive.example/c", count=15)
+
+    def test_cursor_pages_walk_the_whole_list_and_keep_filters(self):
+        for index in range(20):
+            self.sitting(self.create_user(f"2000{index:04d}"), days_ago=index)
+        self.sitting(self.create_user("99990000"), days_ago=30)
+
+        first = self.client.get(self.url, {"user_filter": "2000"})
+        second = self.client.get(self.url, {"user_filter": "2000", "cursor": first.context["page_obj"].next_cursor})
+
+        rows = list(first.context["object_list"]) + list(second.context["object_list"])
+        self.assertEqual(len({sitting.pk for sitting in rows}), 20)
+        self.assertFalse(second.context["page_obj"].has_next())
+        self.assertContains(first, "user_filter=2000&amp;cursor=")
+
+    def test_invalid_cursor_shows_the_first_page(self):
+        self.sitting(self.create_user("10000001"), days_ago=1)
+        response = self.client.get(self.url, {"cursor": "no-es-un-cursor"})
+        self.assertEqual(response.context["page_obj"].number, 1)
+        self.assertEqual(len(response.context["object_list"]), 1)
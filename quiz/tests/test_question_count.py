@@ -0,0 +1,111 @@
+from io import StringIO
+
+from django.core.management import call_command
+from django.test import TestCase
+
+from quiz.models import MCQuestion, Quiz, Sitting
+from quiz.tests.base import QuizFixturesMixin
+
+
+class QuestionCountTests(QuizFixturesMixin, TestCase):
+    def setUp(self):
+        self.course = self.create_course()
+        self.quiz = self.create_quiz(self.course, questions=3)
+
+    def stored_count(self, quiz=None):
+        return Quiz.objects.values_list("question_count", flat=True).get(pk=(quiz or self.quiz).pk)
+
+    def test_count_follows_question_relations(self):
+        self.assertEqual(self.stored_count(), 3)
+        question = MCQuestion.objects.create(content="Pregunta extra")
+        other = self.create_quiz(self.create_course(code="C02-PA"), questions=0)
+
+        question.quiz.add(self.quiz, other)
+        self.assertEqual((self.stored_count(), self.stored_count(other)), (4, 1))
+
+        question.quiz.remove(other)
+        self.assertEqual(self.stored_count(other), 0)
+
+        question.quiz.clear()
+        self.assertEqual(self.stored_count(), 3)
+
+        self.quiz.question_set.remove(self.quiz.question_set.first())
+        self.assertEqual(self.stored_count(), 2)
+
+        self.quiz.question_set.clear()
+        self.assertEqual(self.stored_count(), 0)
+
+    def test_saving_a_stale_instance_keeps_the_stored_count(self):
+        stale = Quiz.objects.get(pk=self.quiz.pk)
+        MCQuestion.objects.create(content="Pregunta extra").quiz.add(self.quiz)
+        stale.title = "Examen editado"
+        stale.save()
+        self.assertEqual(self.stored_count(), 4)
+        self.assertEqual(stale.question_count, 4)
+
+    def test_deleting_a_question_updates_the_count(self):
+        MCQuestion.objects.filter(quiz=self.quiz).first().delete()
+        self.assertEqual(self.stored_count(), 2)
+
+    def test_max_score_reads_the_column(self):
+        quiz = Quiz.objects.get(pk=self.quiz.pk)
+        with self.assertNumQueries(0):
+            self.assertEqual(quiz.get_max_score, 3)
+
+    def test_approved_compares_against_the_sitting_questions(self):
+        quiz = self.create_quiz(self.create_course(code="C02-PA"), questions=4, pass_mark=75)
+        passed = self.create_approved_sitting(self.create_user("10000001"), quiz)
+        failed = self.create_approved_sitting(self.create_user("10000002"), quiz)
+        Sitting.objects.filter(pk=passed.pk).update(current_score=3)
+        Sitting.objects.filter(pk=failed.pk).update(current_score=2)
+
+        self.assertEqual(list(Sitting.objects.approved().values_list("pk", flat=True)), [passed.pk])
+
+    def test_approved_uses_the_same_rounding_as_check_if_passed(self):
+        quiz = self.create_quiz(self.create_course(code="C02-PA"), questions=3, pass_mark=67)
+        sitting = Sitting.objects.create(
+            user=self.create_user("10000001"), quiz=quiz, course=quiz.course,
+            question_order=list(quiz.question_set.values_list("id", flat=True)),
+            current_score=2,  # 66,67 % se redondea a 67
+        )
+        sitting.mark_quiz_complete()
+
+        self.assertTrue(sitting.check_if_passed)
+        self.assertEqual(sitting.certificate_code, "001")
+        self.assertEqual(list(Sitting.objects.approved().values_list("pk", flat=True)), [sitting.pk])
+
+    def test_approved_matches_check_if_passed_for_every_score(self):
+        user = self.create_user("10000001")
+        Sitting.objects.bulk_create(
+            Sitting(
+                user=user, quiz=self.quiz, course=self.course,
+                question_order=list(range(total)), current_score=score, complete=True,
+            )
+            for total in range(1, 9)
+            for score in range(total + 1)
+        )
+        # Incluye mitades exactas: 5/8 = 62,5 % (redondea a 62) y 7/8 = 87,5 % (redondea a 88)
+        for pass_mark in (0, 13, 50, 62, 63, 67, 75, 87, 88, 100):
+            Quiz.objects.filter(pk=self.quiz.pk).update(pass_mark=pass_mark)
+            sittings = Sitting.objects.filter(quiz=self.quiz).select_related("quiz")
+            expected = {sitting.pk for sitting in sittings if sitting.check_if_passed}
+            approved = set(Sitting.objects.approved().filter(quiz=self.quiz).values_list("pk", flat=True))
+            self.assertEqual(approved, expected, f"pass_mark={pass_mark}")
+
+    def test_adding_questions_does_not_change_past_approvals(self):
+        passed = self.create_approved_sitting(self.create_user("10000001"), self.quiz)
+        MCQuestion.objects.create(content="Pregunta extra").quiz.add(self.quiz)
+
+        self.assertEqual(self.stored_count(), 4)
+        self.assertEqual(list(Sitting.objects.approved().values_list("pk", flat=True)), [passed.pk])
+
+    def test_repair_command_fixes_drifted_counts(self):
+        Quiz.objects.filter(pk=self.quiz.pk).update(question_count=9)
+
+        out = StringIO()
+        call_command("recount_quiz_questions", "--dry-run", stdout=out)
+        self.assertIn("guardado 9, real 3", out.getvalue())
+        self.assertEqual(self.stored_count(), 9)
+
+        call_command("recount_quiz_questions", stdout=StringIO())
+        self.assertEqual(self.stored_count(), 3)
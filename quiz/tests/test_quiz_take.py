@@ -0,0 +1,135 @@
+from django.core.cache import cache
+from django.db import connection
+from django.test import RequestFactory, TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from quiz.answer_key import get_answer_key
+from quiz.forms import QuestionForm
+from quiz.models import Choice, Sitting, SittingAnswer, UserQuizScore
+from quiz.question_bundle import sitting_questions_cache_key
+from quiz.tests.base import QuizFixturesMixin
+from quiz.views import QuizTake
+
+
+class QuizTakeAnswerTests(QuizFixturesMixin, TestCase):
+    def setUp(self):
+        self.course = self.create_course()
+        self.quiz = self.create_quiz(self.course, questions=3)
+        self.user = self.create_user("10000001")
+        UserQuizScore.objects.add(self.user, self.quiz)  # fila de puntaje ya creada por una respuesta previa
+        self.sitting = Sitting.objects.new_sitting(self.user, self.quiz, self.course)
+        get_answer_key(self.quiz)  # clave de respuestas ya en caché, como en un examen en curso
+
+    def answer(self, correct):
+        view = QuizTake()
+        view.request = RequestFactory().post("/")
+        view.request.user = self.user
+        view.quiz, view.course, view.sitting = self.quiz, self.course, self.sitting
+        view.question = self.sitting.get_first_question()
+        choice = Choice.objects.get(question=view.question, correct=correct)
+        form = QuestionForm(view.question, data={"answers": str(choice.pk)})
+        self.assertTrue(form.is_valid())
+        # Savepoint, UPDATE del sitting, INSERT de la respuesta, UPDATE del puntaje
+        # y release; corrección y siguiente pregunta salen de la caché
+        with self.assertNumQueries(5):
+            view.form_valid_user(form)
+        return view, choice
+
+    def test_answer_is_persisted_with_a_single_write(self):
+        first_question = self.sitting.get_first_question()
+        view, choice = self.answer(correct=True)
+        self.answer(correct=False)
+
+        sitting = Sitting.objects.get(pk=self.sitting.pk)
+        self.assertEqual(sitting.current_score, 1)
+        self.assertEqual(len(sitting.get_incorrect_questions), 1)
+        self.assertEqual(sitting.answers_by_question()[first_question.id], str(choice.pk))
+        self.assertEqual(len(sitting.question_list), 1)
+        self.assertEqual(view.progress, (1, 3))
+        score = UserQuizScore.objects.get(user=self.user, quiz=self.quiz)
+        self.assertEqual((score.score, score.possible), (1, 2))
+
+    def test_double_submission_is_ignored(self):
+        stale = Sitting.objects.get(pk=self.sitting.pk)
+        question = stale.get_first_question()
+        self.answer(correct=True)
+
+        self.assertFalse(stale.record_answer(question, "0", True))
+        stale.refresh_from_db()
+        self.assertEqual(stale.current_score, 1)
+        self.assertEqual(stale.answers.count(), 1)
+
+
+class QuizTakePageTests(QuizFixturesMixin, TestCase):
+    def setUp(self):
+        self.course = self.create_course()
+        self.quiz = self.create_quiz(self.course, questions=3)
+        self.user = self.create_user("10000001")
+        self.client.force_login(self.user)
+        self.url = reverse("quiz_take", kwargs={"pk": self.course.pk, "slug": self.quiz.slug})
+
+    def question_queries(self, response_callback):
+        with CaptureQueriesContext(connection) as queries:
+            response = response_callback()
+        self.assertEqual(response.status_code, 200)
+        # Carga de filas de preguntas o alternativas (no los EXISTS/COUNT de control)
+        return [
+            query["sql"] for query in queries
+            if '"quiz_question"."content"' in query["sql"] or 'FROM "quiz_choice"' in query["sql"]
+        ]
+
+    def test_pages_after_the_first_read_questions_from_cache(self):
+        self.client.get(self.url)
+        sitting = Sitting.objects.get(user=self.user)
+
+        self.assertEqual(self.question_queries(lambda: self.client.get(self.url)), [])
+
+        question = sitting.get_first_question()
+        choice = Choice.objects.get(question=question, correct=True)
+        post = lambda: self.client.post(self.url, {"answers": choice.pk})
+        self.assertEqual(self.question_queries(post), [])
+
+    def test_completion_evicts_the_cached_questions(self):
+        self.client.get(self.url)
+        sitting = Sitting.objects.get(user=self.user)
+        self.assertIsNotNone(cache.get(sitting_questions_cache_key(sitting.pk)))
+        sitting.mark_quiz_complete()
+        self.assertIsNone(cache.get(sitting_questions_cache_key(sitting.pk)))
+
+
+class SittingAnswerTests(QuizFixturesMixin, TestCase):
+    def setUp(self):
+        self.course = self.create_course()
+        self.quiz = self.create_quiz(self.course, questions=2)
+        self.questions = list(self.quiz.question_set.select_subclasses().order_by("id"))
+
+    def take(self, username, correct_flags):
+        sitting = Sitting.objects.new_sitting(self.create_user(username), self.quiz, self.course)
+        for correct in correct_flags:
+            question = sitting.get_first_question()
+            choice = Choice.objects.get(question=question, correct=correct)
+            sitting.record_answer(question, str(choice.pk), correct)
+        sitting.mark_quiz_complete()
+        return sitting
+
+    def test_per_question_stats_are_aggregated_in_sql(self):
+        self.take("10000001", [True, True])
+        self.take("10000002", [True, False])
+
+        stats = {row["question_id"]: row for row in SittingAnswer.objects.question_stats()}
+        first, second = (question.id for question in self.questions)
+        self.assertEqual((stats[first]["respuestas"], stats[first]["correctas"]), (2, 2))
+        self.assertEqual((stats[second]["respuestas"], stats[second]["correctas"]), (2, 1))
+
+    def test_manual_marking_toggles_answer_and_score(self):
+        sitting = self.take("10000001", [True, True])
+        question = self.questions[0]
+
+        sitting.add_incorrect_question(question)
+        self.assertEqual(Sitting.objects.get(pk=sitting.pk).current_score, 1)
+        self.assertEqual(sitting.get_incorrect_questions, [question.id])
+
+        sitting.remove_incorrect_question(question)
+        self.assertEqual(Sitting.objects.get(pk=sitting.pk).current_score, 2)
+        self.assertEqual(sitting.get_incorrect_questions, [])
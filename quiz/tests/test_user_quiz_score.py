@@ -0,0 +1,32 @@
+from django.test import TestCase
+
+from quiz.models import Progress, UserQuizScore
+from quiz.tests.base import QuizFixturesMixin
+
+
+class UserQuizScoreTests(QuizFixturesMixin, TestCase):
+    def setUp(self):
+        self.user = self.create_user("10000001")
+        self.exam = self.create_quiz(self.create_course(), category="exam")
+        self.practice = self.create_quiz(self.create_course(code="C02-PA"), category="practice")
+        self.progress = Progress.objects.new_progress(self.user)
+
+    def test_scores_accumulate_per_quiz(self):
+        UserQuizScore.objects.add(self.user, self.exam, 1, 1)
+        with self.assertNumQueries(1):
+            UserQuizScore.objects.add(self.user, self.exam, 0, 1)
+        self.progress.update_score(self.practice, 1, 1)
+
+        scores = UserQuizScore.objects.order_by("quiz_id").values_list("quiz_id", "score", "possible")
+        self.assertEqual(list(scores), [(self.exam.pk, 1, 2), (self.practice.pk, 1, 1)])
+
+    def test_category_scores_come_from_one_query(self):
+        UserQuizScore.objects.add(self.user, self.exam, 3, 4)
+        UserQuizScore.objects.add(self.user, self.practice, 1, 2)
+        other_exam = self.create_quiz(self.create_course(code="C03-TA"), category="exam")
+        UserQuizScore.objects.add(self.user, other_exam, 2, 4)
+        UserQuizScore.objects.add(self.create_user("10000002"), self.exam, 4, 4)
+
+        with self.assertNumQueries(1):
+            scores = {str(label): value for label, value in self.progress.list_all_cat_scores().items()}
+        self.assertEqual(scores, {"Exam": [5, 3, 62], "Practice Quiz": [1, 1, 50]})
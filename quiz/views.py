@@ -2,10 +2,9 @@ import os
 import io
 import locale
 from datetime import datetime, timedelta, date
-from PyPDF2 import PdfReader, PdfWriter
 from reportlab.pdfgen import canvas
 from reportlab.lib.pagesizes import landscape,A4
-from django.http import FileResponse, Http404, HttpResponse 
+from django.http import FileResponse, Http404, HttpResponse, StreamingHttpResponse
 from django.db.models import Max, Count, Q
 from decimal import Decimal
 from django.utils.translation import gettext as _ 
@@ -21,9 +20,17 @@ from reportlab.platypus import SimpleDocTemplate, Table, TableStyle, Paragraph,
 from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
 from babel.dates import format_datetime
 from .models import Sitting, SittingAuditLog 
+from core.cache_versions import CERTIFICATES, versioned_cache
+from core.jobs import background_pdf
+from core.pagination import CURSOR_PARAM, KeysetPaginationMixin, KeysetPaginator
+from core.qr import draw_qr
+from .answer_key import get_answer_key
+from .certificate_artifacts import MANUAL, SITTING, certificate_fingerprint, serve_certificate
+from .certificate_export import ExportStats, certificados_manuales, certificados_plataforma, iter_certificados, stream_zip
+from .certificate_templates import merge_overlay, resolve_certificate_template, template_signature
 from reportlab.pdfbase import pdfmetrics
 from reportlab.pdfbase.ttfonts import TTFont
-from .forms import AnexoForm, ManualCertificateForm, SittingDateUpdateForm
+from .forms import AnexoForm, CertificateExportForm, ManualCertificateForm, SittingDateUpdateForm
 from django.views.generic import (
     CreateView,
     DetailView,
@@ -53,15 +60,18 @@ from .models import (
     Quiz,
     Sitting,
     ManualCertificate,
+    CertificateLedger,
     ExternalCourseEnrollment,
+    UserQuizScore,
 )
 from django.views.decorators.csrf import csrf_exempt
-import qrcode
-from reportlab.lib.utils import ImageReader
 from django.db.models import Q
-from django.core.paginator import Paginator, EmptyPage, PageNotAnInteger
 from django.urls import reverse
 
+# Segundos en caché de los resúmenes de certificados (además se invalidan por versión)
+MARKING_STATS_TIMEOUT = 300
+CERTIFICADOS_DASHBOARD_TIMEOUT = 3600
+
 # Diccionario de posiciones por código de curso (disponible para todas las funciones)
 POSICIONES_CERTIFICADOS = {
     "C01-IPERC":    {"pos_nombre": (490, 385), "pos_puntaje": (0, 0), "pos_fecha_aprobacion": (585, 200), "pos_fecha_aprobacion2": (464, 232), "pos_fecha_vencimiento": (630, 232), "pos_usuario": (555, 357), "pos_codigo": (815,335 ), "pos_qr": (750, 370)},
@@ -139,73 +149,27 @@ def ajustar_tamano_nombre(nombre):
     else:
         return 14  # Tamaño muy pequeño
 
-def generar_certificado(request, sitting_id):
-    # FUNCIONALIDAD DESHABILITADA PARA PARTICIPANTES
-    # Solo administradores pueden descargar certificados
-    if not request.user.is_staff and not request.user.is_superuser:
-        messages.info(request, "La descarga de certificados está disponible solo para administradores.")
-        return redirect('quiz_progress')
-    
-    # Obtener el examen y validar permisos
-    if request.user.is_staff or request.user.is_superuser:
-        # Administradores pueden descargar cualquier certificado
-        sitting = get_object_or_404(Sitting, id=sitting_id)
-    else:
-        # Participantes solo pueden descargar sus propios certificados
-        sitting = get_object_or_404(Sitting, id=sitting_id, user=request.user)
-
-    # Si es curso externo, redirigir a Google Drive
-    if sitting.quiz.course.is_external:
-        try:
-            enrollment = ExternalCourseEnrollment.objects.get(
-                user=sitting.user,
-                course=sitting.quiz.course,
-                activo=True
-            )
-            if enrollment.is_approved and enrollment.certificate_url:
-                return redirect(enrollment.certificate_url)
-            elif enrollment.is_approved and not enrollment.certificate_url:
-                messages.warning(
-                    request, 
-                    "Certificado pendiente de carga por el administrador. "
-                    "El certificado estará disponible una vez que se suba la URL de Google Drive."
-                )
-                return redirect('quiz_marking')
-            else:
-                messages.error(
-                    request, 
-                    "Debe aprobar el examen (nota ≥14) para ver el certificado."
-                )
-                return redirect('quiz_marking')
-        except ExternalCourseEnrollment.DoesNotExist:
-            messages.warning(
-                request, 
-                "Inscripción en curso externo no encontrada. "
-                "Contacte al administrador."
-            )
-            return redirect('quiz_marking')
+def huella_certificado_sitting(sitting, base_url):
+    """Huella de todo lo que se dibuja en el certificado: si nada cambió se sirve el PDF almacenado"""
+    codigo = sitting.quiz.course.code
+    plantilla_path = resolve_certificate_template(codigo)
+    return certificate_fingerprint(
+        sitting.user.first_name, sitting.user.last_name, sitting.user.username,
+        sitting.get_percent_correct, sitting.fecha_aprobacion, codigo, sitting.certificate_code,
+        base_url, plantilla_path, *template_signature(plantilla_path),
+    )
 
-    # Verificar que el examen esté completo y aprobado
-    # IMPORTANTE: Usar el mismo cálculo que la vista SQL para mantener consistencia
-    # Calcular porcentaje basado en el total de preguntas del quiz (igual que QuizMarkingList)
-    if not sitting.complete:
-        messages.error(request, "El examen debe estar completo para generar el certificado.")
-        return redirect('quiz_start', slug=sitting.quiz.url)
-    
-    # Calcular porcentaje usando el mismo método que la vista SQL
-    total_questions = sitting.quiz.get_max_score
-    if total_questions == 0:
-        messages.error(request, "El examen no tiene preguntas configuradas.")
-        return redirect('quiz_start', slug=sitting.quiz.url)
-    
-    # Usar el mismo cálculo que SQL: current_score * 100.0 / total_questions
-    percent_correct = (sitting.current_score * 100.0) / total_questions
+def nombre_archivo_certificado_sitting(sitting):
+    nombre_usuario = f"{sitting.user.first_name} {sitting.user.last_name}"
+    # Generar nombre descriptivo del archivo
+    nombre_usuario_sanitizado = nombre_usuario.replace(" ", "_").replace("/", "_").replace("\\", "_").replace(":", "_").replace("*", "_").replace("?", "_").replace("\"", "_").replace("<", "_").replace(">", "_").replace("|", "_")
+    nombre_curso_sanitizado = sitting.quiz.course.title.replace(" ", "_").replace("/", "_").replace("\\", "_").replace(":", "_").replace("*", "_").replace("?", "_").replace("\"", "_").replace("<", "_").replace(">", "_").replace("|", "_")
     
-    # Validar con el pass_mark configurado en el examen
-    if percent_correct < sitting.quiz.pass_mark:
-        messages.error(request, "El examen debe estar aprobado para generar el certificado.")
-        return redirect('quiz_start', slug=sitting.quiz.url)
+    # Formato: {código_curso}-{número_certificado}-{nombre_curso}-{nombre_participante}.pdf
+    return f"{sitting.quiz.course.code}-{sitting.certificate_code}-{nombre_curso_sanitizado}-{nombre_usuario_sanitizado}.pdf"
 
+def render_certificado_sitting(sitting, base_url):
+    """Genera el PDF del certificado de un sitting aprobado y devuelve sus bytes"""
     # Obtener datos del certificado
     nombre_usuario = f"{sitting.user.first_name} {sitting.user.last_name}"
     # Convertir porcentaje a nota sobre 20 (igual que certificados manuales)
@@ -272,61 +236,93 @@ def generar_certificado(request, sitting_id):
     p.drawString(posiciones["pos_codigo"][0], posiciones["pos_codigo"][1], f"{sitting.certificate_code}")
 
     # Generar la URL de verificación con el prefijo correcto
-    url_verificacion = request.build_absolute_uri(
-        f"/quiz/verificar-certificado/{certificate_code}/"
-    )
-    # Generar el QR en memoria
-    qr = qrcode.make(url_verificacion)
-    qr_buffer = io.BytesIO()
-    qr.save(qr_buffer, format='PNG')
-    qr_buffer.seek(0)
-    qr_img = ImageReader(qr_buffer)
-
-    # Por ejemplo, en la esquina inferior derecha
-    p.drawImage(qr_img, posiciones["pos_qr"][0], posiciones["pos_qr"][1], width=65, height=65)
+    url_verificacion = f"{base_url.rstrip('/')}/quiz/verificar-certificado/{certificate_code}/"
+    # QR dibujado como vectores (matriz memoizada por URL)
+    draw_qr(p, url_verificacion, posiciones["pos_qr"][0], posiciones["pos_qr"][1], 65)
 
     # Finalizar el contenido del buffer
     p.showPage()
     p.save()
     buffer.seek(0)
 
-    # Cargar la plantilla del certificado
-    plantilla_path = os.path.join(settings.BASE_DIR, 'static', 'pdfs', f'{codigo}.pdf')
-    if not os.path.exists(plantilla_path):
-        plantilla_path = os.path.join(settings.BASE_DIR, 'static', 'pdfs', 'certificado_template.pdf')
-
-    # Verificar si el archivo existe
-    if not os.path.exists(plantilla_path):
-        # Si no existe, usar el certificado_template.pdf como respaldo
-        plantilla_path = os.path.join(settings.BASE_DIR, 'static', 'pdfs', 'certificado_template.pdf')
-        if not os.path.exists(plantilla_path):
-            raise Http404("No se encontró la plantilla del certificado.")
+    # Cargar la plantilla del certificado (parseada una sola vez por proceso)
+    plantilla_path = resolve_certificate_template(codigo)
 
     # Crear un nuevo PDF con la plantilla y el contenido superpuesto
-    contenido_pdf = PdfReader(buffer)
-    writer = PdfWriter()
-    plantilla_pdf = PdfReader(plantilla_path)
-    pagina_plantilla = plantilla_pdf.pages[0]
-    pagina_plantilla.merge_page(contenido_pdf.pages[0])
-    writer.add_page(pagina_plantilla)
-
-    # Guardar el PDF combinado en un nuevo buffer
-    resultado = io.BytesIO()
-    writer.write(resultado)
-    resultado.seek(0)
+    return merge_overlay(plantilla_path, buffer)
 
-    # Generar nombre descriptivo del archivo
-    nombre_usuario_sanitizado = nombre_usuario.replace(" ", "_").replace("/", "_").replace("\\", "_").replace(":", "_").replace("*", "_").replace("?", "_").replace("\"", "_").replace("<", "_").replace(">", "_").replace("|", "_")
-    nombre_curso_sanitizado = sitting.quiz.course.title.replace(" ", "_").replace("/", "_").replace("\\", "_").replace(":", "_").replace("*", "_").replace("?", "_").replace("\"", "_").replace("<", "_").replace(">", "_").replace("|", "_")
+def generar_certificado(request, sitting_id):
+    # FUNCIONALIDAD DESHABILITADA PARA PARTICIPANTES
+    # Solo administradores pueden descargar certificados
+    if not request.user.is_staff and not request.user.is_superuser:
+        messages.info(request, "La descarga de certificados está disponible solo para administradores.")
+        return redirect('quiz_progress')
     
-    # Formato: {código_curso}-{número_certificado}-{nombre_curso}-{nombre_participante}.pdf
-    filename = f"{sitting.quiz.course.code}-{sitting.certificate_code}-{nombre_curso_sanitizado}-{nombre_usuario_sanitizado}.pdf"
+    # Obtener el examen y validar permisos
+    if request.user.is_staff or request.user.is_superuser:
+        # Administradores pueden descargar cualquier certificado
+        sitting = get_object_or_404(Sitting.objects.select_related('quiz__course'), id=sitting_id)
+    else:
+        # Participantes solo pueden descargar sus propios certificados
+        sitting = get_object_or_404(Sitting.objects.select_related('quiz__course'), id=sitting_id, user=request.user)
 
-    # Devolver el PDF combinado como respuesta
-    # Convertir BytesIO a bytes para evitar warning de StreamingHttpResponse en modo asíncrono
-    response = HttpResponse(resultado.getvalue(), content_type='application/pdf')
-    response['Content-Disposition'] = f'attachment; filename="{filename}"'
-    return response
+    # Si es curso externo, redirigir a Google Drive
+    if sitting.quiz.course.is_external:
+        enrollment = ExternalCourseEnrollment.objects.for_sittings([sitting]).get(
+            (sitting.user_id, sitting.quiz.course_id)
+        )
+        if enrollment is None:
+            messages.warning(
+                request, 
+                "Inscripción en curso externo no encontrada. "
+                "Contacte al administrador."
+            )
+            return redirect('quiz_marking')
+        if enrollment.is_approved and enrollment.certificate_url:
+            return redirect(enrollment.certificate_url)
+        elif enrollment.is_approved and not enrollment.certificate_url:
+            messages.warning(
+                request, 
+                "Certificado pendiente de carga por el administrador. "
+                "El certificado estará disponible una vez que se suba la URL de Google Drive."
+            )
+            return redirect('quiz_marking')
+        else:
+            messages.error(
+                request, 
+                "Debe aprobar el examen (nota ≥14) para ver el certificado."
+            )
+            return redirect('quiz_marking')
+
+    # Verificar que el examen esté completo y aprobado
+    # IMPORTANTE: Usar el mismo cálculo que la vista SQL para mantener consistencia
+    # Calcular porcentaje basado en el total de preguntas del quiz (igual que QuizMarkingList)
+    if not sitting.complete:
+        messages.error(request, "El examen debe estar completo para generar el certificado.")
+        return redirect('quiz_start', slug=sitting.quiz.url)
+    
+    # Calcular porcentaje usando el mismo método que la vista SQL
+    total_questions = sitting.quiz.question_count
+    if total_questions == 0:
+        messages.error(request, "El examen no tiene preguntas configuradas.")
+        return redirect('quiz_start', slug=sitting.quiz.url)
+    
+    # Usar el mismo cálculo que SQL: current_score * 100.0 / total_questions
+    percent_correct = (sitting.current_score * 100.0) / total_questions
+    
+    # Validar con el pass_mark configurado en el examen
+    if percent_correct < sitting.quiz.pass_mark:
+        messages.error(request, "El examen debe estar aprobado para generar el certificado.")
+        return redirect('quiz_start', slug=sitting.quiz.url)
+
+    # Devolver el PDF combinado (renderizado sólo si no está almacenado)
+    base_url = request.build_absolute_uri("/")
+    return serve_certificate(
+        request, SITTING, sitting.id,
+        huella_certificado_sitting(sitting, base_url),
+        nombre_archivo_certificado_sitting(sitting),
+        lambda: render_certificado_sitting(sitting, base_url),
+    )
     
 def anexo_form(request, sitting_id):
     if request.method == 'POST':
@@ -367,8 +363,9 @@ def generar_anexo4(request, sitting_id, fecha_ingreso, ocupacion, area_trabajo,
     p_anexo.setFont("Helvetica", 11)  # Cambiar a un tamaño de fuente más pequeño
     p_anexo.setFillColorRGB(0, 0, 0)  # Color negro
 
-    #mifuente nueva para firmas
-    pdfmetrics.registerFont(TTFont('MiFuenteCursiva', os.path.join(settings.BASE_DIR, 'static', 'fonts', 'MiFuenteCursiva.ttf')))
+    #mifuente nueva para firmas (se registra una sola vez por proceso)
+    if 'MiFuenteCursiva' not in pdfmetrics.getRegisteredFontNames():
+        pdfmetrics.registerFont(TTFont('MiFuenteCursiva', os.path.join(settings.BASE_DIR, 'static', 'fonts', 'MiFuenteCursiva.ttf')))
 
     # Dibujar el nombre del usuario
     p_anexo.drawString(370, alto_pagina_anexo - 150, f"{sitting.user.first_name} {sitting.user.last_name}")
@@ -398,24 +395,12 @@ def generar_anexo4(request, sitting_id, fecha_ingreso, ocupacion, area_trabajo,
     p_anexo.save()
     buffer_anexo.seek(0)
 
-    # Cargar el anexo
-    anexo_pdf = PdfReader(anexo_path)
-    pagina_anexo = anexo_pdf.pages[0]
-
-    # Crear un nuevo PDF con el contenido del anexo
-    contenido_anexo_pdf = PdfReader(buffer_anexo)
-    writer_anexo = PdfWriter()
-    pagina_anexo.merge_page(contenido_anexo_pdf.pages[0])
-    writer_anexo.add_page(pagina_anexo)
-
-    # Guardar el PDF combinado en un nuevo buffer
-    resultado_anexo = io.BytesIO()
-    writer_anexo.write(resultado_anexo)
-    resultado_anexo.seek(0)
+    # Superponer el contenido sobre el anexo (plantilla cacheada)
+    resultado_anexo = merge_overlay(anexo_path, buffer_anexo)
 
     # Devolver el PDF del anexo como respuesta
     # Convertir BytesIO a bytes para evitar warning de StreamingHttpResponse en modo asíncrono
-    response = HttpResponse(resultado_anexo.getvalue(), content_type='application/pdf')
+    response = HttpResponse(resultado_anexo, content_type='application/pdf')
     response['Content-Disposition'] = 'attachment; filename="anexo4.pdf"'
     return response
 
@@ -449,6 +434,7 @@ def obtener_fecha_aprobacion(exam):
     # Crear el string formateado
     return f"{dia} de {mes} del {año}"
 
+@background_pdf
 def descargar_tabla_pdf(request):
     """Genera un PDF con la tabla de resultados de los exámenes"""
     if not request.user.is_authenticated:
@@ -750,59 +736,8 @@ class QuizMarkingList(ListView):
     paginate_by = 15  # 15 exámenes por página
 
     def get_queryset(self):
-        from django.db.models import Count, F, Q, Case, When, IntegerField, Subquery, OuterRef
-        from django.db import models
-        
-        # OPTIMIZACIÓN CRÍTICA: Calcular todo en SQL para evitar N+1 queries
-        # Subconsulta para contar preguntas por quiz
-        question_count_subquery = Quiz.objects.filter(
-            id=OuterRef('quiz_id')
-        ).annotate(
-            question_count=Count('question')
-        ).values('question_count')
-        
-        # Queryset optimizado que calcula aprobación directamente en SQL
-        queryset = Sitting.objects.filter(complete=True).select_related(
-            'user', 'quiz', 'quiz__course'
-        ).annotate(
-            # Contar preguntas del quiz
-            question_count=Subquery(question_count_subquery),
-            
-            # Calcular porcentaje correcto en SQL
-            percent_correct=Case(
-                When(question_count=0, then=0),
-                default=F('current_score') * 100.0 / F('question_count'),
-                output_field=models.FloatField()
-            ),
-            
-            # Verificar si está aprobado directamente en SQL
-            is_approved=Case(
-                When(
-                    percent_correct__gte=F('quiz__pass_mark'),
-                    then=1
-                ),
-                default=0,
-                output_field=IntegerField()
-            ),
-            
-            # Contar intentos totales por usuario+quiz
-            total_attempts=Count(
-                'user__sitting',
-                filter=Q(
-                    user__sitting__quiz=F('quiz'),
-                    user__sitting__complete=True
-                ),
-                distinct=True
-            ),
-            
-            # Contar intentos aprobados por usuario+quiz (simplificado)
-            # Nota: En la práctica, esto será 1 para cada registro ya que solo mostramos aprobados
-            approved_attempts=Case(
-                When(is_approved=1, then=1),
-                default=0,
-                output_field=IntegerField()
-            )
-        ).filter(is_approved=1)  # Solo exámenes aprobados
+        # Sittings aprobados (comparación contra Quiz.question_count en SQL)
+        queryset = Sitting.objects.approved()
         
         # Filtro por instructor si no es superusuario
         if not self.request.user.is_superuser:
@@ -819,113 +754,78 @@ class QuizMarkingList(ListView):
         if user_filter:
             queryset = queryset.filter(user__username__istartswith=user_filter)
         
-        return queryset.order_by('-end')
+        return queryset
 
     def get_unique_approved_sittings(self):
         """
-        Obtiene solo un examen aprobado por usuario+quiz (unicidad real)
-        Usa un enfoque simple y compatible que evita problemas de Django
-        """
-        # Obtener el queryset base optimizado
-        base_queryset = self.get_queryset()
-        
-        # Aplicar unicidad usando Python (más simple y compatible)
-        # IMPORTANTE: Usar un diccionario para mantener solo el más reciente
-        seen_combinations = {}
-        
-        for sitting in base_queryset:
-            combination = (sitting.user.id, sitting.quiz.id)
-            if combination not in seen_combinations:
-                seen_combinations[combination] = sitting
-            else:
-                # Si ya existe, mantener el más reciente (mayor fecha de finalización)
-                current_date = sitting.approval_effective_date
-                stored_date = seen_combinations[combination].approval_effective_date
-                if current_date > stored_date:
-                    seen_combinations[combination] = sitting
-        
-        # Convertir diccionario a lista y ordenar por fecha de finalización descendente
-        unique_sittings = list(seen_combinations.values())
-        unique_sittings.sort(key=lambda x: x.approval_effective_date, reverse=True)
-        
-        return unique_sittings
-
-    def get_queryset_with_approved_attempts(self):
-        """
-        MÉTODO OBSOLETO: Ya no se necesita porque get_queryset() ya está optimizado
-        Mantenido por compatibilidad pero redirige al queryset optimizado
+        Obtiene solo un examen aprobado por usuario+quiz (el más reciente)
+        La unicidad, el orden y los conteos de intentos se resuelven en la base de datos;
+        sólo se leen las filas de la página
         """
-        return self.get_queryset()
+        return (
+            self.get_queryset()
+            .latest_per_user_quiz()
+            .select_related('user', 'quiz', 'quiz__course')
+            .with_attempt_counts()
+            .with_effective_date()
+        )
 
     def get(self, request, *args, **kwargs):
         """
-        Método get optimizado - usa lista con unicidad real
+        Lista paginada por cursor sobre (fecha efectiva, id) de los sittings únicos
         """
-        # Usar lista con unicidad (un examen por usuario+quiz)
         unique_sittings = self.get_unique_approved_sittings()
-        
-        # Establecer object_list para que Django ListView funcione correctamente
         self.object_list = unique_sittings
+        stats = self.get_marking_stats()
         
-        # Aplicar paginación manualmente ya que tenemos una lista
-        from django.core.paginator import Paginator, EmptyPage, PageNotAnInteger
-        
-        paginator = Paginator(unique_sittings, self.paginate_by)
-        page = request.GET.get('page', 1)
-        
-        try:
-            page_obj = paginator.page(page)
-        except PageNotAnInteger:
-            page_obj = paginator.page(1)
-        except EmptyPage:
-            # Si la página está vacía, ir a la última página válida
-            page_obj = paginator.page(paginator.num_pages) if paginator.num_pages > 0 else paginator.page(1)
-        except Exception as e:
-            page_obj = paginator.page(1)
-        
-        # Obtener información de cursos externos
-        external_enrollments = {}
-        for sitting in unique_sittings:
-            if sitting.quiz.course.is_external:
-                try:
-                    enrollment = ExternalCourseEnrollment.objects.get(
-                        user=sitting.user,
-                        course=sitting.quiz.course,
-                        activo=True
-                    )
-                    external_enrollments[sitting.id] = enrollment
-                except ExternalCourseEnrollment.DoesNotExist:
-                    external_enrollments[sitting.id] = None
+        paginator = KeysetPaginator(
+            unique_sittings,
+            ('-fecha_efectiva', '-pk'),
+            self.paginate_by,
+            count=lambda: stats['examenes_aprobados_unicos'],
+        )
+        page_obj = paginator.page(request.GET.get(CURSOR_PARAM))
         
-        # Filtrar external_enrollments solo para los sittings de la página actual
-        page_external_enrollments = {
-            sitting.id: external_enrollments.get(sitting.id) 
-            for sitting in page_obj
-        }
+        # Inscripciones de cursos externos de la página actual, en una sola consulta
+        page_sittings = list(page_obj)
+        enrollments = ExternalCourseEnrollment.objects.for_sittings(page_sittings)
+        for sitting in page_sittings:
+            sitting.external_enrollment = enrollments.get((sitting.user_id, sitting.quiz.course_id))
         
         # Pasar los objetos de la página al contexto
         # IMPORTANTE: No llamar a super().get_context_data() porque intentará paginar de nuevo
         context = {
-            'object_list': list(page_obj), 
+            'object_list': page_sittings, 
             'page_obj': page_obj, 
             'is_paginated': page_obj.has_other_pages(),
-            'external_enrollments': page_external_enrollments,  # NUEVO
         }
         
         # Agregar estadísticas
-        context.update(self._get_stats_context())
+        context.update(stats)
         
         return self.render_to_response(context)
     
-    def _get_stats_context(self):
+    def get_marking_stats(self):
+        """
+        Estadísticas de la cabecera. Sin filtros se cachean por usuario y se
+        invalidan al cambiar cualquier certificado (versión CERTIFICATES)
+        """
+        def calcular():
+            # Conteo barato: pares usuario+examen distintos, sin ordenar ni deduplicar filas
+            return self._get_stats_context(self.get_queryset().values('user_id', 'quiz_id').distinct().count())
+        
+        if self.request.GET.get("quiz_filter") or self.request.GET.get("user_filter"):
+            return calcular()
+        return versioned_cache.get_or_set(
+            f"quiz_marking_stats_{self.request.user.id}", calcular, MARKING_STATS_TIMEOUT, [CERTIFICATES],
+            "quiz_marking_stats",
+        )
+    
+    def _get_stats_context(self, examenes_aprobados_unicos):
         """
         Obtiene el contexto de estadísticas sin llamar a super()
+        examenes_aprobados_unicos: pares usuario+examen aprobados (ya contados por el paginador)
         """
-        # Usar self.object_list que ya tiene la lista completa
-        unique_sittings = self.object_list
-        
-        # 1. Exámenes aprobados únicos (un examen por usuario+curso)
-        examenes_aprobados_unicos = len(unique_sittings)
         
         # 2. Participantes inscritos (estudiantes activos)
         from accounts.models import User
@@ -942,7 +842,6 @@ class QuizMarkingList(ListView):
             'examenes_aprobados_unicos': examenes_aprobados_unicos,
             'participantes_inscritos': participantes_inscritos,
             'cursos_con_examenes': cursos_con_examenes,
-            'current_page': self.request.GET.get('page', 1),
         }
 
 
@@ -950,6 +849,7 @@ class QuizMarkingList(ListView):
 @method_decorator([login_required, lecturer_required], name="dispatch")
 class QuizMarkingDetail(DetailView):
     model = Sitting
+    queryset = Sitting.objects.select_related("quiz", "user").prefetch_related("answers")
     template_name = "quiz/quiz_marking_detail.html"
 
     def post(self, request, *args, **kwargs):
@@ -983,7 +883,7 @@ class QuizTake(FormView):
     def dispatch(self, request, *args, **kwargs):
         self.quiz = get_object_or_404(Quiz, slug=self.kwargs["slug"])
         self.course = get_object_or_404(Course, pk=self.kwargs["pk"])
-        if not Question.objects.filter(quiz=self.quiz).exists():
+        if not self.quiz.question_count:
             messages.warning(request, "Este examen no tiene preguntas disponibles")
             return redirect("quiz_index", slug=self.course.slug)
 
@@ -994,12 +894,10 @@ class QuizTake(FormView):
         # Si el usuario ya completó el examen, verificar si aprobó
         if not self.sitting:
             # Buscar si existe algún registro aprobado
-            approved_sitting = Sitting.objects.filter(
+            approved_sitting = Sitting.objects.approved().filter(
                 user=request.user,
                 quiz=self.quiz,
                 course=self.course,
-                complete=True,
-                current_score__gte=self.quiz.pass_mark * self.quiz.get_max_score / 100
             ).first()
             if approved_sitting:
                 messages.info(
@@ -1038,36 +936,31 @@ class QuizTake(FormView):
 
     def form_valid(self, form):
         self.form_valid_user(form)
-        if not self.sitting.get_first_question():
+        if not self.question:
             return self.final_result_user()
         return super().get(self.request)
 
     def form_valid_user(self, form):
-        progress, _ = Progress.objects.get_or_create(user=self.request.user)
         guess = form.cleaned_data["answers"]
-        is_correct = self.question.check_if_correct(guess)
+        answer_key = get_answer_key(self.quiz)
+        is_correct = answer_key.is_correct(self.question, guess)
 
-        if is_correct:
-            self.sitting.add_to_score(1)
-            progress.update_score(self.question, 1, 1)
-        else:
-            self.sitting.add_incorrect_question(self.question)
-            progress.update_score(self.question, 0, 1)
+        with transaction.atomic():
+            # Una sola escritura del sitting por respuesta; un doble envío no suma dos veces
+            if self.sitting.record_answer(self.question, guess, is_correct):
+                UserQuizScore.objects.add(self.request.user, self.quiz, int(is_correct), 1)
 
         if not self.quiz.answers_at_end:
             self.previous = {
                 "previous_answer": guess,
                 "previous_outcome": is_correct,
                 "previous_question": self.question,
-                "answers": self.question.get_choices(),
+                "answers": answer_key.choices(self.question),
                 "question_type": {self.question.__class__.__name__: True},
             }
         else:
             self.previous = {}
 
-        self.sitting.add_user_answer(self.question, guess)
-        self.sitting.remove_first_question()
-
         # Update self.question and self.progress for the next question
         self.question = self.sitting.get_first_question()
         self.progress = self.sitting.progress()
@@ -1145,40 +1038,43 @@ class QuizTake(FormView):
 @csrf_exempt
 def verificar_certificado(request, codigo):
     """Vista unificada para verificar certificados (plataforma y manuales)"""
-    # Buscar en certificados de plataforma por código completo
-    sittings = Sitting.objects.filter(complete=True)
-    for sitting in sittings:
-        # Construir el código completo para comparar
-        codigo_completo = f"{sitting.course.code}-{sitting.certificate_code}"
-        if codigo_completo == codigo:
-            # Convertir porcentaje a nota sobre 20 (igual que certificados manuales)
-            porcentaje = sitting.get_percent_correct
-            nota_sobre_20 = round((porcentaje * 20) / 100)
-            
-            return render(request, 'quiz/verificar_certificado.html', {
-                'sitting': sitting,
-                'nombre': f"{sitting.user.first_name} {sitting.user.last_name}",
-                'curso': sitting.course.title,
-                'nota': nota_sobre_20,
-                'fecha': sitting.fecha_aprobacion,
-                'codigo': codigo,
-                'tipo': 'plataforma'
-            })
+    # Buscar en certificados de plataforma por código completo (columna indexada)
+    sitting = (
+        Sitting.objects.filter(full_code=codigo, complete=True)
+        .select_related('user', 'course')
+        .first()
+    )
+    if sitting:
+        # Convertir porcentaje a nota sobre 20 (igual que certificados manuales)
+        porcentaje = sitting.get_percent_correct
+        nota_sobre_20 = round((porcentaje * 20) / 100)
+        
+        return render(request, 'quiz/verificar_certificado.html', {
+            'sitting': sitting,
+            'nombre': f"{sitting.user.first_name} {sitting.user.last_name}",
+            'curso': sitting.course.title,
+            'nota': nota_sobre_20,
+            'fecha': sitting.fecha_aprobacion,
+            'codigo': codigo,
+            'tipo': 'plataforma'
+        })
     
     # Buscar en certificados manuales por código completo
-    manual_certs = ManualCertificate.objects.filter(activo=True)
-    for manual_cert in manual_certs:
-        codigo_completo = f"{manual_cert.curso.code}-{manual_cert.certificate_code}"
-        if codigo_completo == codigo:
-            return render(request, 'quiz/verificar_certificado.html', {
-                'certificate': manual_cert,
-                'nombre': manual_cert.nombre_completo,
-                'curso': manual_cert.curso.title,
-                'nota': manual_cert.puntaje,
-                'fecha': manual_cert.fecha_aprobacion,
-                'codigo': codigo,
-                'tipo': 'manual'
-            })
+    manual_cert = (
+        ManualCertificate.objects.filter(full_code=codigo, activo=True)
+        .select_related('curso')
+        .first()
+    )
+    if manual_cert:
+        return render(request, 'quiz/verificar_certificado.html', {
+            'certificate': manual_cert,
+            'nombre': manual_cert.nombre_completo,
+            'curso': manual_cert.curso.title,
+            'nota': manual_cert.puntaje,
+            'fecha': manual_cert.fecha_aprobacion,
+            'codigo': codigo,
+            'tipo': 'manual'
+        })
     
     # No encontrado
     return render(request, 'quiz/certificado_no_encontrado.html', {'codigo': codigo})
@@ -1206,15 +1102,21 @@ def generar_certificado_manual(request):
 @admin_required
 def listar_certificados_manuales(request):
     """Vista para listar todos los certificados manuales"""
-    certificados = ManualCertificate.objects.all()
+    certificados = ManualCertificate.objects.select_related('curso')
     
-    # Conteos globales
+    # Conteos globales en una sola consulta
     hoy = date.today()
     en_30_dias = hoy + timedelta(days=30)
-    total_certificados = certificados.count()
-    activos = certificados.filter(activo=True, fecha_vencimiento__gte=hoy).count()
-    por_vencer = certificados.filter(activo=True, fecha_vencimiento__gt=hoy, fecha_vencimiento__lte=en_30_dias).count()
-    vencidos = certificados.filter(fecha_vencimiento__lt=hoy).count()
+    conteos = certificados.aggregate(
+        total=Count('pk'),
+        activos=Count('pk', filter=Q(activo=True, fecha_vencimiento__gte=hoy)),
+        por_vencer=Count('pk', filter=Q(activo=True, fecha_vencimiento__gt=hoy, fecha_vencimiento__lte=en_30_dias)),
+        vencidos=Count('pk', filter=Q(fecha_vencimiento__lt=hoy)),
+    )
+    total_certificados = conteos['total']
+    activos = conteos['activos']
+    por_vencer = conteos['por_vencer']
+    vencidos = conteos['vencidos']
     
     # Filtros
     curso_filter = request.GET.get('curso')
@@ -1236,15 +1138,9 @@ def listar_certificados_manuales(request):
             Q(certificate_code__icontains=search)
         )
     
-    # Paginación
-    paginator = Paginator(certificados, 10)  # 10 certificados por página
-    page = request.GET.get('page')
-    try:
-        certificados_page = paginator.page(page)
-    except PageNotAnInteger:
-        certificados_page = paginator.page(1)
-    except EmptyPage:
-        certificados_page = paginator.page(paginator.num_pages)
+    # Paginación por cursor sobre (fecha_generacion, id): 10 certificados por página
+    paginator = KeysetPaginator(certificados, ('-fecha_generacion', '-pk'), 10)
+    certificados_page = paginator.page(request.GET.get(CURSOR_PARAM))
     
     return render(request, 'quiz/listar_certificados_manuales.html', {
         'certificados': certificados_page,
@@ -1269,8 +1165,8 @@ def descargar_certificado_manual(request, cert_id):
     codigo = certificate.curso.code
     return generar_pdf_certificado_manual(request, certificate, codigo)
 
-def generar_pdf_certificado_manual(request, certificate, codigo_curso):
-    """Función para generar PDF de certificado manual"""
+def render_certificado_manual(certificate, codigo_curso, base_url):
+    """Genera el PDF de un certificado manual y devuelve sus bytes"""
     # Datos del certificado
     nombre_estudiante = certificate.nombre_completo
     puntaje = certificate.puntaje
@@ -1324,37 +1220,70 @@ def generar_pdf_certificado_manual(request, certificate, codigo_curso):
     p.setFillColorRGB(0, 0, 0)  # Negro
     p.drawString(posiciones["pos_codigo"][0], posiciones["pos_codigo"][1], f"{certificate.certificate_code}")
     # Generar QR con dominio completo
-    url_verificacion = request.build_absolute_uri(f"/quiz/verificar-certificado/{certificate_code}/")
-    qr = qrcode.make(url_verificacion)
-    qr_buffer = io.BytesIO()
-    qr.save(qr_buffer, format='PNG')
-    qr_buffer.seek(0)
-    qr_img = ImageReader(qr_buffer)
-    p.drawImage(qr_img, posiciones["pos_qr"][0], posiciones["pos_qr"][1], width=65, height=65)
+    url_verificacion = f"{base_url.rstrip('/')}/quiz/verificar-certificado/{certificate_code}/"
+    draw_qr(p, url_verificacion, posiciones["pos_qr"][0], posiciones["pos_qr"][1], 65)
     # Finalizar contenido
     p.showPage()
     p.save()
     buffer.seek(0)
     # Cargar la plantilla del certificado (igual que en certificados automáticos)
-    plantilla_path = os.path.join(settings.BASE_DIR, 'static', 'pdfs', f'{codigo}.pdf')
-    if not os.path.exists(plantilla_path):
-        plantilla_path = os.path.join(settings.BASE_DIR, 'static', 'pdfs', 'certificado_template.pdf')
+    plantilla_path = resolve_certificate_template(codigo)
     # Crear PDF final
-    contenido_pdf = PdfReader(buffer)
-    writer = PdfWriter()
-    plantilla_pdf = PdfReader(plantilla_path)
-    pagina_plantilla = plantilla_pdf.pages[0]
-    pagina_plantilla.merge_page(contenido_pdf.pages[0])
-    writer.add_page(pagina_plantilla)
-    resultado = io.BytesIO()
-    writer.write(resultado)
-    resultado.seek(0)
+    return merge_overlay(plantilla_path, buffer)
+
+def huella_certificado_manual(certificate, codigo_curso, base_url):
+    """Huella de todo lo que se dibuja en el certificado manual"""
+    plantilla_path = resolve_certificate_template(codigo_curso)
+    return certificate_fingerprint(
+        certificate.nombre_completo, certificate.dni, certificate.puntaje,
+        certificate.fecha_aprobacion, certificate.fecha_vencimiento,
+        codigo_curso, certificate.curso.code, certificate.certificate_code, base_url,
+        plantilla_path, *template_signature(plantilla_path),
+    )
+
+def nombre_archivo_certificado_manual(certificate):
     nombre_sanitizado = certificate.nombre_completo.replace(" ", "_")
     nombre_curso_sanitizado = certificate.curso.title.replace(" ", "_")
-    filename = f"{certificate.curso.code}-{certificate.certificate_code}-{nombre_curso_sanitizado}-{nombre_sanitizado}.pdf"
-    # Convertir BytesIO a bytes para evitar warning de StreamingHttpResponse en modo asíncrono
-    response = HttpResponse(resultado.getvalue(), content_type='application/pdf')
-    response['Content-Disposition'] = f'attachment; filename="{filename}"'
+    return f"{certificate.curso.code}-{certificate.certificate_code}-{nombre_curso_sanitizado}-{nombre_sanitizado}.pdf"
+
+def generar_pdf_certificado_manual(request, certificate, codigo_curso):
+    """Función para generar PDF de certificado manual"""
+    base_url = request.build_absolute_uri("/")
+    return serve_certificate(
+        request, MANUAL, certificate.pk,
+        huella_certificado_manual(certificate, codigo_curso, base_url),
+        nombre_archivo_certificado_manual(certificate),
+        lambda: render_certificado_manual(certificate, codigo_curso, base_url),
+    )
+
+@login_required
+@admin_required
+def exportar_certificados_zip(request):
+    """
+    Descarga masiva de certificados (plataforma y manuales) como un ZIP por streaming.
+    Para exportaciones muy grandes usar: python manage.py exportar_certificados
+    """
+    form = CertificateExportForm(request.GET or None)
+    if not form.is_valid():
+        return render(request, 'quiz/exportar_certificados.html', {
+            'form': form,
+            'title': 'Exportar Certificados',
+        })
+
+    filtros = {
+        'curso': form.cleaned_data['curso'],
+        'desde': form.cleaned_data['desde'],
+        'hasta': form.cleaned_data['hasta'],
+        'dnis': form.cleaned_data['dnis'],
+    }
+    querysets = [(SITTING, certificados_plataforma(**filtros))]
+    if form.cleaned_data['incluir_manuales']:
+        querysets.append((MANUAL, certificados_manuales(**filtros)))
+
+    stats = ExportStats()
+    certificados = iter_certificados(querysets, request.build_absolute_uri("/"), stats=stats)
+    response = StreamingHttpResponse(stream_zip(certificados, resumen=stats.__str__), content_type='application/zip')
+    response['Content-Disposition'] = f'attachment; filename="certificados-{date.today():%Y%m%d}.zip"'
     return response
 
 class ManualCertificateUpdateView(UpdateView):
@@ -1379,337 +1308,202 @@ class CertificadosDashboardView(TemplateView):
         context = super().get_context_data(**kwargs)
         
         # Obtener fecha actual y cálculos
-        from datetime import date, timedelta
         hoy = date.today()
-        en_30_dias = hoy + timedelta(days=30)
         inicio_mes = hoy.replace(day=1)
         
-        # Importar funciones unificadas de utilidades
-        from .certificate_utils import (
-            datetime_to_date, 
-            is_certificate_active, 
-            is_certificate_expired, 
-            is_certificate_expiring_soon
-        )
-        
         # Sin filtrado por instructor - mostrar todos los certificados
         
-        # Estadísticas de certificados automáticos (aprobados) - OPTIMIZADO CON ORM
-        from django.db.models import F, Q, Count
-
-        # Obtener sittings completados con información del quiz
-        sittings_completados = Sitting.objects.filter(
-            complete=True
-        ).select_related('quiz', 'course', 'user')
-        
-        # Filtrar aprobados usando Python (ya que get_max_score es un método)
-        # CORREGIDO: Solo incluir sittings que realmente aprobaron
-        sittings_aprobados = []
-        for sitting in sittings_completados:
-            if sitting.get_percent_correct >= sitting.quiz.pass_mark:
-                sittings_aprobados.append(sitting)
-        
-        # Estadísticas de certificados manuales
+        # Todas las estadísticas salen del registro de certificados (un certificado
+        # automático por usuario y examen) con consultas agregadas
+        registro = CertificateLedger.objects.all()
+        automaticos_registro = registro.filter(tipo=CertificateLedger.AUTOMATICO)
         certificados_manuales = ManualCertificate.objects.all()
         
-        # Estadísticas generales
-        # CORREGIDO: Solo contar un examen aprobado por usuario por quiz (evitar duplicados)
-        certificados_unicos = set()
-        for s in sittings_aprobados:
-            if s.fecha_aprobacion:
-                # Crear clave única: usuario + quiz
-                clave_unica = f"{s.user.id}_{s.quiz.id}"
-                certificados_unicos.add(clave_unica)
-        
-        context['total_automaticos'] = len(certificados_unicos)
-        context['total_manuales'] = certificados_manuales.count()
-        context['total_certificados'] = context['total_automaticos'] + context['total_manuales']
-        
-        # Certificados activos (no vencidos) - LÓGICA UNIFICADA
-        # CORREGIDO: Solo contar certificados únicos que tienen fecha_aprobacion válida
-        certificados_activos_unicos = set()
-        for s in sittings_aprobados:
-            if s.fecha_aprobacion and is_certificate_active(s, hoy):
-                clave_unica = f"{s.user.id}_{s.quiz.id}"
-                certificados_activos_unicos.add(clave_unica)
-        
-        automaticos_activos = len(certificados_activos_unicos)
-        manuales_activos = len([c for c in certificados_manuales if is_certificate_active(c, hoy)])
-        
-        context['automaticos_activos'] = automaticos_activos
-        context['manuales_activos'] = manuales_activos
-        context['certificados_activos'] = automaticos_activos + manuales_activos
-        
-        # Certificados vencidos - LÓGICA UNIFICADA
-        # CORREGIDO: Solo contar certificados únicos que tienen fecha_aprobacion válida
-        certificados_vencidos_unicos = set()
-        for s in sittings_aprobados:
-            if s.fecha_aprobacion and is_certificate_expired(s, hoy):
-                clave_unica = f"{s.user.id}_{s.quiz.id}"
-                certificados_vencidos_unicos.add(clave_unica)
-        
-        automaticos_vencidos = len(certificados_vencidos_unicos)
-        manuales_vencidos = len([c for c in certificados_manuales if is_certificate_expired(c, hoy)])
-        
-        context['automaticos_vencidos'] = automaticos_vencidos
-        context['manuales_vencidos'] = manuales_vencidos
-        context['certificados_vencidos'] = automaticos_vencidos + manuales_vencidos
-        
-        # Certificados del mes actual
-        # CORREGIDO: Solo contar certificados únicos del mes
-        certificados_mes_unicos = set()
-        for s in sittings_aprobados:
-            if s.fecha_aprobacion and datetime_to_date(s.fecha_aprobacion) >= inicio_mes:
-                clave_unica = f"{s.user.id}_{s.quiz.id}"
-                certificados_mes_unicos.add(clave_unica)
-        
-        context['automaticos_mes'] = len(certificados_mes_unicos)
-        context['manuales_mes'] = certificados_manuales.filter(
-            fecha_generacion__gte=inicio_mes
-        ).count()
-        context['certificados_mes'] = context['automaticos_mes'] + context['manuales_mes']
-        
-        # Certificados por vencer (próximos 30 días) - LÓGICA UNIFICADA
-        # CORREGIDO: Solo contar certificados únicos que tienen fecha_aprobacion válida
-        certificados_por_vencer_unicos = set()
-        for s in sittings_aprobados:
-            if s.fecha_aprobacion and is_certificate_expiring_soon(s, hoy, 30):
-                clave_unica = f"{s.user.id}_{s.quiz.id}"
-                certificados_por_vencer_unicos.add(clave_unica)
-        
-        automaticos_por_vencer = len(certificados_por_vencer_unicos)
-        manuales_por_vencer = len([c for c in certificados_manuales if is_certificate_expiring_soon(c, hoy, 30)])
-        
-        context['automaticos_por_vencer'] = automaticos_por_vencer
-        context['manuales_por_vencer'] = manuales_por_vencer
-        context['por_vencer'] = automaticos_por_vencer + manuales_por_vencer
-        
-        # Datos para gráficos y filtros
-        context['datos_mensuales'] = self.get_datos_mensuales(sittings_aprobados, certificados_manuales)
-        context['distribucion_cursos'] = self.get_distribucion_cursos(sittings_aprobados)
-        context['certificados_recientes'] = self.get_certificados_recientes(sittings_aprobados)
-        
-        # Cursos para el template (QuerySet) y para JavaScript (JSON)
-        context['cursos_disponibles'] = self.get_cursos_disponibles()
-        context['cursos_disponibles_json'] = self.get_cursos_disponibles_json()
+        # Agregados sobre todo el historial: se cachean hasta que cambie algún certificado
+        resumen = versioned_cache.get_or_set(
+            f"certificados_dashboard_{hoy.isoformat()}",
+            lambda: {
+                # Totales y estados de ambos tipos en una sola consulta
+                'estados': registro.status_counts(hoy, 30),
+                'datos_mensuales': self.get_datos_mensuales(hoy, automaticos_registro, certificados_manuales),
+                'distribucion_cursos': self.get_distribucion_cursos(automaticos_registro),
+            },
+            CERTIFICADOS_DASHBOARD_TIMEOUT,
+            [CERTIFICATES],
+            "certificados_dashboard",
+        )
+        estados = resumen['estados']
+        automaticos = estados[CertificateLedger.AUTOMATICO]
+        manuales = estados[CertificateLedger.MANUAL]
+        
+        context['total_automaticos'] = automaticos['total']
+        context['total_manuales'] = manuales['total']
+        context['total_certificados'] = automaticos['total'] + manuales['total']
+        
+        context['automaticos_activos'] = automaticos['activos']
+        context['manuales_activos'] = manuales['activos']
+        context['certificados_activos'] = automaticos['activos'] + manuales['activos']
+        
+        context['automaticos_vencidos'] = automaticos['vencidos']
+        context['manuales_vencidos'] = manuales['vencidos']
+        context['certificados_vencidos'] = automaticos['vencidos'] + manuales['vencidos']
+        
+        context['automaticos_por_vencer'] = automaticos['por_vencer']
+        context['manuales_por_vencer'] = manuales['por_vencer']
+        context['por_vencer'] = automaticos['por_vencer'] + manuales['por_vencer']
+        
+        # Datos para gráficos (el mes actual es el último de la serie mensual)
+        context['datos_mensuales'] = resumen['datos_mensuales']
+        mes_actual = context['datos_mensuales'][-1]
+        context['automaticos_mes'] = mes_actual['automaticos']
+        context['manuales_mes'] = mes_actual['manuales']
+        context['certificados_mes'] = mes_actual['total']
+        context['distribucion_cursos'] = resumen['distribucion_cursos']
+        context['certificados_recientes'] = self.get_certificados_recientes(automaticos_registro)
+        
+        # Cursos para el template (lista) y para JavaScript (JSON)
+        cursos = self.get_cursos_disponibles()
+        context['cursos_disponibles'] = cursos
+        context['cursos_disponibles_json'] = self.get_cursos_disponibles_json(cursos)
         
         # Datos para la pestaña de cursos
-        context.update(self.get_datos_cursos(sittings_aprobados, certificados_manuales))
+        context.update(self.get_datos_cursos(automaticos_registro))
         
         return context
     
-    def get_datos_mensuales(self, sittings_aprobados, certificados_manuales):
-        """Obtener datos de certificados por mes (últimos 12 meses)"""
-        from datetime import date, timedelta
-        
-        datos = []
-        for i in range(12):
-            fecha = date.today() - timedelta(days=30*i)
-            inicio_mes = fecha.replace(day=1)
-            fin_mes = (inicio_mes + timedelta(days=32)).replace(day=1) - timedelta(days=1)
-            
-            # Certificados automáticos del mes (usar fecha_aprobacion)
-            # CORREGIDO: Solo contar certificados únicos del mes
-            certificados_mes_unicos = set()
-            for sitting in sittings_aprobados:
-                if sitting.fecha_aprobacion:
-                    sitting_date = sitting.fecha_aprobacion.date() if hasattr(sitting.fecha_aprobacion, 'date') else sitting.fecha_aprobacion
-                    if inicio_mes <= sitting_date <= fin_mes:
-                        clave_unica = f"{sitting.user.id}_{sitting.quiz.id}"
-                        certificados_mes_unicos.add(clave_unica)
-            automaticos = len(certificados_mes_unicos)
-            
-            # Certificados manuales del mes
-            manuales = 0
-            for cert in certificados_manuales:
-                if cert.fecha_generacion:
-                    cert_date = cert.fecha_generacion.date() if hasattr(cert.fecha_generacion, 'date') else cert.fecha_generacion
-                    if inicio_mes <= cert_date <= fin_mes:
-                        manuales += 1
-            
-            datos.append({
-                'mes': fecha.strftime('%b %Y'),
-                'automaticos': automaticos,
-                'manuales': manuales,
-                'total': automaticos + manuales
-            })
-        
-        return list(reversed(datos))
+    def get_datos_mensuales(self, hoy, automaticos_registro, certificados_manuales):
+        """Certificados por mes (últimos 12 meses), agrupados con TruncMonth en la base de datos"""
+        from .certificate_utils import conteo_mensual, meses_recientes, serie_mensual
+        
+        meses = meses_recientes(hoy, 12)
+        return serie_mensual(
+            meses,
+            conteo_mensual(automaticos_registro, 'fecha_aprobacion', meses[0]),
+            conteo_mensual(certificados_manuales, 'fecha_generacion', meses[0]),
+        )
     
-    def get_distribucion_cursos(self, sittings_aprobados):
+    def get_distribucion_cursos(self, automaticos_registro):
         """Obtener distribución de certificados por curso"""
-        from collections import Counter
-        
-        # Agrupar por curso
-        # CORREGIDO: Solo contar certificados únicos por curso
-        from collections import Counter
-        cursos_automaticos = Counter()
-        certificados_por_curso = set()
-        for sitting in sittings_aprobados:
-            clave_unica = f"{sitting.user.id}_{sitting.quiz.id}"
-            if clave_unica not in certificados_por_curso:
-                certificados_por_curso.add(clave_unica)
-                cursos_automaticos[sitting.quiz.course.title] += 1
-        
-        automaticos_por_curso = [
-            {'quiz__course__title': curso, 'total': total} 
-            for curso, total in cursos_automaticos.most_common(10)
-        ]
+        automaticos_por_curso = (
+            automaticos_registro.values('curso__title')
+            .annotate(total=Count('pk'))
+            .order_by('-total')[:10]
+        )
         
         # Certificados manuales por curso
-        manuales_por_curso = ManualCertificate.objects.all().values('curso__title').annotate(
+        manuales_por_curso = ManualCertificate.objects.values('curso__title').annotate(
             total=Count('id')
         ).order_by('-total')[:10]
         
         return {
-            'automaticos': list(automaticos_por_curso),
+            'automaticos': [
+                {'quiz__course__title': fila['curso__title'], 'total': fila['total']}
+                for fila in automaticos_por_curso
+            ],
             'manuales': list(manuales_por_curso)
         }
     
-    def get_certificados_recientes(self, sittings_aprobados):
+    def get_certificados_recientes(self, automaticos_registro):
         """Obtener certificados más recientes"""
-        from datetime import date, timedelta
-        
-        # Certificados automáticos recientes - usar datos ya calculados
-        # CORREGIDO: Solo incluir sittings únicos que realmente aprobaron y tienen fecha_aprobacion
-        automaticos_recientes = []
-        certificados_unicos = set()
-        
-        # Ordenar por fecha_aprobacion descendente
-        sittings_ordenados = sorted(sittings_aprobados, key=lambda x: x.fecha_aprobacion or x.end, reverse=True)
-        
-        for sitting in sittings_ordenados:
-            if sitting.fecha_aprobacion:
-                clave_unica = f"{sitting.user.id}_{sitting.quiz.id}"
-                if clave_unica not in certificados_unicos:
-                    certificados_unicos.add(clave_unica)
-                    automaticos_recientes.append(sitting)
-                    if len(automaticos_recientes) >= 10:
-                        break
+        recientes = automaticos_registro.select_related(
+            'sitting__user', 'sitting__quiz', 'sitting__course'
+        ).order_by('-fecha_aprobacion', '-pk')[:10]
         
         # Certificados manuales recientes
         manuales_recientes = ManualCertificate.objects.all().select_related('curso', 'generado_por').order_by('-fecha_generacion')[:10]
         
         return {
-            'automaticos': automaticos_recientes,
+            'automaticos': [entrada.sitting for entrada in recientes],
             'manuales': manuales_recientes
         }
     
     def get_cursos_disponibles(self):
-        """Obtener lista de cursos disponibles para el template"""
+        """Cursos con indicadores de examen y certificados manuales, en una sola consulta"""
+        from django.db.models import Exists, OuterRef
         from course.models import Course
         
-        cursos = Course.objects.all().order_by('title')
-        return cursos
+        return list(
+            Course.objects.annotate(
+                tiene_examen=Exists(Quiz.objects.filter(course=OuterRef('pk'))),
+                tiene_manuales=Exists(ManualCertificate.objects.filter(curso=OuterRef('pk'))),
+            ).order_by('title')
+        )
     
-    def get_cursos_disponibles_json(self):
+    def get_cursos_disponibles_json(self, cursos):
         """Obtener lista de cursos disponibles para JavaScript (JSON)"""
-        from course.models import Course
         import json
         
-        cursos = Course.objects.all().order_by('title')
-        
-        # Serializar cursos con información adicional
-        cursos_data = []
-        for curso in cursos:
-            # Verificar si el curso tiene exámenes (para certificados automáticos)
-            tiene_examen = curso.quiz_set.exists()
-            
-            # Verificar si el curso tiene certificados manuales
-            tiene_manuales = ManualCertificate.objects.filter(curso=curso).exists()
-            
-            cursos_data.append({
+        cursos_data = [
+            {
                 'id': curso.id,
                 'title': curso.title,
                 'code': curso.code,
-                'tiene_examen': tiene_examen,
-                'tiene_manuales': tiene_manuales
-            })
-        
+                'tiene_examen': curso.tiene_examen,
+                'tiene_manuales': curso.tiene_manuales
+            }
+            for curso in cursos
+        ]
         return json.dumps(cursos_data)
     
-    def get_datos_cursos(self, sittings_aprobados, certificados_manuales):
+    def get_instructores(self, curso_ids):
+        """Primer instructor asignado a cada curso (equivale a curso.allocated_course.first())"""
+        from course.models import CourseAllocation
+        
+        asignaciones = (
+            CourseAllocation.courses.through.objects
+            .filter(course_id__in=curso_ids)
+            .select_related('courseallocation__lecturer')
+            .order_by('courseallocation_id')
+        )
+        instructores = {}
+        for asignacion in asignaciones:
+            instructores.setdefault(asignacion.course_id, asignacion.courseallocation.lecturer)
+        return instructores
+    
+    def get_datos_cursos(self, automaticos_registro):
         """Obtener datos para la pestaña de cursos"""
+        from django.db.models import Max
         from course.models import Course
-        from django.db.models import Count, Max
-        
-        # Obtener todos los cursos
-        cursos_query = Course.objects.all()
-        
-        # Obtener cursos que tienen certificados (sittings aprobados)
-        # CORREGIDO: Solo contar certificados únicos por curso
-        cursos_con_certificados = []
-        certificados_por_curso = {}
         
-        for curso in cursos_query:
-            certificados_curso_unicos = set()
-            for s in sittings_aprobados:
-                if s.quiz.course == curso and s.fecha_aprobacion:
-                    clave_unica = f"{s.user.id}_{s.quiz.id}"
-                    certificados_curso_unicos.add(clave_unica)
-            
-            if certificados_curso_unicos:
-                cursos_con_certificados.append(curso)
-                certificados_por_curso[curso.id] = len(certificados_curso_unicos)
-        
-        # Estadísticas generales de cursos
-        total_cursos = len(cursos_con_certificados)
+        # Certificados por curso: las filas del registro ya son únicas por usuario y examen
+        por_curso = list(
+            automaticos_registro.values('curso')
+            .annotate(total=Count('pk'), ultimo=Max('fecha_aprobacion'))
+            .order_by('-total', 'curso')
+        )
         
-        # Total de estudiantes certificados (únicos)
-        usuarios_unicos = set()
-        for s in sittings_aprobados:
-            if s.fecha_aprobacion:
-                usuarios_unicos.add(s.user)
-        total_estudiantes_certificados = len(usuarios_unicos)
+        total_cursos = len(por_curso)
+        total_estudiantes_certificados = automaticos_registro.aggregate(
+            total=Count('user', distinct=True)
+        )['total']
         
-        # Promedio de certificados por curso
         promedio_certificados_por_curso = 0
         if total_cursos > 0:
-            total_certificados = sum(certificados_por_curso.values())
+            total_certificados = sum(fila['total'] for fila in por_curso)
             promedio_certificados_por_curso = round(total_certificados / total_cursos, 1)
         
+        curso_ids = [fila['curso'] for fila in por_curso]
+        cursos = Course.objects.in_bulk(curso_ids)
+        instructores = self.get_instructores(curso_ids)
+        
         # Curso más popular
         curso_mas_popular = "N/A"
         max_certificados_curso = 0
-        if cursos_con_certificados:
-            curso_mas_certificados = None
-            max_certificados = 0
-            for curso in cursos_con_certificados:
-                certificados_count = certificados_por_curso.get(curso.id, 0)
-                if certificados_count > max_certificados:
-                    max_certificados = certificados_count
-                    curso_mas_certificados = curso
-            
-            if curso_mas_certificados:
-                curso_mas_popular = curso_mas_certificados.title
-                max_certificados_curso = max_certificados
-        
-        # Detalle de cursos
-        cursos_detalle = []
-        for curso in cursos_con_certificados:
-            certificados_curso = [s for s in sittings_aprobados if s.quiz.course == curso]
-            ultimo_certificado = max(certificados_curso, key=lambda x: x.approval_effective_date) if certificados_curso else None
-            
-            # Obtener el instructor del curso
-            instructor_curso = None
-            try:
-                allocation = curso.allocated_course.first()
-                if allocation:
-                    instructor_curso = allocation.lecturer
-            except:
-                instructor_curso = None
-            
-            cursos_detalle.append({
-                'id': curso.id,
-                'title': curso.title,
-                'instructor': instructor_curso,
-                'total_certificados': len(certificados_curso),
-                'ultimo_certificado': ultimo_certificado.approval_effective_date if ultimo_certificado else None
-            })
-        
-        # Ordenar por total de certificados
-        cursos_detalle.sort(key=lambda x: x['total_certificados'], reverse=True)
-        cursos_detalle = cursos_detalle[:20]
+        if por_curso:
+            curso_mas_popular = cursos[por_curso[0]['curso']].title
+            max_certificados_curso = por_curso[0]['total']
+        
+        # Detalle de cursos (ya ordenados por total de certificados)
+        cursos_detalle = [
+            {
+                'id': fila['curso'],
+                'title': cursos[fila['curso']].title,
+                'instructor': instructores.get(fila['curso']),
+                'total_certificados': fila['total'],
+                'ultimo_certificado': fila['ultimo']
+            }
+            for fila in por_curso[:20]
+        ]
         
         # Datos para gráficos
         top_cursos = cursos_detalle[:10]
@@ -1718,16 +1512,8 @@ class CertificadosDashboardView(TemplateView):
         
         # Datos de instructores
         instructores_stats = {}
-        for curso in cursos_con_certificados:
-            # Obtener el instructor del curso
-            instructor = None
-            try:
-                allocation = curso.allocated_course.first()
-                if allocation:
-                    instructor = allocation.lecturer
-            except:
-                instructor = None
-            
+        for fila in por_curso:
+            instructor = instructores.get(fila['curso'])
             if instructor:
                 nombre = f"{instructor.first_name} {instructor.last_name}".strip()
                 if not nombre or nombre == " ":
@@ -1735,11 +1521,7 @@ class CertificadosDashboardView(TemplateView):
             else:
                 nombre = "Sin instructor"
             
-            if nombre not in instructores_stats:
-                instructores_stats[nombre] = 0
-            
-            certificados_count = len([s for s in sittings_aprobados if s.quiz.course == curso])
-            instructores_stats[nombre] += certificados_count
+            instructores_stats[nombre] = instructores_stats.get(nombre, 0) + fila['total']
         
         # Ordenar instructores por total de certificados
         instructores_ordenados = sorted(instructores_stats.items(), key=lambda x: x[1], reverse=True)[:5]
@@ -1763,118 +1545,46 @@ class CertificadosDashboardView(TemplateView):
 @method_decorator([login_required, lecturer_required], name="dispatch")
 class BeneficiariosAjaxView(View):
     """Vista AJAX para obtener datos de beneficiarios con paginación"""
+    per_page = 15
     
     def get(self, request):
         try:
-            from django.core.paginator import Paginator
             from django.http import JsonResponse
             
-            # Obtener parámetros de paginación
-            page = request.GET.get('page', 1)
-            per_page = 15
-            
             # Sin filtrado por instructor - mostrar todos los certificados
             
-            # Obtener sittings aprobados (certificados automáticos) - OPTIMIZADO CON ORM
-            from django.db.models import F
-            
-            # Obtener sittings completados con información del quiz
-            sittings_completados = Sitting.objects.filter(
-                complete=True
-            ).select_related('user', 'quiz__course')
-            
-            # Filtrar aprobados usando Python (ya que get_max_score es un método)
-            sittings_aprobados = []
-            for sitting in sittings_completados:
-                if sitting.get_percent_correct >= sitting.quiz.pass_mark:
-                    sittings_aprobados.append(sitting)
-            
-            # Obtener certificados manuales
-            certificados_manuales = ManualCertificate.objects.all().select_related('curso', 'generado_por')
-            
-            # Agrupar por usuario/beneficiario
-            beneficiarios_data = {}
-            
-            # Procesar certificados automáticos (participantes)
-            for sitting in sittings_aprobados:
-                user_id = sitting.user.id
-                if user_id not in beneficiarios_data:
-                    beneficiarios_data[user_id] = {
-                        'id': user_id,
-                        'nombre': f"{sitting.user.first_name} {sitting.user.last_name}".strip() or sitting.user.username,
-                        'email': sitting.user.email,
-                        'tipo': 'Participante',
-                        'total_certificados': 0,
-                        'automaticos': 0,
-                        'manuales': 0,
-                        'ultimo_certificado': None,
-                        'fecha_comparacion': None
-                    }
-                
-                beneficiarios_data[user_id]['automaticos'] += 1
-                beneficiarios_data[user_id]['total_certificados'] += 1
-                
-                # Actualizar último certificado
-                effective_date = sitting.approval_effective_date
-                if effective_date:
-                    fecha_sitting = effective_date.strftime('%d/%m/%Y')
-                    if (not beneficiarios_data[user_id]['ultimo_certificado'] or 
-                            effective_date > beneficiarios_data[user_id]['fecha_comparacion']):
-                        beneficiarios_data[user_id]['ultimo_certificado'] = fecha_sitting
-                        beneficiarios_data[user_id]['fecha_comparacion'] = effective_date
-            
-            # Procesar certificados manuales (incluyendo no participantes)
-            for cert in certificados_manuales:
-                # Usar el nombre del certificado manual como identificador único
-                nombre_cert = cert.nombre_completo or f"{cert.generado_por.first_name} {cert.generado_por.last_name}".strip() or cert.generado_por.username
-                cert_id = f"manual_{cert.id}"  # ID único para certificados manuales
-                
-                if cert_id not in beneficiarios_data:
-                    beneficiarios_data[cert_id] = {
-                        'id': cert_id,
-                        'nombre': nombre_cert,
-                        'email': cert.generado_por.email or 'No disponible',
-                        'tipo': 'Certificado Manual',
-                        'total_certificados': 0,
-                        'automaticos': 0,
-                        'manuales': 0,
-                        'ultimo_certificado': None,
-                        'fecha_comparacion': None
-                    }
-                
-                beneficiarios_data[cert_id]['manuales'] += 1
-                beneficiarios_data[cert_id]['total_certificados'] += 1
-                
-                # Actualizar último certificado
-                if cert.fecha_generacion:
-                    fecha_str = cert.fecha_generacion.strftime('%d/%m/%Y')
-                    if not beneficiarios_data[cert_id]['ultimo_certificado'] or cert.fecha_generacion > beneficiarios_data[cert_id]['fecha_comparacion']:
-                        beneficiarios_data[cert_id]['ultimo_certificado'] = fecha_str
-                        beneficiarios_data[cert_id]['fecha_comparacion'] = cert.fecha_generacion
-            
-            # Convertir a lista y ordenar por total de certificados
-            beneficiarios = list(beneficiarios_data.values())
-            beneficiarios.sort(key=lambda x: x['total_certificados'], reverse=True)
-            
-            # Limpiar datos antes de enviar (remover campo temporal)
-            for beneficiario in beneficiarios:
-                if 'fecha_comparacion' in beneficiario:
-                    del beneficiario['fecha_comparacion']
-            
-            # Aplicar paginación
-            paginator = Paginator(beneficiarios, per_page)
-            page_obj = paginator.get_page(page)
+            # Totales por beneficiario agrupados, ordenados y paginados en la base de datos
+            beneficiarios = CertificateLedger.objects.buscar(request.GET.get('buscar')).beneficiarios()
+            total_items = beneficiarios.count()
+            total_pages = max(1, -(-total_items // self.per_page))
+            try:
+                page = min(max(int(request.GET.get('page', 1)), 1), total_pages)
+            except (TypeError, ValueError):
+                page = 1
+            inicio = (page - 1) * self.per_page
             
             return JsonResponse({
                 'success': True,
-                'beneficiarios': list(page_obj),
+                'beneficiarios': [
+                    {
+                        'id': fila['beneficiario_id'],
+                        'nombre': fila['nombre'],
+                        'email': fila['email'] or 'No disponible',
+                        'tipo': fila['tipo_beneficiario'],
+                        'total_certificados': fila['total'],
+                        'automaticos': fila['automaticos'],
+                        'manuales': fila['manuales'],
+                        'ultimo_certificado': fila['ultimo'].strftime('%d/%m/%Y') if fila['ultimo'] else None,
+                    }
+                    for fila in beneficiarios[inicio:inicio + self.per_page]
+                ],
                 'pagination': {
-                    'current_page': page_obj.number,
-                    'total_pages': paginator.num_pages,
-                    'total_items': paginator.count,
-                    'has_next': page_obj.has_next(),
-                    'has_previous': page_obj.has_previous(),
-                    'per_page': per_page
+                    'current_page': page,
+                    'total_pages': total_pages,
+                    'total_items': total_items,
+                    'has_next': page < total_pages,
+                    'has_previous': page > 1,
+                    'per_page': self.per_page
                 }
             })
             
@@ -1912,100 +1622,46 @@ class CertificadosEstadisticasAjaxView(View):
                 cursos = Course.objects.filter(
                     id__in=curso_ids,
                     allocated_course__lecturer=request.user
-                ).order_by('title')
+                ).distinct().order_by('title')
             
-            # Calcular estadísticas solo para los cursos seleccionados
-            estadisticas = []
+            # Estadísticas de todos los cursos seleccionados: una consulta agrupada por tipo
             hoy = date.today()
-            
+            cursos = list(cursos)
+            ledger = CertificateLedger.objects.filter(curso_id__in=[curso.id for curso in cursos])
+            por_tipo = {
+                tipo: {fila['curso_id']: fila for fila in ledger.filter(tipo=tipo).por_curso(hoy)}
+                for tipo in (CertificateLedger.AUTOMATICO, CertificateLedger.MANUAL)
+            }
+            vacio = {'total': 0, 'activos': 0, 'vencidos': 0, 'ultimo_fecha': None, 'ultimo_nombre': None}
+
+            estadisticas = []
             for curso in cursos:
-                # Certificados automáticos del curso - OPTIMIZADO CON ORM
-                from django.db.models import F
-                
-                # Obtener sittings completados del curso con información del quiz
-                sittings_completados = Sitting.objects.filter(
-                    complete=True,
-                    quiz__course=curso
-                ).select_related('quiz', 'user')
-                
-                # Filtrar aprobados usando Python (ya que get_max_score es un método)
-                sittings_aprobados = []
-                for sitting in sittings_completados:
-                    if sitting.get_percent_correct >= sitting.quiz.pass_mark:
-                        sittings_aprobados.append(sitting)
-                
-                # Certificados manuales del curso
-                certificados_manuales = ManualCertificate.objects.filter(curso=curso)
-                
-                # Calcular estadísticas
-                total_automaticos = len(sittings_aprobados)
-                total_manuales = certificados_manuales.count()
-                total_curso = total_automaticos + total_manuales
-                
-                # Importar funciones unificadas
-                from .certificate_utils import (
-                    is_certificate_active, 
-                    is_certificate_expired
-                )
-                
-                # Certificados activos (no vencidos) - LÓGICA UNIFICADA
-                automaticos_activos = len([s for s in sittings_aprobados if is_certificate_active(s, hoy)])
-                manuales_activos = len([c for c in certificados_manuales if is_certificate_active(c, hoy)])
-                total_activos = automaticos_activos + manuales_activos
-                
-                # Certificados vencidos - LÓGICA UNIFICADA
-                automaticos_vencidos = len([s for s in sittings_aprobados if is_certificate_expired(s, hoy)])
-                manuales_vencidos = len([c for c in certificados_manuales if is_certificate_expired(c, hoy)])
-                total_vencidos = automaticos_vencidos + manuales_vencidos
-                
-                # Último certificado
-                ultimo_automatico = sittings_aprobados[-1] if sittings_aprobados else None
-                ultimo_manual = certificados_manuales.order_by('-fecha_generacion').first()
-                
+                automaticos = por_tipo[CertificateLedger.AUTOMATICO].get(curso.id, vacio)
+                manuales = por_tipo[CertificateLedger.MANUAL].get(curso.id, vacio)
+
+                # Último certificado: el de fecha de aprobación más reciente (ante empate, el automático)
                 ultimo_certificado = None
-                try:
-                    if ultimo_automatico and ultimo_manual:
-                        if ultimo_automatico.fecha_aprobacion > ultimo_manual.fecha_generacion:
-                            usuario_nombre = ultimo_automatico.user.get_full_name() if ultimo_automatico.user else 'Usuario no disponible'
-                            ultimo_certificado = {
-                                'tipo': 'Automático',
-                                'fecha': ultimo_automatico.fecha_aprobacion.strftime('%d/%m/%Y') if ultimo_automatico.fecha_aprobacion else None,
-                                'usuario': usuario_nombre
-                            }
-                        else:
-                            ultimo_certificado = {
-                                'tipo': 'Manual',
-                                'fecha': ultimo_manual.fecha_generacion.strftime('%d/%m/%Y') if ultimo_manual.fecha_generacion else None,
-                                'usuario': ultimo_manual.nombre_completo
-                            }
-                    elif ultimo_automatico:
-                        usuario_nombre = ultimo_automatico.user.get_full_name() if ultimo_automatico.user else 'Usuario no disponible'
-                        ultimo_certificado = {
-                            'tipo': 'Automático',
-                            'fecha': ultimo_automatico.fecha_aprobacion.strftime('%d/%m/%Y') if ultimo_automatico.fecha_aprobacion else None,
-                            'usuario': usuario_nombre
-                        }
-                    elif ultimo_manual:
-                        ultimo_certificado = {
-                            'tipo': 'Manual',
-                            'fecha': ultimo_manual.fecha_generacion.strftime('%d/%m/%Y') if ultimo_manual.fecha_generacion else None,
-                            'usuario': ultimo_manual.nombre_completo
-                        }
-                except Exception as e:
+                candidatos = [
+                    (fila['ultimo_fecha'], tipo, fila['ultimo_nombre'])
+                    for fila, tipo in ((automaticos, 'Automático'), (manuales, 'Manual'))
+                    if fila['ultimo_fecha']
+                ]
+                if candidatos:
+                    fecha, tipo, usuario = max(candidatos, key=lambda candidato: candidato[0])
                     ultimo_certificado = {
-                        'tipo': 'Error',
-                        'fecha': None,
-                        'usuario': 'Error al obtener datos'
+                        'tipo': tipo,
+                        'fecha': fecha.strftime('%d/%m/%Y'),
+                        'usuario': usuario or 'Usuario no disponible'
                     }
-                
+
                 estadisticas.append({
                     'curso_id': curso.id,
                     'curso_titulo': curso.title,
-                    'total_automaticos': total_automaticos,
-                    'total_manuales': total_manuales,
-                    'total_curso': total_curso,
-                    'total_activos': total_activos,
-                    'total_vencidos': total_vencidos,
+                    'total_automaticos': automaticos['total'],
+                    'total_manuales': manuales['total'],
+                    'total_curso': automaticos['total'] + manuales['total'],
+                    'total_activos': automaticos['activos'] + manuales['activos'],
+                    'total_vencidos': automaticos['vencidos'] + manuales['vencidos'],
                     'ultimo_certificado': ultimo_certificado
                 })
             
@@ -2059,124 +1715,70 @@ class CertificadosFiltrosAjaxView(View):
     
     def post(self, request, *args, **kwargs):
         from django.http import JsonResponse
-        from course.models import Course
-        from datetime import date, timedelta, datetime
+        from datetime import date, datetime
         import json
+        from .certificate_utils import conteo_mensual, meses_recientes, serie_mensual
         
         try:
             # Obtener parámetros de filtro
             filtros = json.loads(request.body)
-            
-            # Sin filtrado por instructor - mostrar todos los certificados
-            
-            # Obtener datos base
             hoy = date.today()
-            en_30_dias = hoy + timedelta(days=30)
-            
-            # Función helper para convertir datetime a date
-            def datetime_to_date(dt):
-                if dt is None:
-                    return None
-                if isinstance(dt, datetime):
-                    return dt.date()
-                return dt
             
-            # Obtener certificados automáticos (aprobados) - OPTIMIZADO CON ORM
-            from django.db.models import F
-            
-            # Obtener sittings completados con información del quiz
-            sittings_completados = Sitting.objects.filter(
-                complete=True
-            ).select_related('quiz', 'course', 'user')
+            # Sin filtrado por instructor - mostrar todos los certificados
             
-            # Filtrar aprobados usando Python (ya que get_max_score es un método)
-            sittings_aprobados = []
-            for sitting in sittings_completados:
-                if sitting.get_percent_correct >= sitting.quiz.pass_mark:
-                    sittings_aprobados.append(sitting)
+            # Un queryset del registro de certificados por tipo; los filtros se traducen a SQL
+            registro = CertificateLedger.objects.all()
             
-            # Obtener certificados manuales
-            certificados_manuales = ManualCertificate.objects.all()
+            # Filtro por cursos
+            if filtros.get('cursos') and len(filtros['cursos']) > 0:
+                curso_ids = [int(cid) for cid in filtros['cursos']]
+                registro = registro.filter(curso_id__in=curso_ids)
             
-            # APLICAR FILTROS REALES
+            automaticos = registro.filter(tipo=CertificateLedger.AUTOMATICO)
+            manuales = registro.filter(tipo=CertificateLedger.MANUAL)
             
             # Filtro por tipo
             if filtros.get('tipo') == 'automaticos':
-                certificados_manuales = ManualCertificate.objects.none()
+                manuales = manuales.none()
             elif filtros.get('tipo') == 'manuales':
-                sittings_aprobados = []
+                automaticos = automaticos.none()
             
-            # Filtro por fechas
+            # Filtro por fechas: automáticos por fecha de aprobación efectiva,
+            # manuales por fecha de generación
             if filtros.get('fechaDesde') and filtros.get('fechaHasta'):
                 fecha_desde = datetime.strptime(filtros['fechaDesde'], '%Y-%m-%d').date()
                 fecha_hasta = datetime.strptime(filtros['fechaHasta'], '%Y-%m-%d').date()
-                
-                # Filtrar automáticos por fecha de aprobación efectiva
-                sittings_aprobados = [
-                    s for s in sittings_aprobados 
-                    if s.approval_effective_date and fecha_desde <= datetime_to_date(s.approval_effective_date) <= fecha_hasta
-                ]
-                
-                # Filtrar manuales por fecha de generación
-                certificados_manuales = certificados_manuales.filter(
-                    fecha_generacion__date__range=[fecha_desde, fecha_hasta]
+                automaticos = automaticos.filter(fecha_aprobacion__range=[fecha_desde, fecha_hasta])
+                manuales = manuales.filter(
+                    certificado_manual__fecha_generacion__date__range=[fecha_desde, fecha_hasta]
                 )
             
-            # Filtro por cursos
-            if filtros.get('cursos') and len(filtros['cursos']) > 0:
-                curso_ids = [int(cid) for cid in filtros['cursos']]
-                
-                # Filtrar automáticos por curso
-                sittings_aprobados = [s for s in sittings_aprobados 
-                                   if s.course.id in curso_ids]
-                
-                # Filtrar manuales por curso
-                certificados_manuales = certificados_manuales.filter(curso_id__in=curso_ids)
-            
-            # Calcular estadísticas filtradas
-            total_automaticos = len(sittings_aprobados)
-            total_manuales = certificados_manuales.count()
-            total_certificados = total_automaticos + total_manuales
-            
-            # Importar funciones unificadas
-            from .certificate_utils import (
-                is_certificate_active, 
-                is_certificate_expired, 
-                is_certificate_expiring_soon
-            )
-            
-            # Calcular activos y vencidos - LÓGICA UNIFICADA
-            automaticos_activos = len([s for s in sittings_aprobados if is_certificate_active(s, hoy)])
-            manuales_activos = len([c for c in certificados_manuales if is_certificate_active(c, hoy)])
-            certificados_activos = automaticos_activos + manuales_activos
-            
-            automaticos_vencidos = len([s for s in sittings_aprobados if is_certificate_expired(s, hoy)])
-            manuales_vencidos = len([c for c in certificados_manuales if is_certificate_expired(c, hoy)])
-            certificados_vencidos = automaticos_vencidos + manuales_vencidos
-            
-            # Calcular por vencer - LÓGICA UNIFICADA
-            automaticos_por_vencer = len([s for s in sittings_aprobados if is_certificate_expiring_soon(s, hoy, 30)])
-            manuales_por_vencer = len([c for c in certificados_manuales if is_certificate_expiring_soon(c, hoy, 30)])
-            por_vencer = automaticos_por_vencer + manuales_por_vencer
-            
-            # Generar datos mensuales filtrados
-            datos_mensuales = self.generar_datos_mensuales_filtrados(
-                sittings_aprobados, certificados_manuales
+            # Totales y estados de ambos tipos en una sola consulta
+            estados = (automaticos | manuales).status_counts(hoy, 30)
+            estados_automaticos = estados[CertificateLedger.AUTOMATICO]
+            estados_manuales = estados[CertificateLedger.MANUAL]
+            
+            # Datos mensuales filtrados, agrupados por mes en la base de datos
+            meses = meses_recientes(hoy, 12)
+            datos_mensuales = serie_mensual(
+                meses,
+                conteo_mensual(automaticos, 'fecha_aprobacion', meses[0]),
+                conteo_mensual(manuales, 'certificado_manual__fecha_generacion', meses[0]),
             )
             
             return JsonResponse({
                 'success': True,
                 'data': {
-                    'total_certificados': total_certificados,
-                    'total_automaticos': total_automaticos,
-                    'total_manuales': total_manuales,
-                    'certificados_activos': certificados_activos,
-                    'certificados_vencidos': certificados_vencidos,
-                    'por_vencer': por_vencer,
-                    'automaticos_activos': automaticos_activos,
-                    'manuales_activos': manuales_activos,
-                    'automaticos_vencidos': automaticos_vencidos,
-                    'manuales_vencidos': manuales_vencidos,
+                    'total_certificados': estados_automaticos['total'] + estados_manuales['total'],
+                    'total_automaticos': estados_automaticos['total'],
+                    'total_manuales': estados_manuales['total'],
+                    'certificados_activos': estados_automaticos['activos'] + estados_manuales['activos'],
+                    'certificados_vencidos': estados_automaticos['vencidos'] + estados_manuales['vencidos'],
+                    'por_vencer': estados_automaticos['por_vencer'] + estados_manuales['por_vencer'],
+                    'automaticos_activos': estados_automaticos['activos'],
+                    'manuales_activos': estados_manuales['activos'],
+                    'automaticos_vencidos': estados_automaticos['vencidos'],
+                    'manuales_vencidos': estados_manuales['vencidos'],
                     'datos_mensuales': datos_mensuales
                 }
             })
@@ -2186,42 +1788,6 @@ class CertificadosFiltrosAjaxView(View):
                 'success': False,
                 'message': f'Error al aplicar filtros: {str(e)}'
             })
-    
-    def generar_datos_mensuales_filtrados(self, sittings_aprobados, certificados_manuales):
-        """Generar datos mensuales con filtros aplicados"""
-        from datetime import date, timedelta
-        
-        datos = []
-        for i in range(12):
-            fecha = date.today() - timedelta(days=30*i)
-            inicio_mes = fecha.replace(day=1)
-            fin_mes = (inicio_mes + timedelta(days=32)).replace(day=1) - timedelta(days=1)
-            
-            # Certificados automáticos del mes
-            automaticos = 0
-            for sitting in sittings_aprobados:
-                effective_date = sitting.approval_effective_date
-                if effective_date:
-                    sitting_date = effective_date.date() if hasattr(effective_date, 'date') else effective_date
-                    if inicio_mes <= sitting_date <= fin_mes:
-                        automaticos += 1
-            
-            # Certificados manuales del mes
-            manuales = 0
-            for cert in certificados_manuales:
-                if cert.fecha_generacion:
-                    cert_date = cert.fecha_generacion.date() if hasattr(cert.fecha_generacion, 'date') else cert.fecha_generacion
-                    if inicio_mes <= cert_date <= fin_mes:
-                        manuales += 1
-            
-            datos.append({
-                'mes': fecha.strftime('%b %Y'),
-                'automaticos': automaticos,
-                'manuales': manuales,
-                'total': automaticos + manuales
-            })
-        
-        return list(reversed(datos))
 
 
 # ============================================
@@ -2229,12 +1795,13 @@ class CertificadosFiltrosAjaxView(View):
 # ============================================
 
 @method_decorator([login_required, admin_required], name="dispatch")
-class ExternalCourseListView(ListView):
+class ExternalCourseListView(KeysetPaginationMixin, ListView):
     """Vista de listado para administradores - Gestión de cursos externos"""
     model = ExternalCourseEnrollment
     template_name = "quiz/external_course_list.html"
     context_object_name = "enrollments"
     paginate_by = 20
+    keyset_ordering = ('-fecha_registro', '-pk')
 
     def get_queryset(self):
         # Solo mostrar inscripciones de cursos externos
@@ -2266,7 +1833,7 @@ class ExternalCourseListView(ListView):
         elif status_filter == "pending_certificate":
             queryset = queryset.filter(score__gte=14.0, certificate_url__isnull=True)
         
-        return queryset.order_by('-fecha_registro')
+        return queryset
 
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
@@ -2433,12 +2000,12 @@ class ExternalCourseValidationView(FormView):
         # ------------------------------
         # Cursos externos
         # ------------------------------
-        external_enrollments = ExternalCourseEnrollment.objects.filter(
+        external_enrollments = list(ExternalCourseEnrollment.objects.filter(
             Q(dni=dni) | Q(user__username=dni),
             score__gte=14.0,
             activo=True,
             course__is_external=True
-        ).select_related('user', 'course').order_by('-fecha_registro')
+        ).select_related('user', 'course').order_by('-fecha_registro'))
         
         # ------------------------------
         # Cursos internos
@@ -2470,7 +2037,7 @@ class ExternalCourseValidationView(FormView):
         context['external_enrollments'] = external_enrollments
         context['internal_results'] = internal_results
         context['dni_searched'] = dni
-        context['has_external_results'] = external_enrollments.exists()
+        context['has_external_results'] = len(external_enrollments) > 0
         context['has_internal_results'] = len(internal_results) > 0
         context['searched'] = True
         
@@ -22,6 +22,7 @@ from reportlab.lib.enums import TA_JUSTIFY, TA_LEFT, TA_CENTER, TA_RIGHT
 from reportlab.lib.units import inch
 from reportlab.lib import colors
 
+from core.jobs import background_pdf
 from core.models import Session, Semester
 from course.models import Course
 from accounts.models import Student
@@ -276,6 +277,7 @@ def assessment_result(request):
 
 @login_required
 @lecturer_required
+@background_pdf
 def result_sheet_pdf_view(request, id):
     current_semester = Semester.objects.get(is_current_semester=True)
     current_session = Session.objects.get(is_current_session=True)